@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+가상 응답으로 supabase_analysis.py 파이프라인의 단계별 소요 시간을 측정합니다.
+
+참가자 수별로 generate_synthetic_responses.py의 레코드를 JSONL로 저장한 뒤
+아래 단계를 순서대로 실행하고 시간을 기록합니다.
+    fetch_parse   - JSONL 스트리밍 파싱 (Supabase 응답 파싱에 해당)
+    flatten       - flatten_question_scores
+    descriptive   - compute_descriptive_stats
+    score_cube    - build_score_cube
+    friedman      - run_friedman_tests
+    wilcoxon      - run_pairwise_wilcoxon
+    effect_sizes  - compute_effect_sizes (bootstrap)
+    plot          - plot_interface_scores (overall)
+    csv_export    - descriptive/raw_long CSV 저장
+
+결과는 JSON으로 저장되며 --baseline으로 이전 결과를 주면 단계별 배율을 함께 출력합니다.
+
+사용 예시:
+    python benchmark_analysis.py --sizes 1000 10000 100000 --output bench.json
+    python benchmark_analysis.py --sizes 1000 10000 --baseline bench.json
+"""
+
+import argparse
+import json
+import platform
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import generate_synthetic_responses as synthetic
+import supabase_analysis as analysis
+import survey_sources
+
+DEFAULT_SIZES = [1000, 10000, 100000]
+
+
+def _timed(timings: dict, stage: str, func, *args, **kwargs):
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    elapsed = time.perf_counter() - start
+    timings[stage] = min(elapsed, timings.get(stage, float("inf")))
+    return result
+
+
+def run_pipeline(jsonl_path: Path, workdir: Path, timings: dict, n_resamples: int) -> int:
+    """한 번의 파이프라인 실행 시간을 timings에 단계별 최솟값으로 누적합니다."""
+    records = _timed(timings, "fetch_parse", lambda: list(survey_sources.iter_records(jsonl_path)))
+    df = _timed(timings, "flatten", analysis.flatten_question_scores, records)
+    del records
+    descriptive = _timed(timings, "descriptive", analysis.compute_descriptive_stats, df)
+    cube = _timed(timings, "score_cube", analysis.build_score_cube, df)
+    friedman = _timed(timings, "friedman", analysis.run_friedman_tests, df, cube)
+    pairwise = _timed(timings, "wilcoxon", analysis.run_pairwise_wilcoxon, df, cube)
+    _timed(timings, "effect_sizes", analysis.compute_effect_sizes, df, cube, n_resamples=n_resamples)
+    _timed(timings, "plot", analysis.plot_interface_scores, df, friedman, pairwise, workdir, "bench")
+
+    def export() -> None:
+        descriptive.to_csv(workdir / "bench_descriptive.csv")
+        df.to_csv(workdir / "bench_raw_long.csv", index=False)
+
+    _timed(timings, "csv_export", export)
+    return len(df)
+
+
+def print_table(runs: list[dict], baseline: dict | None) -> None:
+    baseline_runs = {run["participants"]: run for run in (baseline or {}).get("runs", [])}
+    for run in runs:
+        print(f"\n## participants={run['participants']} (rows={run['rows']})")
+        previous = baseline_runs.get(run["participants"], {}).get("stages", {})
+        for stage, seconds in run["stages"].items():
+            line = f"{stage:<14}{seconds:>10.3f}s"
+            if stage in previous and previous[stage] > 0:
+                line += f"   x{seconds / previous[stage]:.2f} (baseline {previous[stage]:.3f}s)"
+            print(line)
+        print(f"{'total':<14}{sum(run['stages'].values()):>10.3f}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="supabase_analysis 파이프라인 벤치마크")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="측정할 참가자 수 목록")
+    parser.add_argument("--repeat", type=int, default=1, help="크기별 반복 횟수 (단계별 최솟값 기록)")
+    parser.add_argument("--bootstrap", type=int, default=10000, help="effect_sizes 단계의 bootstrap 재표집 수")
+    parser.add_argument("--seed", type=int, default=0, help="가상 응답 생성 시드")
+    parser.add_argument("--data-folders", type=Path, default=Path("data_folders.json"), help="data_folders.json 경로")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"), help="결과 JSON 경로")
+    parser.add_argument("--baseline", type=Path, default=None, help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    import matplotlib
+    import numpy
+    import pandas
+
+    matplotlib.use("Agg")
+    # 무거운 모듈 import 시간이 첫 단계 측정에 섞이지 않도록 미리 불러옴
+    import matplotlib.pyplot  # noqa: F401
+    import scipy.stats  # noqa: F401
+    import statsmodels.stats.multitest  # noqa: F401
+
+    data_folders = synthetic.load_data_folders(args.data_folders)
+    runs = []
+    with tempfile.TemporaryDirectory(prefix="survey_bench_") as tmp:
+        workdir = Path(tmp)
+        for size in args.sizes:
+            jsonl_path = workdir / f"responses_{size}.jsonl"
+            synthetic.write_jsonl(
+                synthetic.generate_records(size, data_folders, seed=args.seed), str(jsonl_path)
+            )
+            timings = {}
+            rows = 0
+            for _ in range(max(1, args.repeat)):
+                rows = run_pipeline(jsonl_path, workdir, timings, args.bootstrap)
+            runs.append(
+                {
+                    "participants": size,
+                    "rows": rows,
+                    "input_bytes": jsonl_path.stat().st_size,
+                    "stages": timings,
+                }
+            )
+            print(f"[INFO] participants={size} 측정 완료 ({sum(timings.values()):.2f}s)")
+
+    result = {
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": numpy.__version__,
+            "pandas": pandas.__version__,
+        },
+        "settings": {"repeat": args.repeat, "bootstrap": args.bootstrap, "seed": args.seed},
+        "runs": runs,
+    }
+    args.output.write_text(json.dumps(result, ensure_ascii=False, indent=2), encoding="utf-8")
+
+    baseline = None
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+    print_table(runs, baseline)
+    print(f"\n[DONE] 벤치마크 결과를 {args.output}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,507 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터셋의 danmaku.json / optimal.json을 시간 인덱스가 있는 열 지향(columnar) 형식으로 변환합니다.
+
+danmaku.json은 {start, text, correlation} 객체의 배열이라 현재 재생 시점의 댓글을 찾으려면
+파일 전체를 파싱하고 처음부터 훑어야 합니다. 이 스크립트는 데이터 폴더마다
+comment_store/ 아래에 다음 파일을 만듭니다.
+
+    comment_store/
+    ├── index.json               # 소스별 개수, 길이, 열 목록, 청크 목록, 원본 파일 상태
+    ├── danmaku.cstore           # Python 리더용 바이너리 (아래 형식)
+    ├── optimal.cstore
+    ├── danmaku/00000.json       # UI용 시간 청크 (CHUNK_SECONDS 초 단위, 열 지향 JSON)
+    └── optimal/00000.json
+
+.cstore 형식 (little-endian):
+    b'CSTR' | u32 버전 | u32 헤더 길이 | JSON 헤더 (8바이트 정렬) | 데이터 구역
+    - 숫자 열: float32 / int32 배열
+    - 문자열 열: u32 오프셋 배열(개수+1) + UTF-8 바이트 (문자열 테이블)
+    - 초 인덱스: u32 배열, index[s] = start < s 인 행의 개수 (행은 start 순으로 정렬)
+
+Python에서는 CommentStore로 mmap 후 복사 없이 구간 조회를 합니다.
+    with CommentStore.open('data/<폴더>/comment_store/danmaku.cstore') as store:
+        store.rows(10, 20)          # 10초 이상 20초 미만에 시작하는 댓글
+        store.active(15.5)          # optimal: 15.5초에 화면에 떠 있는 댓글
+
+사용 예시:
+    python3 comment_store.py                 # data/ 아래 모든 폴더 (바뀐 폴더만)
+    python3 comment_store.py --force --verify data/RQmqcaS5LIM_none_0.068
+"""
+
+import argparse
+import json
+import math
+import mmap
+import os
+import shutil
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DATA_DIR = SCRIPT_DIR / 'data'
+
+STORE_DIR_NAME = 'comment_store'
+STORE_SUFFIX = '.cstore'
+STORE_MAGIC = b'CSTR'
+STORE_VERSION = 1
+CHUNK_SECONDS = 30
+# 청크 JSON에 쓰는 실수 자릿수
+CHUNK_FLOAT_DIGITS = 4
+
+# 소스 이름 -> (원본 파일, [(열 이름, 형식)])
+#   f32: float32, i32: int32, str: 문자열 테이블
+SOURCES = {
+    'danmaku': ('danmaku.json', [
+        ('start', 'f32'),
+        ('correlation', 'f32'),
+        ('text', 'str'),
+    ]),
+    'optimal': ('optimal.json', [
+        ('start', 'f32'),
+        ('end', 'f32'),
+        ('correlation', 'f32'),
+        ('likes', 'f32'),
+        ('reward', 'f32'),
+        ('slot', 'i32'),
+        ('text', 'str'),
+        ('author', 'str'),
+        ('photo', 'str'),
+    ]),
+}
+TYPECODES = {'f32': 'f', 'i32': 'i', 'u32': 'I'}
+
+for _code in TYPECODES.values():
+    assert array(_code).itemsize == 4, "4바이트 array 형식이 필요합니다"
+
+
+def _to_le(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _coerce(value, kind):
+    if kind == 'str':
+        return '' if value is None else str(value)
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        number = math.nan
+    if kind == 'i32':
+        return int(number) if math.isfinite(number) else 0
+    return number
+
+
+def build_columns(records, columns):
+    """레코드 목록을 start 순으로 정렬한 열 목록 {이름: list}로 변환"""
+    order = sorted(range(len(records)), key=lambda i: _coerce(records[i].get('start'), 'f32'))
+    return {
+        name: [_coerce(records[i].get(name), kind) for i in order]
+        for name, kind in columns
+    }
+
+
+def second_index(starts):
+    """index[s] = start < s 인 행 수 (s = 0 .. floor(max start) + 1)"""
+    last = int(math.floor(max(starts))) if starts else -1
+    return [bisect_left(starts, s) for s in range(last + 2)]
+
+
+def encode_store(source, values, columns):
+    """열 목록을 .cstore 바이트로 직렬화"""
+    count = len(values['start'])
+    # float32로 저장된 값 기준으로 인덱스를 만들어야 조회 결과가 일치함
+    starts = array('f', values['start']).tolist()
+    sections = []
+    header_columns = {}
+
+    def add_section(data):
+        sections.append(data)
+        return len(sections) - 1
+
+    for name, kind in columns:
+        if kind == 'str':
+            blob = bytearray()
+            offsets = array('I', [0])
+            for text in values[name]:
+                blob += text.encode('utf-8')
+                offsets.append(len(blob))
+            header_columns[name] = {
+                'kind': kind,
+                'offsets': add_section(_to_le(offsets)),
+                'data': add_section(bytes(blob)),
+            }
+        else:
+            header_columns[name] = {
+                'kind': kind,
+                'data': add_section(_to_le(array(TYPECODES[kind], values[name]))),
+            }
+
+    index = add_section(_to_le(array('I', second_index(starts))))
+    durations = [e - s for s, e in zip(starts, values['end'])] if 'end' in values else []
+
+    header = {
+        'source': source,
+        'count': count,
+        'duration': max(values['end'] if 'end' in values else starts, default=0),
+        'max_duration': max(durations, default=None),
+        'columns': header_columns,
+        'index': index,
+    }
+
+    # 구역 위치는 데이터 시작점(헤더 뒤 8바이트 정렬) 기준 상대 오프셋
+    layout = []
+    position = 0
+    for data in sections:
+        layout.append([position, len(data)])
+        position += len(data) + (-len(data) % 8)
+    header['sections'] = layout
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    out = bytearray(STORE_MAGIC + struct.pack('<II', STORE_VERSION, len(header_bytes)) + header_bytes)
+    out += b'\0' * (-len(out) % 8)
+    for data in sections:
+        out += data + b'\0' * (-len(data) % 8)
+    return bytes(out)
+
+
+class CommentStore:
+    """.cstore 파일 리더 (mmap, 복사 없는 열 접근)"""
+
+    def __init__(self, buffer, close=None):
+        self._buffer = buffer
+        self._close = close
+        view = memoryview(buffer)
+        if bytes(view[:4]) != STORE_MAGIC:
+            raise ValueError("comment store 파일이 아닙니다")
+        version, header_len = struct.unpack_from('<II', view, 4)
+        if version != STORE_VERSION:
+            raise ValueError(f"지원하지 않는 comment store 버전: {version}")
+        self.header = json.loads(bytes(view[12:12 + header_len]))
+        data_start = 12 + header_len + (-(12 + header_len) % 8)
+        self.source = self.header['source']
+        self.count = self.header['count']
+        self._sections = [
+            view[data_start + offset:data_start + offset + length]
+            for offset, length in self.header['sections']
+        ]
+        self._columns = {}
+        for name, spec in self.header['columns'].items():
+            if spec['kind'] == 'str':
+                self._columns[name] = (
+                    self._numeric(spec['offsets'], 'u32'),
+                    self._sections[spec['data']],
+                )
+            else:
+                self._columns[name] = self._numeric(spec['data'], spec['kind'])
+        self._index = self._numeric(self.header['index'], 'u32')
+        self._starts = self._columns['start']
+
+    def _numeric(self, section, kind):
+        data = self._sections[section]
+        if sys.byteorder == 'big':
+            values = array(TYPECODES[kind], bytes(data))
+            values.byteswap()
+            return values
+        return data.cast(TYPECODES[kind])
+
+    @classmethod
+    def open(cls, path):
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        store = cls(mapped)
+        store._close = mapped.close
+        return store
+
+    def close(self):
+        # mmap을 닫기 전에 memoryview를 모두 해제해야 함
+        self._columns = {}
+        self._sections = []
+        self._index = self._starts = None
+        if self._close:
+            try:
+                self._close()
+            except BufferError:
+                # column()으로 받은 memoryview가 남아 있으면 그것이 해제될 때 함께 정리됨
+                pass
+            self._close = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def column_names(self):
+        return list(self.header['columns'])
+
+    def column(self, name):
+        """숫자 열은 memoryview(float32/int32), 문자열 열은 list를 반환"""
+        column = self._columns[name]
+        if isinstance(column, tuple):
+            return [self.value(name, i) for i in range(self.count)]
+        return column
+
+    def value(self, name, row):
+        column = self._columns[name]
+        if isinstance(column, tuple):
+            offsets, data = column
+            return str(data[offsets[row]:offsets[row + 1]], 'utf-8')
+        return column[row]
+
+    def _lower(self, t):
+        """start >= t 인 첫 행 번호 (초 인덱스로 범위를 좁힌 뒤 이분 탐색)"""
+        if t <= 0:
+            # 음수 start는 index[0]개의 앞쪽 행에만 있음
+            return bisect_left(self._starts, t, 0, self._index[0])
+        second = int(math.floor(t))
+        if second >= len(self._index) - 1:
+            return self.count
+        return bisect_left(self._starts, t, self._index[second], self._index[second + 1])
+
+    def window(self, t0, t1):
+        """t0 <= start < t1 인 행 번호 range"""
+        lo = self._lower(t0)
+        return range(lo, max(lo, self._lower(t1)))
+
+    def row(self, row):
+        return {name: self.value(name, row) for name in self.header['columns']}
+
+    def rows(self, t0, t1):
+        return [self.row(i) for i in self.window(t0, t1)]
+
+    def active(self, t):
+        """start <= t < end 인 행 목록 (end 열이 있는 소스만)"""
+        if 'end' not in self._columns:
+            raise KeyError(f"{self.source}에는 end 열이 없습니다")
+        ends = self._columns['end']
+        max_duration = self.header['max_duration'] or 0
+        candidates = self.window(t - max_duration, math.nextafter(t, math.inf))
+        return [self.row(i) for i in candidates if ends[i] > t]
+
+
+def _chunk_payload(source, values, columns, lo, hi, t0, t1):
+    payload_columns = {}
+    for name, kind in columns:
+        column = values[name][lo:hi]
+        if kind == 'f32':
+            column = [
+                (int(v) if v.is_integer() else round(v, CHUNK_FLOAT_DIGITS)) if math.isfinite(v) else None
+                for v in column
+            ]
+        payload_columns[name] = column
+    return {'source': source, 'start': t0, 'end': t1, 'count': hi - lo, 'columns': payload_columns}
+
+
+def _source_state(path):
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def read_store_manifest(folder_path):
+    manifest_path = Path(folder_path) / STORE_DIR_NAME / 'index.json'
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def store_is_current(folder_path, chunk_seconds=CHUNK_SECONDS):
+    manifest = read_store_manifest(folder_path)
+    if not manifest or manifest.get('version') != STORE_VERSION or manifest.get('chunk_seconds') != chunk_seconds:
+        return False
+    expected = {
+        name: _source_state(Path(folder_path) / file_name)
+        for name, (file_name, _) in SOURCES.items()
+        if (Path(folder_path) / file_name).exists()
+    }
+    recorded = {name: info.get('source_state') for name, info in manifest.get('sources', {}).items()}
+    return expected == recorded
+
+
+def build_dataset_store(folder_path, chunk_seconds=CHUNK_SECONDS, force=False):
+    """폴더의 comment_store/를 다시 만듦. 만든 소스 목록을 반환 (최신이면 None)"""
+    folder_path = Path(folder_path)
+    if not force and store_is_current(folder_path, chunk_seconds):
+        return None
+
+    store_dir = folder_path / STORE_DIR_NAME
+    tmp_dir = folder_path / f".{STORE_DIR_NAME}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+
+    manifest = {'version': STORE_VERSION, 'chunk_seconds': chunk_seconds, 'sources': {}}
+    try:
+        for source, (file_name, columns) in SOURCES.items():
+            source_path = folder_path / file_name
+            if not source_path.exists():
+                continue
+            state = _source_state(source_path)
+            with open(source_path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+            values = build_columns(records, columns)
+            (tmp_dir / f"{source}{STORE_SUFFIX}").write_bytes(encode_store(source, values, columns))
+
+            starts = array('f', values['start']).tolist()
+            chunk_dir = tmp_dir / source
+            chunk_dir.mkdir()
+            chunks = []
+            last_chunk = int(max(starts, default=0) // chunk_seconds)
+            for k in range(last_chunk + 1 if starts else 0):
+                t0, t1 = k * chunk_seconds, (k + 1) * chunk_seconds
+                # 첫 청크는 음수 start도 포함
+                lo = bisect_left(starts, t0) if k else 0
+                hi = bisect_left(starts, t1)
+                if lo == hi:
+                    continue
+                chunk_name = f"{source}/{t0:05d}.json"
+                with open(tmp_dir / chunk_name, 'w', encoding='utf-8') as f:
+                    json.dump(_chunk_payload(source, values, columns, lo, hi, t0, t1), f,
+                              ensure_ascii=False, separators=(',', ':'))
+                chunks.append({'file': chunk_name, 'start': t0, 'end': t1, 'count': hi - lo})
+
+            with CommentStore.open(tmp_dir / f"{source}{STORE_SUFFIX}") as store:
+                header = store.header
+            manifest['sources'][source] = {
+                'file': f"{source}{STORE_SUFFIX}",
+                'count': header['count'],
+                'duration': header['duration'],
+                'max_duration': header['max_duration'],
+                'columns': [name for name, _ in columns],
+                'chunks': chunks,
+                'source_state': state,
+            }
+
+        with open(tmp_dir / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+        # 기존 폴더를 옆으로 치운 뒤 교체 (중간에 실패해도 한쪽은 온전히 남음)
+        old_dir = folder_path / f".{STORE_DIR_NAME}.old"
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        if store_dir.exists():
+            os.replace(store_dir, old_dir)
+        os.replace(tmp_dir, store_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+    return list(manifest['sources'])
+
+
+def verify_dataset_store(folder_path):
+    """원본 JSON과 .cstore / 청크 내용을 비교해 불일치 목록을 반환"""
+    folder_path = Path(folder_path)
+    store_dir = folder_path / STORE_DIR_NAME
+    manifest = read_store_manifest(folder_path) or {'sources': {}}
+    problems = []
+    for source, (file_name, columns) in SOURCES.items():
+        source_path = folder_path / file_name
+        if not source_path.exists():
+            continue
+        info = manifest['sources'].get(source)
+        if info is None:
+            problems.append(f"{source}: 저장소가 없습니다")
+            continue
+        with open(source_path, 'r', encoding='utf-8') as f:
+            values = build_columns(json.load(f), columns)
+        expected = {
+            name: array('f', column).tolist() if kind == 'f32' else column
+            for (name, kind), column in zip(columns, values.values())
+        }
+        with CommentStore.open(store_dir / info['file']) as store:
+            for name, _ in columns:
+                actual = store.column(name)
+                actual = actual.tolist() if isinstance(actual, memoryview) else actual
+                same = all(
+                    a == b or (isinstance(a, float) and math.isnan(a) and math.isnan(b))
+                    for a, b in zip(actual, expected[name])
+                )
+                if len(actual) != len(expected[name]) or not same:
+                    problems.append(f"{source}.{name}: 값이 원본과 다릅니다")
+            starts = expected['start']
+            for t0 in range(-1, int(max(starts, default=0)) + 2):
+                for t in (t0, t0 + 0.5):
+                    want = [i for i, s in enumerate(starts) if t <= s < t + 1]
+                    got = list(store.window(t, t + 1))
+                    if got != want:
+                        problems.append(f"{source}: window({t}, {t + 1}) 결과가 다릅니다")
+        chunk_total = 0
+        for chunk in info['chunks']:
+            with open(store_dir / chunk['file'], 'r', encoding='utf-8') as f:
+                chunk_total += len(json.load(f)['columns']['text'])
+        if chunk_total != len(starts):
+            problems.append(f"{source}: 청크 행 수 {chunk_total} != {len(starts)}")
+    return problems
+
+
+def iter_dataset_folders(data_dir=DATA_DIR):
+    if not Path(data_dir).exists():
+        return []
+    return sorted(
+        p for p in Path(data_dir).iterdir()
+        if p.is_dir() and not p.name.startswith('.') and any((p / f).exists() for f, _ in SOURCES.values())
+    )
+
+
+def build_comment_stores(folder_paths=None, chunk_seconds=CHUNK_SECONDS, force=False, jobs=None, log=print):
+    """여러 데이터 폴더의 comment_store/를 병렬로 생성 (바뀐 폴더만)"""
+    folder_paths = list(folder_paths) if folder_paths is not None else iter_dataset_folders()
+
+    def process(folder_path):
+        try:
+            return folder_path, build_dataset_store(folder_path, chunk_seconds, force), None
+        except (OSError, ValueError) as e:
+            return folder_path, None, e
+
+    built = 0
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for folder_path, sources, error in executor.map(process, folder_paths):
+            if error is not None:
+                log(f"   ⚠️  {folder_path.name}: 댓글 저장소 생성 실패: {error}")
+            elif sources is not None:
+                built += 1
+                log(f"   🗂️  {folder_path.name}: {', '.join(sources)} 저장소 생성")
+    log(f"🗂️  댓글 저장소 완료: 대상 {len(folder_paths)}개, 새로 생성 {built}개")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="danmaku.json / optimal.json을 시간 인덱스 열 저장소로 변환")
+    parser.add_argument('folders', nargs='*', type=Path, help="데이터 폴더 (기본: data/ 아래 전체)")
+    parser.add_argument('--chunk-seconds', type=int, default=CHUNK_SECONDS, help=f"UI용 청크 길이(초) (기본: {CHUNK_SECONDS})")
+    parser.add_argument('--force', action='store_true', help="원본이 바뀌지 않았어도 다시 생성")
+    parser.add_argument('--verify', action='store_true', help="생성 후 원본 JSON과 비교")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 처리할 폴더 수")
+    args = parser.parse_args()
+
+    folders = args.folders or iter_dataset_folders()
+    build_comment_stores(folders, args.chunk_seconds, args.force, args.jobs)
+    if args.verify:
+        failed = 0
+        for folder_path in folders:
+            problems = verify_dataset_store(folder_path)
+            failed += bool(problems)
+            for problem in problems:
+                print(f"[WARN] {folder_path.name}: {problem}")
+        print(f"[DONE] 검증: {len(folders) - failed}/{len(folders)}개 폴더 일치")
+        sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
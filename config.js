@@ -17,13 +17,21 @@ const CONFIG = {
     // 데이터 폴더 이름 (dataBasePath 바로 아래의 폴더들)
     // null이면 data_folders.json 파일에서 자동으로 로드됩니다
     // 수동으로 설정하려면 배열을 지정하세요: ['folder1', 'folder2', ...]
-    dataFolders: null,  // null이면 data_folders.json에서 자동 로드
+    dataFolders: null,  // null이면 data_folders.json에서 자동 로드 (data_catalog.json으로 검사)
+    
+    // get_data_folders.py가 만든 데이터셋 카탈로그 (폴더별 인터페이스/댓글 수/비디오 정보, 폴더 검사용)
+    dataCatalogPath: 'data_catalog.json',
     
     // 인터페이스 개수
     numInterfaces: 5,
     
     // 데이터 개수 (dataBasePath 바로 아래의 폴더 개수)
-    numData: 5
+    numData: 5,
+    
+    // generate_balanced_design.py가 만든 페어링 일정 파일 (선택)
+    // null이면 요청 없이 아래 FAIR_DATA_PERMUTATIONS를 사용합니다
+    // 일정을 쓰려면 파일을 생성한 뒤 경로를 지정하세요: 'pairing_schedule.json'
+    pairingSchedulePath: null
 };
 
 const INTERFACE_ORDER = ['C', 'D', 'D1', 'Y', 'Y1'];
@@ -126,7 +134,50 @@ async function fetchGlobalPermutationIndex() {
     }
 }
 
-// data_folders.json에서 폴더 목록 로드
+// 데이터셋 카탈로그 로드 (없거나 형식이 맞지 않으면 null)
+async function loadDataCatalog() {
+    if (!CONFIG.dataCatalogPath) {
+        return null;
+    }
+    try {
+        const response = await fetch(CONFIG.dataCatalogPath);
+        if (!response.ok) {
+            return null;
+        }
+        const catalog = await response.json();
+        if (!catalog || !Array.isArray(catalog.datasets)) {
+            return null;
+        }
+        return catalog;
+    } catch (error) {
+        console.warn(`${CONFIG.dataCatalogPath}을 불러올 수 없습니다:`, error);
+        return null;
+    }
+}
+
+// 실험에 쓰이는 앞쪽 폴더가 카탈로그상 CONFIG.interfaces를 모두 갖췄는지 확인
+// 문제가 있는 폴더를 건너뛰면 FAIR_DATA_PERMUTATIONS의 인터페이스→데이터 매핑이 바뀌므로 오류를 냄
+function assertDatasetsUsable(folders, catalog) {
+    if (!Array.isArray(catalog.folders) || catalog.folders.join('\n') !== folders.join('\n')) {
+        console.warn(`${CONFIG.dataCatalogPath}의 폴더 목록이 data_folders.json과 달라 검사를 건너뜁니다. get_data_folders.py를 다시 실행하세요.`);
+        return;
+    }
+    const required = Object.keys(CONFIG.interfaces);
+    const datasets = new Map(catalog.datasets.map(dataset => [dataset.name, dataset]));
+    const broken = folders.slice(0, CONFIG.numInterfaces).filter(name => {
+        const dataset = datasets.get(name);
+        return !dataset
+            || dataset.valid === false
+            || !Array.isArray(dataset.interfaces)
+            || !required.every(key => dataset.interfaces.includes(key));
+    });
+    if (broken.length > 0) {
+        console.error(`사용할 수 없는 데이터셋이 있습니다: ${broken.join(', ')} (${CONFIG.dataCatalogPath}의 problems 참고)`);
+        throw new Error('사용할 수 없는 데이터셋이 있습니다.');
+    }
+}
+
+// data_folders.json에서 폴더 목록 로드 (순서 유지, data_catalog.json이 있으면 검사)
 async function loadDataFolders() {
     // 이미 설정되어 있으면 그대로 사용
     if (CONFIG.dataFolders && Array.isArray(CONFIG.dataFolders)) {
@@ -134,23 +185,69 @@ async function loadDataFolders() {
     }
     
     // data_folders.json 파일에서 로드 시도
+    let folders = null;
     try {
         const response = await fetch('data_folders.json');
         if (response.ok) {
-            const folders = await response.json();
-            if (Array.isArray(folders) && folders.length > 0) {
-                return folders;
+            const loaded = await response.json();
+            if (Array.isArray(loaded) && loaded.length > 0) {
+                folders = loaded;
             }
         }
     } catch (error) {
         console.warn('data_folders.json을 불러올 수 없습니다:', error);
     }
     
+    if (folders) {
+        const catalog = await loadDataCatalog();
+        if (catalog) {
+            assertDatasetsUsable(folders, catalog);
+        }
+        return folders;
+    }
+    
     // 기본값 반환 (폴백)
     console.warn('기본 폴더 목록을 사용합니다. get_data_folders.py를 실행하여 data_folders.json을 생성하세요.');
     return ['A', 'B', 'C', 'D', 'E'];
 }
 
+// 페어링 일정 로드 (pairing_schedule.json → FAIR_DATA_PERMUTATIONS 폴백)
+// orders가 있으면 제시 순서도 일정대로 정하고, 없으면 참가자마다 섞습니다
+// 페이지당 한 번만 요청하도록 결과(Promise)를 캐시합니다
+let pairingSchedulePromise = null;
+
+function loadPairingSchedule() {
+    if (!pairingSchedulePromise) {
+        pairingSchedulePromise = fetchPairingSchedule();
+    }
+    return pairingSchedulePromise;
+}
+
+async function fetchPairingSchedule() {
+    const fallback = { permutations: FAIR_DATA_PERMUTATIONS, orders: null };
+    if (!CONFIG.pairingSchedulePath) {
+        return fallback;
+    }
+    try {
+        const response = await fetch(CONFIG.pairingSchedulePath);
+        if (!response.ok) {
+            return fallback;
+        }
+        const schedule = await response.json();
+        const sameInterfaces = Array.isArray(schedule.interfaces)
+            && schedule.interfaces.join(',') === INTERFACE_ORDER.join(',');
+        if (!sameInterfaces || !Array.isArray(schedule.permutations) || schedule.permutations.length === 0) {
+            console.warn(`${CONFIG.pairingSchedulePath}의 인터페이스 구성이 INTERFACE_ORDER와 달라 기본 일정을 사용합니다.`);
+            return fallback;
+        }
+        const orders = Array.isArray(schedule.orders) && schedule.orders.length > 0 ? schedule.orders : null;
+        return { permutations: schedule.permutations, orders };
+    } catch (error) {
+        console.warn(`${CONFIG.pairingSchedulePath}을 불러올 수 없어 기본 일정을 사용합니다:`, error);
+        return fallback;
+    }
+}
+
 // 인터페이스-데이터 쌍 생성 함수
 // 모든 인터페이스를 경험하고, 데이터는 중복되지 않도록 함
 async function generateInterfaceDataPairs(globalPermutationIndex = null) {
@@ -166,7 +263,8 @@ async function generateInterfaceDataPairs(globalPermutationIndex = null) {
     
     const normalizedData = dataFolders.slice(0, interfaces.length);
     let permutation = null;
-    const eligiblePermutations = FAIR_DATA_PERMUTATIONS.filter(p => p.length === interfaces.length);
+    const schedule = await loadPairingSchedule();
+    const eligiblePermutations = schedule.permutations.filter(p => p.length === interfaces.length);
     const normalizedGlobalIndex = Number.isInteger(globalPermutationIndex) ? Math.abs(globalPermutationIndex) : null;
     let scheduleIndex = null;
     
@@ -197,6 +295,13 @@ async function generateInterfaceDataPairs(globalPermutationIndex = null) {
         };
     });
     
+    const eligibleOrders = (schedule.orders || []).filter(o => o.length === interfaces.length);
+    if (eligibleOrders.length > 0 && Number.isInteger(appliedIndex) && eligiblePermutations.length > 0) {
+        // 한 주기 = 페어링 행 수 × 순서 행 수, 모든 페어링 행이 모든 순서와 한 번씩 만남
+        const order = eligibleOrders[Math.floor(appliedIndex / eligiblePermutations.length) % eligibleOrders.length];
+        return order.map(idx => pairedList[idx]);
+    }
+    
     return shuffleArray(pairedList);
 }
 
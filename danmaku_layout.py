@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+danmaku.json의 댓글마다 레인(세로 위치)과 등장 시각을 미리 계산해 danmaku_layout.json으로 저장합니다.
+
+단무쿠 UI는 댓글을 띄울 때마다 hashString(text) % maxHeight로 Y를 정하고
+getBoundingClientRect()로 너비를 재기 때문에, 댓글이 많은 구간에서 레이아웃 계산이 반복되고
+댓글끼리 겹칩니다. 여기서는 기준 화면(.video-container 800x450, 18px 글꼴)에서
+
+    1. 글자별 폭 표(Helvetica 계열, 전각/이모지는 1em)로 텍스트 너비를 추정하고
+    2. 속도는 UI와 같은 규칙(hashString → [140, 180, 220, 260] px/s)으로 정한 뒤
+    3. start 순으로 각 댓글을 가장 빨리 비는 레인에 배치합니다 (탐욕적 구간 분할).
+
+레인 L에 마지막으로 들어간 댓글 A 뒤에 댓글 B가 들어가려면
+    - A의 꼬리가 오른쪽 끝에서 gap만큼 들어와야 하고       t >= s_A + (w_A + gap) / v_A
+    - B가 더 빠르면 A가 왼쪽으로 나갈 때까지 따라잡지 않아야 함
+                                                         t >= s_A + (W + w_A) / v_A - (W - gap) / v_B
+같은 레인의 앞선 댓글들은 A보다 먼저 나가므로 A만 확인하면 충분합니다.
+가장 빨리 비는 레인도 start + max_delay를 넘기면 overflow 설정에 따라
+    - overlap (기본): start에 가장 빨리 비는 레인으로 띄우고 overlapped로 기록 (댓글 수 유지)
+    - drop: 띄우지 않고 dropped로 기록
+합니다. 댓글 밀도는 실험 조건의 일부이므로 기본값은 모든 댓글을 유지합니다.
+
+결과의 열(columns)은 등장 시각 순이며, index는 danmaku.json(= HTML에 인라인된 목록)의 순서입니다.
+클라이언트는 x = stage.width - speed * (t - spawn), y = lane * lane_height 로 움직이기만 하면 됩니다.
+
+사용 예시:
+    python3 danmaku_layout.py                      # data/ 아래 모든 폴더 (바뀐 폴더만)
+    python3 danmaku_layout.py --max-delay 5 data/RQmqcaS5LIM_none_0.068
+"""
+
+import argparse
+import json
+import os
+import struct
+import unicodedata
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DATA_DIR = SCRIPT_DIR / 'data'
+
+SOURCE_FILE_NAME = 'danmaku.json'
+LAYOUT_FILE_NAME = 'danmaku_layout.json'
+LAYOUT_VERSION = 1
+
+# danmaku_ui_*.html 기준값 (.video-container 800px, 16:9 영상, .comment-text 18px)
+DEFAULT_STAGE = {
+    'width': 800,
+    'height': 450,
+    'font_size': 18,
+    'lane_height': 26,
+    'bottom_margin': 20,
+    'gap': 24,
+    'max_delay': 3.0,
+    'overflow': 'overlap',
+}
+OVERFLOW_MODES = ['overlap', 'drop']
+# getDanmakuSpeed()의 speedOptions (px/s, 왼쪽으로 이동)
+SPEED_OPTIONS = [140, 180, 220, 260]
+# 추정 오차와 text-shadow를 감안한 여유
+WIDTH_SCALE = 1.05
+WIDTH_PADDING = 4
+
+# Helvetica 글자 폭 (1/1000 em), ' '(0x20)부터 '~'(0x7E)까지
+_ASCII_WIDTHS = [int(w) for w in (
+    '278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 '
+    '556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 '
+    '1015 667 667 722 722 667 611 778 722 278 500 667 556 833 722 778 '
+    '667 778 722 667 611 722 667 944 667 667 611 278 278 278 469 556 '
+    '333 556 556 500 556 556 278 556 556 222 222 500 222 833 556 556 '
+    '556 556 333 500 278 556 500 722 500 500 500 334 260 334 584'
+).split()]
+DEFAULT_CHAR_WIDTH = 556
+WIDE_CHAR_WIDTH = 1000
+
+
+def char_width(ch):
+    """글자 하나의 폭 (1/1000 em)"""
+    code = ord(ch)
+    if 0x20 <= code <= 0x7E:
+        return _ASCII_WIDTHS[code - 0x20]
+    if unicodedata.combining(ch) or unicodedata.category(ch) in ('Mn', 'Me', 'Cf') or 0xFE00 <= code <= 0xFE0F:
+        return 0
+    if code >= 0x1F000 or unicodedata.east_asian_width(ch) in ('W', 'F'):
+        return WIDE_CHAR_WIDTH
+    return DEFAULT_CHAR_WIDTH
+
+
+def estimate_text_width(text, font_size):
+    em = sum(char_width(ch) for ch in text) / 1000
+    return em * font_size * WIDTH_SCALE + WIDTH_PADDING
+
+
+def js_hash_string(text):
+    """danmaku UI의 hashString()과 같은 값 (UTF-16 코드 단위, 32비트 정수 연산)"""
+    units = struct.unpack(f'<{len(text.encode("utf-16-le")) // 2}H', text.encode('utf-16-le'))
+    h = 0
+    for unit in units:
+        h = (h * 31 + unit) & 0xFFFFFFFF
+    if h >= 0x80000000:
+        h -= 0x100000000
+    return abs(h)
+
+
+def danmaku_speed(text):
+    return SPEED_OPTIONS[js_hash_string(text) % len(SPEED_OPTIONS)]
+
+
+def lane_count(stage):
+    return max(1, (stage['height'] - stage['bottom_margin']) // stage['lane_height'])
+
+
+def schedule_lanes(comments, stage):
+    """comments: [{start, text}] → (배치 목록, dropped 인덱스 목록, overlapped 인덱스 목록)
+
+    배치 항목은 (index, spawn, lane, speed, width)이며 등장 시각 순입니다.
+    """
+    W = stage['width']
+    gap = stage['gap']
+    max_delay = stage['max_delay']
+    # 레인별 마지막 댓글: (spawn, speed, width) 또는 None
+    last = [None] * lane_count(stage)
+    placed = []
+    dropped = []
+    overlapped = []
+
+    order = sorted(range(len(comments)), key=lambda i: float(comments[i].get('start') or 0))
+    for i in order:
+        text = str(comments[i].get('text') or '')
+        start = float(comments[i].get('start') or 0)
+        speed = danmaku_speed(text)
+        width = estimate_text_width(text, stage['font_size'])
+
+        best_lane, best_time = None, None
+        for lane, previous in enumerate(last):
+            if previous is None:
+                free = start
+            else:
+                s_a, v_a, w_a = previous
+                free = s_a + (w_a + gap) / v_a
+                if speed > v_a:
+                    free = max(free, s_a + (W + w_a) / v_a - (W - gap) / speed)
+                free = max(start, free)
+            if best_time is None or free < best_time:
+                best_lane, best_time = lane, free
+                if free == start:
+                    # 위쪽 레인부터 채움
+                    break
+
+        if best_time - start > max_delay:
+            if stage['overflow'] == 'drop':
+                dropped.append(i)
+                continue
+            # 겹쳐 띄우는 댓글은 레인 상태에 반영하지 않아 나머지 댓글끼리는 겹치지 않음
+            overlapped.append(i)
+            placed.append((i, start, best_lane, speed, width))
+            continue
+        last[best_lane] = (best_time, speed, width)
+        placed.append((i, best_time, best_lane, speed, width))
+
+    placed.sort(key=lambda item: (item[1], item[0]))
+    return placed, dropped, overlapped
+
+
+def build_layout(comments, stage, source_state=None):
+    placed, dropped, overlapped = schedule_lanes(comments, stage)
+    delays = [spawn - float(comments[i].get('start') or 0) for i, spawn, *_ in placed]
+    return {
+        'version': LAYOUT_VERSION,
+        'stage': dict(stage, lanes=lane_count(stage), speeds=SPEED_OPTIONS),
+        'source': source_state,
+        'count': len(comments),
+        'placed': len(placed),
+        'dropped': len(dropped),
+        'overlapped': len(overlapped),
+        'mean_spawn_delay': round(sum(delays) / len(delays), 3) if delays else 0,
+        'max_spawn_delay': round(max(delays), 3) if delays else 0,
+        'columns': {
+            'index': [i for i, *_ in placed],
+            'spawn': [round(spawn, 3) for _, spawn, *_ in placed],
+            'lane': [lane for _, _, lane, _, _ in placed],
+            'speed': [speed for *_, speed, _ in placed],
+            'width': [round(width, 1) for *_, width in placed],
+            'exit': [round(spawn + (stage['width'] + width) / speed, 3) for _, spawn, _, speed, width in placed],
+        },
+        'dropped_index': sorted(dropped),
+        'overlapped_index': sorted(overlapped),
+    }
+
+
+def _source_state(path):
+    st = path.stat()
+    return {'file': path.name, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def layout_is_current(folder_path, stage):
+    try:
+        with open(Path(folder_path) / LAYOUT_FILE_NAME, 'r', encoding='utf-8') as f:
+            layout = json.load(f)
+    except (OSError, ValueError):
+        return False
+    return (
+        layout.get('version') == LAYOUT_VERSION
+        and layout.get('source') == _source_state(Path(folder_path) / SOURCE_FILE_NAME)
+        and {key: layout.get('stage', {}).get(key) for key in stage} == stage
+    )
+
+
+def build_folder_layout(folder_path, stage=None, force=False):
+    """폴더의 danmaku_layout.json을 생성. 만든 레이아웃을 반환 (원본이 없거나 최신이면 None)"""
+    folder_path = Path(folder_path)
+    stage = dict(DEFAULT_STAGE, **(stage or {}))
+    source_path = folder_path / SOURCE_FILE_NAME
+    if not source_path.exists() or (not force and layout_is_current(folder_path, stage)):
+        return None
+
+    state = _source_state(source_path)
+    with open(source_path, 'r', encoding='utf-8') as f:
+        comments = json.load(f)
+    layout = build_layout(comments, stage, state)
+
+    target = folder_path / LAYOUT_FILE_NAME
+    tmp = target.with_name(f".{target.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(layout, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, target)
+    return layout
+
+
+def build_danmaku_layouts(folder_paths=None, stage=None, force=False, jobs=None, log=print):
+    """여러 데이터 폴더의 danmaku_layout.json을 병렬로 생성 (바뀐 폴더만)"""
+    if folder_paths is None:
+        folder_paths = sorted(p for p in DATA_DIR.iterdir() if p.is_dir()) if DATA_DIR.exists() else []
+    folder_paths = [p for p in folder_paths if (Path(p) / SOURCE_FILE_NAME).exists()]
+
+    def process(folder_path):
+        try:
+            return folder_path, build_folder_layout(folder_path, stage, force), None
+        except (OSError, ValueError) as e:
+            return folder_path, None, e
+
+    built = 0
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for folder_path, layout, error in executor.map(process, folder_paths):
+            if error is not None:
+                log(f"   ⚠️  {Path(folder_path).name}: 단무쿠 레이아웃 생성 실패: {error}")
+            elif layout is not None:
+                built += 1
+                log(
+                    f"   🛤️  {Path(folder_path).name}: {layout['placed']}/{layout['count']}개 배치, "
+                    f"겹침 {layout['overlapped']}개, 생략 {layout['dropped']}개, 평균 지연 {layout['mean_spawn_delay']}s (레인 {layout['stage']['lanes']}개)"
+                )
+    log(f"🛤️  단무쿠 레이아웃 완료: 대상 {len(folder_paths)}개, 새로 생성 {built}개")
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="단무쿠 댓글의 레인과 등장 시각을 미리 계산")
+    parser.add_argument('folders', nargs='*', type=Path, help="데이터 폴더 (기본: data/ 아래 전체)")
+    parser.add_argument('--width', type=int, default=DEFAULT_STAGE['width'], help="기준 화면 너비(px)")
+    parser.add_argument('--height', type=int, default=DEFAULT_STAGE['height'], help="기준 화면 높이(px)")
+    parser.add_argument('--lane-height', type=int, default=DEFAULT_STAGE['lane_height'], help="레인 높이(px)")
+    parser.add_argument('--gap', type=int, default=DEFAULT_STAGE['gap'], help="같은 레인 댓글 사이 최소 간격(px)")
+    parser.add_argument(
+        '--max-delay', type=float, default=DEFAULT_STAGE['max_delay'],
+        help="start 이후 등장을 미룰 수 있는 최대 시간(초), 넘으면 생략"
+    )
+    parser.add_argument(
+        '--overflow', choices=OVERFLOW_MODES, default=DEFAULT_STAGE['overflow'],
+        help="max-delay 안에 빈 레인이 없을 때: overlap(겹쳐서 표시, 기본) 또는 drop(생략)"
+    )
+    parser.add_argument('--force', action='store_true', help="원본이 바뀌지 않았어도 다시 생성")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 처리할 폴더 수")
+    args = parser.parse_args()
+
+    stage = {
+        'width': args.width,
+        'height': args.height,
+        'lane_height': args.lane_height,
+        'gap': args.gap,
+        'max_delay': args.max_delay,
+        'overflow': args.overflow,
+    }
+    build_danmaku_layouts(args.folders or None, stage, args.force, args.jobs)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,13 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터 폴더 이름 규칙 (<VIDEO_ID>_<filter>_<threshold>, 예: RQmqcaS5LIM_none_0.068).
+
+setup_data.py, get_data_folders.py, report_index.py가 같은 규칙으로 비디오 ID를 꺼내도록
+한 곳에 둡니다. 다른 스크립트를 import하지 않으므로 어디서든 가볍게 쓸 수 있습니다.
+"""
+
+
+def video_id_from_folder(folder_name):
+    """데이터 폴더 이름에서 VIDEO_ID를 꺼냄 (YouTube ID 안의 '_'는 유지)"""
+    return folder_name.rsplit('_', 2)[0]
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+"""
+Generate a balanced interface/data pairing schedule for any number of
+interfaces, datasets and positions, verify it, and write it as JSON.
+
+Pairing rows (which dataset each interface gets) are cyclic Latin rows
+``data = (row + step * interface) % datasets``; step 1 and step 2 reproduce the
+two FAIR_DATA_PERMUTATIONS blocks in config.js. Each (interface, dataset) pair
+appears exactly once per ``datasets`` rows.
+
+Presentation orders are optional. ``--orders williams`` adds a Williams design
+in which every interface appears once per position and every ordered pair of
+interfaces is adjacent equally often (2k rows when k is odd). Without it,
+config.js keeps shuffling the order per participant.
+
+The JSON is read by config.js (``CONFIG.pairingSchedulePath``),
+simulate_pair_distribution.py and simulate_sessions.py (``--schedule``).
+
+Example:
+    python generate_balanced_design.py --step 2 --output pairing_schedule.json
+    python generate_balanced_design.py --interfaces A B C D E F G H I J K L \\
+        --datasets 12 --orders williams --output -
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import re
+import sys
+from typing import Dict, List, Optional
+
+import numpy as np
+
+INTERFACE_ORDER = ['C', 'D', 'D1', 'Y', 'Y1']
+
+
+def latin_rows(n_interfaces: int, n_datasets: int, step: int = 1) -> np.ndarray:
+    """Return ``n_datasets`` cyclic rows assigning distinct datasets to interfaces."""
+    if n_interfaces > n_datasets:
+        raise ValueError(f'need at least {n_interfaces} datasets, got {n_datasets}')
+    if math.gcd(step, n_datasets) != 1:
+        raise ValueError(f'step {step} must be coprime with {n_datasets} datasets')
+    rows = np.arange(n_datasets)[:, None]
+    cols = np.arange(n_interfaces)[None, :]
+    return (rows + step * cols) % n_datasets
+
+
+def default_step(n_datasets: int) -> int:
+    """Smallest step >= 2 coprime with ``n_datasets`` (2 for odd counts, as in config.js); 1 below 3."""
+    if n_datasets < 3:
+        return 1
+    return next(step for step in range(2, n_datasets) if math.gcd(step, n_datasets) == 1)
+
+
+def williams_orders(n: int) -> np.ndarray:
+    """Return a Williams design: rows are presentation orders of interface indices."""
+    first = np.empty(n, dtype=np.int64)
+    first[0::2] = np.arange((n + 1) // 2)
+    first[1::2] = (n - np.arange(1, n // 2 + 1)) % n
+    orders = (first[None, :] + np.arange(n)[:, None]) % n
+    if n % 2:
+        orders = np.vstack([orders, orders[:, ::-1]])
+    return orders
+
+
+def _is_uniform(counts: np.ndarray) -> bool:
+    return bool(counts.size) and int(counts.min()) == int(counts.max())
+
+
+def check_rows_distinct(rows: np.ndarray) -> bool:
+    """Every row uses each value at most once."""
+    ordered = np.sort(rows, axis=1)
+    return bool((np.diff(ordered, axis=1) != 0).all())
+
+
+def verify_design(permutations: np.ndarray, n_datasets: int, orders: Optional[np.ndarray] = None) -> Dict[str, bool]:
+    """Check the balance properties of a schedule with NumPy counts."""
+    n_perm, k = permutations.shape
+    iface = np.broadcast_to(np.arange(k), permutations.shape)
+    pair_counts = np.bincount((iface * n_datasets + permutations).ravel(), minlength=k * n_datasets)
+    checks = {
+        'distinct_datasets': check_rows_distinct(permutations),
+        'pair_balanced': _is_uniform(pair_counts),
+    }
+    if orders is None:
+        return checks
+
+    n_order = len(orders)
+    positions = np.broadcast_to(np.arange(k), orders.shape)
+    position_counts = np.bincount((orders * k + positions).ravel(), minlength=k * k)
+    adjacent = orders[:, :-1] * k + orders[:, 1:]
+    carry_counts = np.bincount(adjacent.ravel(), minlength=k * k).reshape(k, k)
+    off_diagonal = carry_counts[~np.eye(k, dtype=bool)]
+
+    # One full cycle crosses every pairing row with every order
+    idx = np.arange(n_perm * n_order)
+    shown = np.take_along_axis(permutations[idx % n_perm], orders[(idx // n_perm) % n_order], axis=1)
+    position_data = np.bincount((positions[:1] * n_datasets + shown).ravel(), minlength=k * n_datasets)
+
+    checks.update(
+        {
+            'orders_are_permutations': check_rows_distinct(orders) and int(orders.max()) < k,
+            'position_balanced': _is_uniform(position_counts),
+            # a single interface has no adjacent pairs to balance
+            'carryover_balanced': (k == 1 or _is_uniform(off_diagonal)) and not carry_counts.diagonal().any(),
+            'position_data_balanced': _is_uniform(position_data),
+        }
+    )
+    return checks
+
+
+def build_schedule(
+    interfaces: List[str],
+    n_datasets: int,
+    step: int,
+    orders: str,
+) -> Dict[str, object]:
+    permutations = latin_rows(len(interfaces), n_datasets, step)
+    order_rows = williams_orders(len(interfaces)) if orders == 'williams' else None
+    checks = verify_design(permutations, n_datasets, order_rows)
+    schedule: Dict[str, object] = {
+        'interfaces': interfaces,
+        'datasets': n_datasets,
+        'step': step,
+        'permutations': permutations.tolist(),
+        'cycle': len(permutations) * (len(order_rows) if order_rows is not None else 1),
+        'checks': checks,
+    }
+    if order_rows is not None:
+        schedule['orders'] = order_rows.tolist()
+    return schedule
+
+
+def dumps_schedule(schedule: Dict[str, object]) -> str:
+    """Serialize with one permutation/order per line so the file stays readable."""
+    text = json.dumps(schedule, ensure_ascii=False, indent=2)
+    return re.sub(r'\[\s+([\d,\s]+?)\s+\]', lambda m: '[' + ' '.join(m.group(1).split()) + ']', text)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a balanced interface/data pairing schedule.')
+    parser.add_argument(
+        '--interfaces',
+        nargs='+',
+        default=INTERFACE_ORDER,
+        help='Interface codes in config.js order (default: C D D1 Y Y1)',
+    )
+    parser.add_argument('--datasets', type=int, default=None, help='Number of datasets (default: number of interfaces)')
+    parser.add_argument(
+        '--step',
+        type=int,
+        default=None,
+        help='Cyclic step for pairing rows (default: smallest step >= 2 coprime with --datasets)',
+    )
+    parser.add_argument(
+        '--orders',
+        choices=('shuffle', 'williams'),
+        default='shuffle',
+        help='Presentation orders: shuffle per participant (default) or a Williams design',
+    )
+    parser.add_argument('--output', default='pairing_schedule.json', help="Output JSON path ('-' for stdout)")
+    args = parser.parse_args()
+
+    n_datasets = args.datasets or len(args.interfaces)
+    step = args.step if args.step is not None else default_step(n_datasets)
+    try:
+        schedule = build_schedule(args.interfaces, n_datasets, step, args.orders)
+    except ValueError as e:
+        parser.error(str(e))
+
+    failed = [name for name, ok in schedule['checks'].items() if not ok]
+    text = dumps_schedule(schedule)
+    if args.output == '-':
+        sys.stdout.write(text + '\n')
+    else:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+        print(f'Wrote {len(schedule["permutations"])} pairing rows to {args.output} (cycle {schedule["cycle"]})')
+    if failed:
+        print(f'Balance checks failed: {", ".join(failed)}', file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
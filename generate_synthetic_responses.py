@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+supabase_analysis.py의 확장성 측정을 위해 survey_responses와 같은 형태의
+가상 응답 레코드를 생성합니다.
+
+final.html의 submitToSupabase()가 저장하는 구조(name/age/gender, question_scores의
+인터페이스별 dataFolder/htmlFile/dataPath/scores와 _pairing_info, preferred_interface,
+preferred_reason, created_at)를 그대로 따르며, 인터페이스-데이터 매핑은
+config.js와 같은 FAIR_DATA_PERMUTATIONS 순환 일정을 사용합니다.
+
+사용 예시:
+    python generate_synthetic_responses.py --participants 10000 --output synthetic.jsonl
+    python supabase_analysis.py stats --source synthetic.jsonl
+"""
+
+import argparse
+import json
+import random
+import sys
+import uuid
+from collections.abc import Iterator
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+INTERFACE_ORDER = ["C", "D", "D1", "Y", "Y1"]
+QUESTION_ORDER = ["Q1", "Q2", "Q3", "Q4"]
+INTERFACE_FILES = {
+    "C": "comvi_ui_default.html",
+    "Y": "youtube_ui.html",
+    "Y1": "youtube_ui_one.html",
+    "D": "danmaku_ui_default.html",
+    "D1": "danmaku_ui_one_default.html",
+}
+FAIR_DATA_PERMUTATIONS = [
+    [0, 2, 4, 1, 3],
+    [1, 3, 0, 2, 4],
+    [2, 4, 1, 3, 0],
+    [3, 0, 2, 4, 1],
+    [4, 1, 3, 0, 2],
+]
+DATA_BASE_PATH = "data"
+
+# 인터페이스별 질문 평균 (7점 척도, Q1/Q2는 부담이므로 낮을수록 좋음)
+INTERFACE_MEANS = {
+    "C": [2.8, 2.4, 5.6, 5.5],
+    "D": [4.6, 3.9, 4.0, 4.3],
+    "D1": [4.1, 3.5, 4.3, 4.5],
+    "Y": [3.6, 3.8, 3.4, 4.0],
+    "Y1": [3.3, 3.6, 3.7, 3.9],
+}
+PREFERENCE_WEIGHTS = {"C": 0.42, "D": 0.12, "D1": 0.16, "Y": 0.14, "Y1": 0.16}
+
+FAMILY_NAMES = ["김", "이", "박", "최", "정", "강", "조", "윤", "장", "임", "한", "오", "서", "신", "권"]
+GIVEN_NAMES = ["민준", "서연", "지호", "하은", "도윤", "지우", "예준", "수아", "시우", "지민", "현우", "유진", "준서", "채원"]
+GENDER_ANSWERS = ["남", "여", "남자", "여자", "M", "F", "male", "female", ""]
+REASON_OPENERS = [
+    "영상을 보면서 댓글을 함께 읽기가 가장 편했습니다.",
+    "장면과 관련된 댓글이 바로 나와서 몰입이 잘 됐어요.",
+    "다른 인터페이스보다 화면이 덜 복잡하게 느껴졌습니다.",
+    "댓글을 직접 찾아볼 필요가 없어서 좋았습니다.",
+    "스크롤을 조작하지 않아도 되어서 신체적인 부담이 적었습니다.",
+]
+REASON_DETAILS = [
+    "특히 웃긴 장면에서 다른 사람들의 반응을 같이 볼 수 있어서 재미있었고",
+    "댓글이 너무 빠르게 지나가지 않아서 끝까지 읽을 수 있었고",
+    "영상 하단에 댓글이 정리되어 있어서 시선이 분산되지 않았고",
+    "댓글 내용이 지금 나오는 장면과 잘 맞아서 이해가 쉬웠고",
+    "화면을 가리는 댓글이 없어서 영상 내용에 집중할 수 있었고",
+    "필요할 때만 댓글을 확인할 수 있어서 편했고",
+]
+REASON_CLOSERS = [
+    "다음에도 이런 방식으로 댓글을 보고 싶습니다.",
+    "전체적으로 가장 만족스러운 경험이었습니다.",
+    "다른 방식은 댓글이 많을 때 정신없게 느껴졌습니다.",
+    "영상 시청 경험이 훨씬 풍부해진 느낌이었습니다.",
+]
+
+
+def load_data_folders(path: Path, expected: int = len(INTERFACE_ORDER)) -> list[str]:
+    """data_folders.json에서 앞의 expected개 폴더를 읽고, 없으면 임시 이름을 사용합니다."""
+    if path.exists():
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+            if isinstance(data, list) and len(data) >= expected:
+                return data[:expected]
+        except json.JSONDecodeError:
+            pass
+    return [f"dataset_{idx}" for idx in range(expected)]
+
+
+def _likert(rng: random.Random, mean: float) -> int:
+    return max(1, min(7, round(rng.gauss(mean, 1.3))))
+
+
+def _reason(rng: random.Random) -> str:
+    details = " ".join(rng.sample(REASON_DETAILS, rng.randint(2, len(REASON_DETAILS))))
+    return f"{rng.choice(REASON_OPENERS)} {details} {rng.choice(REASON_CLOSERS)}"
+
+
+def generate_records(
+    participants: int,
+    data_folders: list[str],
+    seed: int = 0,
+    start: datetime | None = None,
+) -> Iterator[dict]:
+    """가상 응답 레코드를 하나씩 생성합니다. 같은 seed면 항상 같은 결과를 냅니다."""
+    rng = random.Random(seed)
+    created = start or datetime(2025, 11, 27, 15, 0, tzinfo=timezone.utc)
+    preferred_codes = list(PREFERENCE_WEIGHTS)
+    preferred_weights = list(PREFERENCE_WEIGHTS.values())
+
+    for person in range(participants):
+        permutation_index = person
+        permutation = FAIR_DATA_PERMUTATIONS[permutation_index % len(FAIR_DATA_PERMUTATIONS)]
+        sequence = [
+            {
+                "interface": interface,
+                "dataFolder": data_folders[permutation[idx] % len(data_folders)],
+                "htmlFile": INTERFACE_FILES[interface],
+            }
+            for idx, interface in enumerate(INTERFACE_ORDER)
+        ]
+        rng.shuffle(sequence)
+
+        # 참가자마다 전반적으로 점수를 후하게/짜게 주는 경향을 둠
+        leniency = rng.gauss(0, 0.6)
+        question_scores = {}
+        for pair in sequence:
+            interface = pair["interface"]
+            question_scores[interface] = {
+                "dataFolder": pair["dataFolder"],
+                "htmlFile": pair["htmlFile"],
+                "dataPath": f"{DATA_BASE_PATH}/{pair['dataFolder']}/{pair['htmlFile']}",
+                "scores": {
+                    question: _likert(rng, mean + leniency)
+                    for question, mean in zip(QUESTION_ORDER, INTERFACE_MEANS[interface])
+                },
+            }
+        question_scores["_pairing_info"] = {
+            "permutation_index": permutation_index,
+            "permutation_number": permutation_index + 1,
+            "sequence": sequence,
+        }
+
+        created += timedelta(seconds=rng.expovariate(1 / 90))
+        yield {
+            "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+            "created_at": created.isoformat(timespec="milliseconds"),
+            "name": rng.choice(FAMILY_NAMES) + rng.choice(GIVEN_NAMES),
+            "age": rng.randint(19, 45),
+            "gender": rng.choice(GENDER_ANSWERS),
+            "question_scores": question_scores,
+            "preferred_interface": rng.choices(preferred_codes, preferred_weights)[0],
+            "preferred_reason": _reason(rng),
+        }
+
+
+def write_jsonl(records, output: str) -> int:
+    handle = sys.stdout if output == "-" else open(output, "w", encoding="utf-8")
+    count = 0
+    try:
+        for record in records:
+            handle.write(json.dumps(record, ensure_ascii=False))
+            handle.write("\n")
+            count += 1
+    finally:
+        if handle is not sys.stdout:
+            handle.close()
+    return count
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="가상 survey_responses 레코드 생성")
+    parser.add_argument("--participants", type=int, default=1000, help="생성할 참가자 수 (기본: 1000)")
+    parser.add_argument("--seed", type=int, default=0, help="난수 시드 (기본: 0)")
+    parser.add_argument("--data-folders", type=Path, default=Path("data_folders.json"), help="data_folders.json 경로")
+    parser.add_argument("--output", default="-", help="출력 JSONL 경로 ('-'이면 표준 출력)")
+    args = parser.parse_args()
+
+    data_folders = load_data_folders(args.data_folders)
+    count = write_jsonl(generate_records(args.participants, data_folders, seed=args.seed), args.output)
+    if args.output != "-":
+        print(f"[INFO] {count}개 레코드를 {args.output}에 저장했습니다.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,53 @@
 #!/usr/bin/env python3
 """
 config.js의 dataBasePath에 지정된 경로 내의 하위 폴더 목록을 JSON 파일로 생성하는 스크립트
-이 스크립트를 실행하면 data_folders.json 파일이 생성됩니다.
+이 스크립트를 실행하면 data_folders.json과 data_catalog.json 파일이 생성됩니다.
 config.js의 dataBasePath를 자동으로 읽어옵니다.
+
+data_folders.json은 기존과 같은 폴더 이름 배열이고, data_catalog.json은 폴더별 정보를 담은 인덱스입니다.
+    {
+      "version": 1,
+      "interfaces": {"C": "comvi_ui_default.html", ...},   # config.js의 CONFIG.interfaces
+      "folders": ["폴더1", ...],                             # data_folders.json과 같은 목록
+      "datasets": [
+        {"name": ..., "video_id": ..., "valid": true,
+         "interfaces": ["C", ...], "missing": [],
+         "comments": {"danmaku": 1927, "optimal": 54}, "span": [0, 224],
+         "bytes": {"total": ..., "html": ..., "json": ...},
+         "video": {"src": "../../video/<id>.mp4", "exists": true, "bytes": ...},
+         "state": "<파일 크기/mtime 지문>"}
+      ]
+    }
+config.js의 loadDataFolders()는 data_folders.json의 순서를 그대로 쓰고, 이 파일로 실험 폴더가 valid인지 검사합니다.
+카탈로그는 이 환경의 파일 크기/mtime을 담으므로 커밋하지 않습니다 (.gitignore).
+폴더는 os.scandir로 훑고 스레드 풀에서 병렬로 처리하며, 파일 크기/mtime 지문이 같은 폴더는
+이전 data_catalog.json의 항목을 그대로 씁니다.
+
+사용 예시:
+    python3 get_data_folders.py
+    python3 get_data_folders.py --force --jobs 16
 """
 import os
 import json
 import re
+import argparse
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
 from pathlib import Path
 
+from folder_names import video_id_from_folder
+from setup_data import VIDEO_DIR
+from verify_data import MEDIA_SRC_PATTERN, load_config, resolve_media_path
+
 # 현재 스크립트의 디렉토리
 SCRIPT_DIR = Path(__file__).parent
+FOLDERS_FILE = SCRIPT_DIR / 'data_folders.json'
+CATALOG_FILE = SCRIPT_DIR / 'data_catalog.json'
+CATALOG_VERSION = 1
+# <source src>는 HTML 앞부분에 있으므로 이만큼만 읽음
+HTML_HEAD_BYTES = 64 * 1024
+COMMENT_FILES = {'danmaku': 'danmaku.json', 'optimal': 'optimal.json'}
 
 def get_data_base_path_from_config():
     """config.js에서 dataBasePath를 읽어옵니다"""
@@ -57,17 +94,189 @@ def get_data_folders():
         return []
     
     # 하위 폴더만 필터링 (파일 제외)
-    folders = [
-        item.name for item in DATA_BASE_PATH.iterdir()
-        if item.is_dir() and not item.name.startswith('.')
-    ]
+    with os.scandir(DATA_BASE_PATH) as entries:
+        folders = [
+            entry.name for entry in entries
+            if entry.is_dir() and not entry.name.startswith('.')
+        ]
     
     # 정렬
     folders.sort()
     
     return folders
 
+def scan_folder(folder_path):
+    """os.scandir로 폴더를 재귀적으로 훑어 ({상대 경로: (크기, mtime_ns)}, 지문)을 반환 (숨김 파일 제외)"""
+    files = {}
+    stack = [(Path(folder_path), '')]
+    while stack:
+        directory, prefix = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith('.'):
+                    continue
+                rel = f"{prefix}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((Path(entry.path), f"{rel}/"))
+                elif entry.is_file():
+                    st = entry.stat()
+                    files[rel] = (st.st_size, st.st_mtime_ns)
+    digest = hashlib.sha1()
+    for rel in sorted(files):
+        digest.update(f"{rel}\0{files[rel][0]}\0{files[rel][1]}\n".encode('utf-8'))
+    return files, digest.hexdigest()
+
+def read_comment_stats(folder_path):
+    """danmaku.json / optimal.json의 댓글 수와 시간 범위 [처음 start, 마지막 end]"""
+    counts = {}
+    starts = []
+    ends = []
+    problems = []
+    for key, file_name in COMMENT_FILES.items():
+        path = Path(folder_path) / file_name
+        if not path.exists():
+            problems.append(f"{file_name} 없음")
+            continue
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                comments = json.load(f)
+        except (OSError, ValueError) as e:
+            problems.append(f"{file_name} 파싱 실패: {e}")
+            continue
+        if not isinstance(comments, list):
+            problems.append(f"{file_name}이 배열이 아님")
+            continue
+        counts[key] = len(comments)
+        for comment in comments:
+            if not isinstance(comment, dict):
+                continue
+            try:
+                start = float(comment.get('start'))
+            except (TypeError, ValueError):
+                continue
+            starts.append(start)
+            try:
+                ends.append(float(comment.get('end', start)))
+            except (TypeError, ValueError):
+                ends.append(start)
+    span = [min(starts), max(ends)] if starts else None
+    return counts, span, problems
+
+def describe_video(folder_path, html_files, root, video_dir):
+    """인터페이스 HTML의 <source src>로 비디오 정보를 만듦 (비디오 폴더를 모르면 exists는 None)"""
+    video_known = video_dir is not None or (root / 'video').is_dir()
+    for html_file in html_files:
+        with open(Path(folder_path) / html_file, 'rb') as f:
+            head = f.read(HTML_HEAD_BYTES).decode('utf-8', errors='replace')
+        match = MEDIA_SRC_PATTERN.search(head)
+        if not match:
+            continue
+        src = match.group(1)
+        base_url = os.path.relpath(Path(folder_path).resolve(), root).replace(os.sep, '/')
+        path = resolve_media_path(src, f"/{base_url}/{html_file}", root, video_dir)
+        if path is None or (not video_known and path.is_relative_to(root / 'video')):
+            return {'src': src, 'exists': None, 'bytes': None}
+        exists = path.is_file()
+        return {'src': src, 'exists': exists, 'bytes': path.stat().st_size if exists else None}
+    return {'src': None, 'exists': False, 'bytes': None}
+
+def describe_dataset(folder_path, interfaces, root, video_dir):
+    """폴더 하나의 카탈로그 항목을 만듦"""
+    folder_path = Path(folder_path)
+    files, state = scan_folder(folder_path)
+    available = [key for key, html_file in interfaces.items() if html_file in files]
+    missing = [key for key in interfaces if key not in available]
+    counts, span, problems = read_comment_stats(folder_path)
+    video = describe_video(folder_path, [interfaces[key] for key in available], root, video_dir)
+    
+    if missing:
+        problems.append(f"인터페이스 HTML 없음: {', '.join(missing)}")
+    if video['exists'] is False:
+        problems.append(f"비디오 없음: {video['src']}")
+    
+    sizes = {'total': 0, 'html': 0, 'json': 0}
+    for rel, (size, _) in files.items():
+        sizes['total'] += size
+        suffix = Path(rel).suffix
+        if '/' not in rel and suffix in ('.html', '.json'):
+            sizes[suffix[1:]] += size
+    
+    return {
+        'name': folder_path.name,
+        'video_id': video_id_from_folder(folder_path.name),
+        'valid': not problems,
+        'problems': problems,
+        'interfaces': available,
+        'missing': missing,
+        'comments': counts,
+        'span': span,
+        'bytes': sizes,
+        'video': video,
+        'state': state,
+    }
+
+def load_catalog(path=CATALOG_FILE):
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            catalog = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(catalog, dict) or catalog.get('version') != CATALOG_VERSION:
+        return None
+    return catalog
+
+def build_catalog(data_base_path, interfaces, folder_names, previous=None, video_dir=None, jobs=None, force=False):
+    """폴더들을 병렬로 훑어 카탈로그를 만들고 (카탈로그, 다시 계산한 폴더 수)를 반환"""
+    root = SCRIPT_DIR.resolve()
+    if video_dir is not None:
+        video_dir = Path(video_dir).resolve()
+        # retest 안의 video/는 serve.py가 그대로 서빙함
+        if video_dir == root / 'video':
+            video_dir = None
+    
+    cached = {}
+    if previous and not force and previous.get('interfaces') == interfaces \
+            and previous.get('video_dir') == (str(video_dir) if video_dir else None):
+        cached = {entry['name']: entry for entry in previous.get('datasets', [])}
+    
+    def process(folder_name):
+        folder_path = Path(data_base_path) / folder_name
+        entry = cached.get(folder_name)
+        if entry is not None:
+            _, state = scan_folder(folder_path)
+            # 폴더가 그대로여도 비디오는 밖에 있으므로 따로 확인
+            html_files = [interfaces[key] for key in entry.get('interfaces', [])]
+            if state == entry.get('state') and describe_video(folder_path, html_files, root, video_dir) == entry.get('video'):
+                return entry, False
+        return describe_dataset(folder_path, interfaces, root, video_dir), True
+    
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        results = list(executor.map(process, folder_names))
+    
+    catalog = {
+        'version': CATALOG_VERSION,
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'interfaces': interfaces,
+        'video_dir': str(video_dir) if video_dir else None,
+        'folders': list(folder_names),
+        'datasets': [entry for entry, _ in results],
+    }
+    return catalog, sum(rebuilt for _, rebuilt in results)
+
+def write_json_atomic(path, data, **kwargs):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, **kwargs)
+    os.replace(tmp, path)
+
 def main():
+    parser = argparse.ArgumentParser(description="data_folders.json과 데이터셋 카탈로그(data_catalog.json) 생성")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 처리할 폴더 수 (기본: CPU 수 기반, 최대 8)")
+    parser.add_argument('--force', action='store_true', help="바뀌지 않은 폴더도 다시 계산")
+    parser.add_argument('--video-dir', type=Path, default=None, help="/video/로 연결되는 비디오 폴더 (기본: setup_data.py 탐색 결과)")
+    args = parser.parse_args()
+    
     if DATA_BASE_PATH is None:
         print("오류: dataBasePath를 찾을 수 없습니다.")
         return
@@ -83,14 +292,26 @@ def main():
         return
     
     # JSON 파일로 저장
-    output_file = SCRIPT_DIR / 'data_folders.json'
-    with open(output_file, 'w', encoding='utf-8') as f:
-        json.dump(folders, f, ensure_ascii=False, indent=2)
+    write_json_atomic(FOLDERS_FILE, folders, indent=2)
     
     print(f"✅ {len(folders)}개의 폴더를 찾았습니다:")
     for folder in folders:
         print(f"  - {folder}")
-    print(f"\n📄 결과가 {output_file}에 저장되었습니다.")
+    print(f"\n📄 결과가 {FOLDERS_FILE}에 저장되었습니다.")
+    
+    interfaces, _ = load_config()
+    catalog, rebuilt = build_catalog(
+        DATA_BASE_PATH, interfaces, folders, previous=load_catalog(),
+        video_dir=args.video_dir or VIDEO_DIR, jobs=args.jobs, force=args.force
+    )
+    write_json_atomic(CATALOG_FILE, catalog, indent=1)
+    
+    valid = [entry for entry in catalog['datasets'] if entry['valid']]
+    print(f"🗂️  카탈로그: {len(valid)}/{len(folders)}개 데이터셋 사용 가능 (다시 계산 {rebuilt}개)")
+    for entry in catalog['datasets']:
+        if not entry['valid']:
+            print(f"  ⚠️  {entry['name']}: {'; '.join(entry['problems'])}")
+    print(f"📄 카탈로그가 {CATALOG_FILE}에 저장되었습니다.")
 
 if __name__ == '__main__':
     main()
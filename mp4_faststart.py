@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ffmpeg 없이 MP4의 moov 박스를 mdat 앞으로 옮기는 faststart 변환기입니다.
+
+moov가 파일 끝에 있으면 브라우저는 파일 대부분을 받은 뒤에야 재생을 시작합니다.
+최상위 박스 구조를 읽어 moov를 첫 mdat 앞에 두고, moov/trak/mdia/minf/stbl 안의
+stco/co64 청크 오프셋을 옮겨진 만큼 보정합니다. 보정 후 32비트 범위를 넘는 stco는
+co64로 바꿉니다. 결과는 임시 파일에 쓴 뒤 rename으로 교체하며, 이미 moov가 앞에
+있는 파일은 건드리지 않습니다.
+
+사용 예시:
+    python3 mp4_faststart.py preview/*.MP4
+    python3 mp4_faststart.py --check ../video/*.mp4
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+from pathlib import Path
+
+# stco/co64까지 내려가는 경로의 컨테이너 박스 (그 외 박스는 내용을 그대로 보존)
+CONTAINER_BOXES = {b'moov', b'trak', b'mdia', b'minf', b'stbl'}
+COPY_CHUNK_SIZE = 4 * 1024 * 1024
+UINT32_MAX = 0xFFFFFFFF
+
+
+class MP4Error(ValueError):
+    pass
+
+
+def iter_boxes(read_at, start, end):
+    """[start, end) 구간의 박스를 (type, offset, size, header_size)로 순회"""
+    offset = start
+    while offset + 8 <= end:
+        header = read_at(offset, 16)
+        size, box_type = struct.unpack('>I4s', header[:8])
+        header_size = 8
+        if size == 1:
+            if len(header) < 16:
+                raise MP4Error(f"잘린 64비트 박스 헤더 (offset {offset})")
+            size = struct.unpack('>Q', header[8:16])[0]
+            header_size = 16
+        elif size == 0:
+            size = end - offset
+        if size < header_size or offset + size > end:
+            raise MP4Error(f"잘못된 박스 크기: {box_type!r} (offset {offset}, size {size})")
+        yield box_type, offset, size, header_size
+        offset += size
+
+
+def read_top_level_boxes(f):
+    file_size = os.fstat(f.fileno()).st_size
+
+    def read_at(offset, length):
+        f.seek(offset)
+        return f.read(length)
+
+    return list(iter_boxes(read_at, 0, file_size)), file_size
+
+
+class Box:
+    """moov 트리의 박스. 컨테이너면 children을, 아니면 payload를 가짐"""
+
+    def __init__(self, box_type, payload=None, children=None, large=False):
+        self.type = box_type
+        self.payload = payload
+        self.children = children
+        self.large = large
+
+    @classmethod
+    def parse(cls, data, box_type, header_size):
+        body = data[header_size:]
+        large = header_size == 16
+        if box_type not in CONTAINER_BOXES:
+            return cls(box_type, payload=body, large=large)
+
+        def read_at(offset, length):
+            return body[offset:offset + length]
+
+        children = [
+            cls.parse(body[offset:offset + size], child_type, child_header)
+            for child_type, offset, size, child_header in iter_boxes(read_at, 0, len(body))
+        ]
+        return cls(box_type, children=children, large=large)
+
+    def body_size(self):
+        if self.children is None:
+            return len(self.payload)
+        return sum(child.size() for child in self.children)
+
+    def size(self):
+        body = self.body_size()
+        large = self.large or body + 8 > UINT32_MAX
+        return body + (16 if large else 8)
+
+    def serialize(self, out):
+        body = self.body_size()
+        if self.large or body + 8 > UINT32_MAX:
+            out.append(struct.pack('>I4sQ', 1, self.type, body + 16))
+        else:
+            out.append(struct.pack('>I4s', body + 8, self.type))
+        if self.children is None:
+            out.append(self.payload)
+        else:
+            for child in self.children:
+                child.serialize(out)
+
+    def walk(self):
+        yield self
+        for child in self.children or ():
+            yield from child.walk()
+
+
+def _read_chunk_offsets(box):
+    version_flags, count = struct.unpack('>II', box.payload[:8])
+    fmt = 'I' if box.type == b'stco' else 'Q'
+    offsets = list(struct.unpack(f'>{count}{fmt}', box.payload[8:8 + count * struct.calcsize(fmt)]))
+    return version_flags, offsets
+
+
+def _write_chunk_offsets(box, version_flags, offsets, use_co64):
+    box.type = b'co64' if use_co64 else b'stco'
+    fmt = 'Q' if use_co64 else 'I'
+    box.payload = struct.pack(f'>II{len(offsets)}{fmt}', version_flags, len(offsets), *offsets)
+
+
+def relocate_moov(moov, insert_at, moov_offset, moov_size):
+    """moov를 insert_at으로 옮겼을 때의 청크 오프셋을 반영하고 새 moov 크기를 반환
+
+    [insert_at, moov_offset) 구간의 데이터는 새 moov 크기만큼 뒤로 밀리고, 옛 moov 뒤의
+    데이터는 새 moov와 옛 moov의 크기 차이만큼 밀립니다. stco가 32비트를 넘으면 co64로
+    바꾸고, 그에 따라 moov 크기가 달라지므로 크기가 더 이상 변하지 않을 때까지 반복합니다.
+    """
+    moov_end = moov_offset + moov_size
+    tables = []
+    for box in moov.walk():
+        if box.type in (b'stco', b'co64'):
+            version_flags, offsets = _read_chunk_offsets(box)
+            tables.append((box, version_flags, offsets))
+
+    upgrade = set()
+    while True:
+        shift = moov.size()
+        for index, (box, version_flags, offsets) in enumerate(tables):
+            moved = [
+                o + shift if insert_at <= o < moov_offset
+                else o + shift - moov_size if o >= moov_end
+                else o
+                for o in offsets
+            ]
+            use_co64 = box.type == b'co64' or index in upgrade
+            if not use_co64 and moved and max(moved) > UINT32_MAX:
+                upgrade.add(index)
+                use_co64 = True
+            _write_chunk_offsets(box, version_flags, moved, use_co64)
+        if moov.size() == shift:
+            return shift
+        # co64로 바뀌어 크기가 달라졌으면 원래 오프셋으로 다시 계산
+        for box, version_flags, offsets in tables:
+            _write_chunk_offsets(box, version_flags, offsets, box.type == b'co64')
+
+
+def inspect_layout(path):
+    """(상태, 설명)을 반환. 상태: 'faststart' | 'needs-faststart' | 'unsupported'"""
+    with open(path, 'rb') as f:
+        boxes, _ = read_top_level_boxes(f)
+    types = [box_type for box_type, *_ in boxes]
+    if b'moov' not in types or b'mdat' not in types:
+        return 'unsupported', "moov 또는 mdat 박스가 없습니다"
+    if b'moof' in types:
+        return 'unsupported', "fragmented MP4는 이미 스트리밍 가능한 구조입니다"
+    if types.index(b'moov') < types.index(b'mdat'):
+        return 'faststart', "moov가 이미 mdat 앞에 있습니다"
+    return 'needs-faststart', "moov가 mdat 뒤에 있습니다"
+
+
+def _copy_range(src, dst, start, end):
+    src.seek(start)
+    remaining = end - start
+    while remaining > 0:
+        chunk = src.read(min(COPY_CHUNK_SIZE, remaining))
+        if not chunk:
+            raise MP4Error("파일이 예상보다 짧습니다")
+        dst.write(chunk)
+        remaining -= len(chunk)
+
+
+def optimize_mp4(path):
+    """path를 faststart 구조로 바꾸고 (상태, 설명)을 반환. 상태: 'optimized' | inspect_layout 상태"""
+    path = Path(path)
+    status, message = inspect_layout(path)
+    if status != 'needs-faststart':
+        return status, message
+
+    with open(path, 'rb') as f:
+        boxes, file_size = read_top_level_boxes(f)
+        mdat_offset = next(offset for box_type, offset, *_ in boxes if box_type == b'mdat')
+        _, moov_offset, moov_size, moov_header = next(box for box in boxes if box[0] == b'moov')
+        f.seek(moov_offset)
+        moov = Box.parse(f.read(moov_size), b'moov', moov_header)
+        if any(box.type == b'cmov' for box in moov.walk()):
+            return 'unsupported', "압축된 moov(cmov)는 지원하지 않습니다"
+
+        new_moov_size = relocate_moov(moov, mdat_offset, moov_offset, moov_size)
+        parts = []
+        moov.serialize(parts)
+
+        tmp_path = path.with_name(f".{path.name}.faststart-tmp")
+        try:
+            with open(tmp_path, 'wb') as out:
+                _copy_range(f, out, 0, mdat_offset)
+                for part in parts:
+                    out.write(part)
+                _copy_range(f, out, mdat_offset, moov_offset)
+                _copy_range(f, out, moov_offset + moov_size, file_size)
+            # 크기는 그대로이므로 mtime을 새로 남겨야 serve.py의 ETag가 바뀜
+            shutil.copymode(path, tmp_path)
+            os.replace(tmp_path, path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+
+    return 'optimized', f"moov {moov_size}B → {new_moov_size}B를 offset {mdat_offset}으로 이동"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="MP4 moov 박스를 파일 앞으로 옮김 (faststart)")
+    parser.add_argument('files', nargs='+', type=Path, help="변환할 MP4 파일")
+    parser.add_argument('--check', action='store_true', help="변환하지 않고 상태만 출력")
+    args = parser.parse_args()
+
+    failed = 0
+    for path in args.files:
+        try:
+            status, message = inspect_layout(path) if args.check else optimize_mp4(path)
+        except (OSError, MP4Error) as e:
+            status, message = 'error', str(e)
+            failed += 1
+        print(f"[{status}] {path}: {message}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터 폴더의 logs/process_YYYYMMDD_HHMMSS.log 를 모두 읽어 전처리 단계별 소요 시간을 정리합니다.
+
+각 로그는 "Downloading comments...", "Extracting keyframes...", "Computation time: ...",
+"Creating ComVi UI..." 같은 고정 메시지를 남기므로, 단계 표식(STAGE_MARKERS)이 처음 나온 시각부터
+다음 표식이 나온 시각까지를 그 단계의 시간으로 봅니다. 실행마다
+    - 상태: ok(완료) / truncated(완료 메시지 없이 끝남, 예: 19줄 로그) / failed(ERROR/Traceback)
+    - 마지막으로 도달한 단계, 댓글 수, 파라미터, 로그가 직접 보고한 Computation time/총 시간
+을 기록하고, 완료된 실행만으로 단계별 백분위수와 댓글 수 대비 선형 회귀(1천 개당 초, R²)를 계산합니다.
+
+출력 (--output-dir, 기본 log_stats/):
+    runs.csv           실행 1건당 1행 (단계별 초 단위 열 포함)
+    stage_summary.csv  단계별 count / mean / p50 / p90 / p95 / p99 / max / 비중 / 회귀
+    summary.json       위 요약과 상태별 실행 수
+
+사용 예시:
+    python pipeline_log_stats.py
+    python pipeline_log_stats.py --data-dir /path/to/output/1127 --output-dir log_stats --jobs 8
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+DEFAULT_DATA_DIR = SCRIPT_DIR / "data"
+DEFAULT_OUTPUT_DIR = SCRIPT_DIR / "log_stats"
+LOG_GLOB = "process_*.log"
+PERCENTILES = [50, 90, 95, 99]
+
+# (단계 이름, 단계 시작을 알리는 메시지) - 로그에 나오는 순서
+STAGE_MARKERS = [
+    ("setup", "Starting processing for video ID"),
+    ("download_comments", "Downloading comments..."),
+    ("download_video", "Downloading YouTube video..."),
+    ("download_srt", "Attempting to download SRT file..."),
+    ("generate_srt", "Generating SRT file..."),
+    ("keyframes", "Extracting keyframes..."),
+    ("captions", "Extracting video captions..."),
+    ("load_inputs", "Optimizing phase"),
+    ("filter_comments", "Starting comment optimization..."),
+    # 모델 로드 + 임베딩 + 최적화 (로그의 Computation time과 거의 같음)
+    ("optimization", "Load pretrained SentenceTransformer"),
+    ("danmaku_data", "Creating danmaku data..."),
+    ("save_results", "Saving results..."),
+    ("ui_comvi", "Creating ComVi UI..."),
+    ("ui_youtube", "Creating YouTube UI..."),
+]
+END_MARKER = "Processing completed successfully"
+STAGE_NAMES = [name for name, _ in STAGE_MARKERS]
+
+LINE_PATTERN = re.compile(r"^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2},\d{3}) - (\w+) - (.*)$")
+VALUE_PATTERNS = {
+    "video_id": re.compile(r"Starting processing for video ID: (\S+)"),
+    "parameters": re.compile(r"Parameters: (.+)$"),
+    "comment_count": re.compile(r"Comment count: ([\d,]+)"),
+    "candidate_count": re.compile(r"Comments count: (\d+)"),
+    "device": re.compile(r"device_name: (\S+)"),
+    "model": re.compile(r"Load pretrained SentenceTransformer: (\S+)"),
+    "computation_time": re.compile(r"Computation time: ([\d.]+)"),
+    "danmaku_count": re.compile(r"Danmaku data saved: (\d+) comments"),
+    "reported_total": re.compile(r"✅ ([\d.]+) !+$"),
+}
+INT_FIELDS = {"comment_count", "candidate_count", "danmaku_count"}
+FLOAT_FIELDS = {"computation_time", "reported_total"}
+FAILURE_PATTERN = re.compile(r"Traceback|\bERROR\b|\bCRITICAL\b|Exception")
+
+
+def _parse_time(text: str) -> datetime:
+    return datetime.strptime(text, "%Y-%m-%d %H:%M:%S,%f")
+
+
+def parse_log(path: str | Path) -> dict:
+    """로그 하나를 실행 기록(dict)으로 변환"""
+    path = Path(path)
+    run: dict = {
+        "folder": path.parent.parent.name,
+        "log": path.name,
+        "lines": 0,
+        "status": "truncated",
+        "last_stage": None,
+        "error": None,
+    }
+    marks: dict[str, datetime] = {}
+    first = last = None
+    continuation = False
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for raw in f:
+            run["lines"] += 1
+            match = LINE_PATTERN.match(raw.rstrip("\n"))
+            if match is None:
+                # 여러 줄 메시지 (Traceback 등)
+                if continuation and run["error"] is None and FAILURE_PATTERN.search(raw):
+                    run["error"] = raw.strip()[:200]
+                continue
+            continuation = True
+            stamp, level, message = match.groups()
+            when = _parse_time(stamp)
+            first = first or when
+            last = when
+
+            if level in ("ERROR", "CRITICAL") or FAILURE_PATTERN.search(message):
+                run["error"] = run["error"] or message.strip()[:200]
+            for name, marker in STAGE_MARKERS:
+                if name not in marks and marker in message:
+                    marks[name] = when
+                    run["last_stage"] = name
+            if END_MARKER in message:
+                marks.setdefault("_end", when)
+            for field, pattern in VALUE_PATTERNS.items():
+                if field in run:
+                    continue
+                value = pattern.search(message)
+                if value:
+                    text = value.group(1)
+                    if field in INT_FIELDS:
+                        run[field] = int(text.replace(",", ""))
+                    elif field in FLOAT_FIELDS:
+                        run[field] = float(text)
+                    else:
+                        run[field] = text
+
+    if "_end" in marks:
+        run["status"] = "ok"
+    if run["error"]:
+        run["status"] = "failed"
+    run["started_at"] = first.isoformat(sep=" ") if first else None
+    run["wall_time"] = (last - first).total_seconds() if first and last else None
+
+    # 단계 시간: 이 단계 표식 → 다음으로 나온 표식 (완료 실행은 마지막 단계가 종료 표식까지)
+    ordered = [(name, marks[name]) for name in STAGE_NAMES if name in marks]
+    if "_end" in marks:
+        ordered.append(("_end", marks["_end"]))
+    for (name, start), (_, end) in zip(ordered, ordered[1:]):
+        run[f"{name}_s"] = (end - start).total_seconds()
+    return run
+
+
+def find_logs(data_dir: Path) -> list[Path]:
+    return sorted(data_dir.glob(f"*/logs/{LOG_GLOB}"))
+
+
+def parse_logs(paths: list[Path], jobs: int = 1) -> list[dict]:
+    if jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            return list(executor.map(parse_log, paths, chunksize=max(1, len(paths) // (jobs * 4))))
+    return [parse_log(path) for path in paths]
+
+
+def summarize(runs: list[dict]):
+    """완료된 실행으로 단계별 백분위수/회귀 표를 만듦 (runs DataFrame, summary DataFrame)"""
+    import numpy as np
+    import pandas as pd
+
+    columns = [
+        "folder", "log", "started_at", "status", "lines", "last_stage", "error", "video_id",
+        "parameters", "comment_count", "candidate_count", "danmaku_count", "device", "model",
+        "computation_time", "reported_total", "wall_time",
+    ] + [f"{name}_s" for name in STAGE_NAMES]
+    runs_df = pd.DataFrame(runs).reindex(columns=columns)
+    ok = runs_df[runs_df["status"] == "ok"]
+    total_wall = ok["wall_time"].sum()
+
+    rows = []
+    for name in STAGE_NAMES + ["wall_time"]:
+        column = name if name == "wall_time" else f"{name}_s"
+        values = ok[column].dropna()
+        row: dict = {"stage": name, "count": int(len(values))}
+        if len(values):
+            row["mean"] = values.mean()
+            for q, value in zip(PERCENTILES, np.percentile(values, PERCENTILES)):
+                row[f"p{q}"] = value
+            row["max"] = values.max()
+            row["share"] = values.sum() / total_wall if total_wall else np.nan
+
+        # 댓글 수(후보 수)에 대한 선형 회귀: 영상이 커질 때 어느 단계가 늘어나는지
+        pairs = ok[[column, "candidate_count"]].dropna()
+        if len(pairs) >= 3 and pairs["candidate_count"].nunique() >= 2:
+            x = pairs["candidate_count"].to_numpy(dtype=float) / 1000
+            y = pairs[column].to_numpy(dtype=float)
+            slope, intercept = np.polyfit(x, y, 1)
+            residual = y - (slope * x + intercept)
+            total = ((y - y.mean()) ** 2).sum()
+            row["sec_per_1k_comments"] = slope
+            row["intercept"] = intercept
+            row["r2"] = 1 - (residual ** 2).sum() / total if total else np.nan
+        rows.append(row)
+
+    summary_df = pd.DataFrame(rows)
+    return runs_df, summary_df
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="전처리 로그에서 단계별 소요 시간을 집계")
+    parser.add_argument("--data-dir", type=Path, default=DEFAULT_DATA_DIR, help="데이터 폴더들의 상위 경로 (기본: data/)")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR, help="결과 저장 폴더 (기본: log_stats/)")
+    parser.add_argument("--jobs", type=int, default=1, help="로그 파싱 프로세스 수 (기본: 1)")
+    args = parser.parse_args()
+
+    paths = find_logs(args.data_dir)
+    if not paths:
+        print(f"[WARN] {args.data_dir} 아래에서 logs/{LOG_GLOB} 를 찾지 못했습니다.")
+        return
+    print(f"[INFO] 로그 {len(paths)}개 파싱 중...")
+    runs = parse_logs(paths, args.jobs)
+    runs_df, summary_df = summarize(runs)
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    runs_df.to_csv(args.output_dir / "runs.csv", index=False, encoding="utf-8-sig")
+    summary_df.to_csv(args.output_dir / "stage_summary.csv", index=False, encoding="utf-8-sig")
+
+    status_counts = runs_df["status"].value_counts().to_dict()
+    incomplete = runs_df[runs_df["status"] != "ok"]
+    summary = {
+        "logs": len(runs_df),
+        "folders": int(runs_df["folder"].nunique()),
+        "status": {key: int(value) for key, value in status_counts.items()},
+        "incomplete_runs": incomplete[["folder", "log", "status", "lines", "last_stage", "error"]].to_dict("records"),
+        "stages": json.loads(summary_df.to_json(orient="records")),
+    }
+    with open(args.output_dir / "summary.json", "w", encoding="utf-8") as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"[INFO] 실행 {len(runs_df)}건 ({runs_df['folder'].nunique()}개 폴더): "
+          + ", ".join(f"{key} {value}" for key, value in status_counts.items()))
+    for row in incomplete.itertuples():
+        print(f"[WARN] {row.status}: {row.folder}/{row.log} ({row.lines}줄, 마지막 단계 {row.last_stage})")
+    shown = summary_df.set_index("stage")
+    shown = shown[[c for c in ["count", "mean", "p50", "p95", "max", "share", "sec_per_1k_comments", "r2"] if c in shown]]
+    print(shown.round(3).to_string())
+    print(f"[DONE] 결과 저장: {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,418 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+데이터 폴더의 최적화 리포트(<VIDEO_ID>.txt)를 읽어 시간 인덱스가 있는 열 저장소로 변환합니다.
+
+리포트는 선택된 댓글마다 아래 블록을 반복하며, 같은 장면 캡션(Video)과 자막(Audio)이
+블록마다 통째로 다시 적혀 있습니다.
+
+    Start-End: 0 ~ 6
+    Reward: 12.78...
+    Likes: 483 || 0.96...
+    Correlation:
+      Overall: 0.58...
+      Audio: 0.59 | <자막>
+      Video: 0.0 | <장면 캡션>
+    Text:
+      [[<댓글>]]
+    =======================================
+
+줄 단위로 스트리밍 파싱한 뒤 캡션은 중복을 제거한 별도 테이블로 빼고, 댓글 행은 그 번호만 가집니다.
+결과는 comment_store.py와 같은 .cstore 형식(CommentStore로 mmap 조회)으로 저장합니다.
+
+    report_index/
+    ├── index.json         # 리포트 머리말(Video ID 등), 개수, 원본 파일 상태
+    ├── comments.cstore    # start, end, reward, likes, norm_likes, correlation,
+    │                      # corr_audio, corr_video, audio_id, scene_id, text
+    ├── scenes.cstore      # 장면 캡션: start(첫 사용), end(마지막 사용), uses, text (행 번호 = scene_id)
+    └── audio.cstore       # 자막: 같은 열 (행 번호 = audio_id)
+
+Python에서는 ReportIndex로 조회합니다.
+    with ReportIndex.open('data/<폴더>') as report:
+        report.rows(10, 20)     # 10초 이상 20초 미만에 시작하는 댓글 (장면 캡션/자막 포함)
+
+사용 예시:
+    python3 report_index.py                          # data/ 아래 모든 폴더 (바뀐 리포트만)
+    python3 report_index.py --search "green suit"    # 모든 영상의 캡션/댓글 검색
+"""
+
+import argparse
+import json
+import os
+import re
+import shutil
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from comment_store import STORE_SUFFIX, CommentStore, encode_store
+from folder_names import video_id_from_folder
+
+SCRIPT_DIR = Path(__file__).parent
+DATA_DIR = SCRIPT_DIR / 'data'
+
+INDEX_DIR_NAME = 'report_index'
+INDEX_VERSION = 1
+
+COMMENT_COLUMNS = [
+    ('start', 'f32'),
+    ('end', 'f32'),
+    ('reward', 'f32'),
+    ('likes', 'f32'),
+    ('norm_likes', 'f32'),
+    ('correlation', 'f32'),
+    ('corr_audio', 'f32'),
+    ('corr_video', 'f32'),
+    ('audio_id', 'i32'),
+    ('scene_id', 'i32'),
+    ('text', 'str'),
+]
+CAPTION_COLUMNS = [
+    ('start', 'f32'),
+    ('end', 'f32'),
+    ('uses', 'i32'),
+    ('text', 'str'),
+]
+# 캡션 테이블 이름 -> (리포트의 상관계수 줄 이름, 댓글의 번호 열, 댓글의 상관계수 열)
+CAPTION_TABLES = {
+    'scenes': ('Video', 'scene_id', 'corr_video'),
+    'audio': ('Audio', 'audio_id', 'corr_audio'),
+}
+
+START_END_PATTERN = re.compile(r'^Start-End:\s*(\S+)\s*~\s*(\S+)\s*$')
+LIKES_PATTERN = re.compile(r'^Likes:\s*(\S+)\s*\|\|\s*(\S+)\s*$')
+SCORE_PATTERN = re.compile(r'^\s+(Overall|Audio|Video):\s*(\S+)(?:\s*\|\s?(.*))?$')
+RULE_PATTERN = re.compile(r'^=+\s*$')
+# 머리말 키 -> index.json 키
+HEADER_KEYS = {'Video ID': 'video_id', 'Total Comments': 'total_comments', 'Query Filter': 'query_filter'}
+
+
+class ReportError(ValueError):
+    pass
+
+
+def _number(text, line_number, field):
+    try:
+        return float(text)
+    except ValueError:
+        raise ReportError(f"{line_number}행: {field} 값을 숫자로 읽을 수 없습니다: {text!r}") from None
+
+
+def _comment_text(lines):
+    text = '\n'.join(line[2:] if line.startswith('  ') else line for line in lines).strip()
+    if text.startswith('[[') and text.endswith(']]'):
+        text = text[2:-2]
+    return text
+
+
+def iter_report_entries(lines, header=None):
+    """리포트 줄을 하나씩 읽어 댓글 블록마다 dict를 yield
+
+    header에 dict를 넘기면 머리말(Video ID, Total Comments, Query Filter)을 채웁니다.
+    """
+    entry = None
+    text_lines = None
+    for line_number, raw in enumerate(lines, 1):
+        line = raw.rstrip('\r\n')
+
+        if text_lines is not None:
+            if RULE_PATTERN.match(line):
+                entry['text'] = _comment_text(text_lines)
+                yield entry
+                entry = text_lines = None
+            else:
+                text_lines.append(line)
+            continue
+
+        match = START_END_PATTERN.match(line)
+        if match:
+            if entry is not None:
+                raise ReportError(f"{line_number}행: 이전 블록에 Text가 없습니다")
+            entry = {
+                'start': _number(match.group(1), line_number, 'Start'),
+                'end': _number(match.group(2), line_number, 'End'),
+                'line': line_number,
+            }
+            continue
+
+        if entry is None:
+            key, sep, value = line.partition(': ')
+            if header is not None and sep and key in HEADER_KEYS:
+                header[HEADER_KEYS[key]] = value.strip()
+            continue
+
+        if line.startswith('Reward:'):
+            entry['reward'] = _number(line.split(':', 1)[1].strip(), line_number, 'Reward')
+        elif line.startswith('Likes:'):
+            match = LIKES_PATTERN.match(line)
+            if not match:
+                raise ReportError(f"{line_number}행: Likes 형식이 다릅니다: {line!r}")
+            entry['likes'] = _number(match.group(1), line_number, 'Likes')
+            entry['norm_likes'] = _number(match.group(2), line_number, 'Likes')
+        elif line.startswith('Text:'):
+            text_lines = []
+        else:
+            match = SCORE_PATTERN.match(line)
+            if match:
+                name, score, caption = match.groups()
+                entry[name] = (_number(score, line_number, name), caption)
+
+    # 마지막 구분선 없이 끝난 파일
+    if text_lines is not None:
+        entry['text'] = _comment_text(text_lines)
+        yield entry
+    elif entry is not None:
+        raise ReportError("파일이 댓글 블록 중간에서 끝났습니다")
+
+
+def build_report_tables(entries):
+    """댓글 목록을 (댓글 열, {캡션 테이블: 열}) 로 변환. 캡션 번호는 첫 사용 시각 순"""
+    entries = sorted(entries, key=lambda entry: (entry['start'], entry['end']))
+    comments = {name: [] for name, _ in COMMENT_COLUMNS}
+    captions = {table: {name: [] for name, _ in CAPTION_COLUMNS} for table in CAPTION_TABLES}
+    lookup = {table: {} for table in CAPTION_TABLES}
+
+    for entry in entries:
+        for name in ('start', 'end', 'reward', 'likes', 'norm_likes'):
+            comments[name].append(entry.get(name, float('nan')))
+        comments['correlation'].append(entry.get('Overall', (float('nan'), None))[0])
+        comments['text'].append(entry['text'])
+
+        for table, (label, id_column, score_column) in CAPTION_TABLES.items():
+            score, caption = entry.get(label, (float('nan'), None))
+            comments[score_column].append(score)
+            if caption is None:
+                comments[id_column].append(-1)
+                continue
+            values = captions[table]
+            caption_id = lookup[table].get(caption)
+            if caption_id is None:
+                caption_id = lookup[table][caption] = len(values['text'])
+                values['start'].append(entry['start'])
+                values['end'].append(entry['end'])
+                values['uses'].append(0)
+                values['text'].append(caption)
+            values['end'][caption_id] = max(values['end'][caption_id], entry['end'])
+            values['uses'][caption_id] += 1
+            comments[id_column].append(caption_id)
+
+    return comments, captions
+
+
+def find_report(folder_path):
+    """폴더의 <VIDEO_ID>.txt 경로 (폴더 이름 <VIDEO_ID>_<filter>_<threshold> 기준, 없으면 유일한 .txt)"""
+    folder_path = Path(folder_path)
+    expected = folder_path / f"{video_id_from_folder(folder_path.name)}.txt"
+    if expected.exists():
+        return expected
+    candidates = [p for p in folder_path.glob('*.txt') if not p.name.startswith('.')]
+    return candidates[0] if len(candidates) == 1 else None
+
+
+def _source_state(path):
+    st = path.stat()
+    return {'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+
+
+def read_index_manifest(folder_path):
+    try:
+        with open(Path(folder_path) / INDEX_DIR_NAME / 'index.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def index_is_current(folder_path, report_path):
+    manifest = read_index_manifest(folder_path)
+    return (
+        manifest is not None
+        and manifest.get('version') == INDEX_VERSION
+        and manifest.get('report') == report_path.name
+        and manifest.get('source_state') == _source_state(report_path)
+    )
+
+
+def build_report_index(folder_path, force=False):
+    """폴더의 report_index/를 다시 만듦. 만든 index.json 내용을 반환 (리포트가 없거나 최신이면 None)"""
+    folder_path = Path(folder_path)
+    report_path = find_report(folder_path)
+    if report_path is None or (not force and index_is_current(folder_path, report_path)):
+        return None
+
+    state = _source_state(report_path)
+    header = {}
+    with open(report_path, 'r', encoding='utf-8') as f:
+        entries = list(iter_report_entries(f, header))
+    comments, captions = build_report_tables(entries)
+
+    index_dir = folder_path / INDEX_DIR_NAME
+    tmp_dir = folder_path / f".{INDEX_DIR_NAME}.tmp"
+    if tmp_dir.exists():
+        shutil.rmtree(tmp_dir)
+    tmp_dir.mkdir()
+    try:
+        (tmp_dir / f"comments{STORE_SUFFIX}").write_bytes(encode_store('comments', comments, COMMENT_COLUMNS))
+        for table, values in captions.items():
+            (tmp_dir / f"{table}{STORE_SUFFIX}").write_bytes(encode_store(table, values, CAPTION_COLUMNS))
+
+        caption_lines = {
+            table: sum(caption_id >= 0 for caption_id in comments[id_column])
+            for table, (_, id_column, _) in CAPTION_TABLES.items()
+        }
+        manifest = {
+            'version': INDEX_VERSION,
+            'report': report_path.name,
+            'source_state': state,
+            'header': header,
+            'comments': len(entries),
+            'duration': max(comments['end'], default=0),
+            'tables': {
+                table: {'file': f"{table}{STORE_SUFFIX}", 'count': len(values['text']), 'references': caption_lines[table]}
+                for table, values in captions.items()
+            },
+            'columns': {
+                'comments': [name for name, _ in COMMENT_COLUMNS],
+                **{table: [name for name, _ in CAPTION_COLUMNS] for table in CAPTION_TABLES},
+            },
+        }
+        with open(tmp_dir / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, indent=1)
+
+        old_dir = folder_path / f".{INDEX_DIR_NAME}.old"
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+        if index_dir.exists():
+            os.replace(index_dir, old_dir)
+        os.replace(tmp_dir, index_dir)
+        if old_dir.exists():
+            shutil.rmtree(old_dir)
+    finally:
+        if tmp_dir.exists():
+            shutil.rmtree(tmp_dir)
+    return manifest
+
+
+class ReportIndex:
+    """report_index/ 리더. comments / scenes / audio는 CommentStore"""
+
+    def __init__(self, folder_path):
+        self.folder_path = Path(folder_path)
+        index_dir = self.folder_path / INDEX_DIR_NAME
+        self.manifest = read_index_manifest(self.folder_path)
+        if self.manifest is None:
+            raise FileNotFoundError(f"{index_dir}/index.json이 없습니다")
+        self.comments = CommentStore.open(index_dir / f"comments{STORE_SUFFIX}")
+        self.scenes = CommentStore.open(index_dir / f"scenes{STORE_SUFFIX}")
+        self.audio = CommentStore.open(index_dir / f"audio{STORE_SUFFIX}")
+
+    @classmethod
+    def open(cls, folder_path):
+        return cls(folder_path)
+
+    def close(self):
+        for store in (self.comments, self.scenes, self.audio):
+            store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.comments)
+
+    def _with_captions(self, record):
+        record['scene'] = self.scenes.value('text', record['scene_id']) if record['scene_id'] >= 0 else None
+        record['audio'] = self.audio.value('text', record['audio_id']) if record['audio_id'] >= 0 else None
+        return record
+
+    def row(self, row):
+        return self._with_captions(self.comments.row(row))
+
+    def rows(self, t0, t1):
+        """t0 <= start < t1 인 댓글 (장면 캡션/자막 포함)"""
+        return [self.row(i) for i in self.comments.window(t0, t1)]
+
+    def active(self, t):
+        """t초에 표시 중인 댓글 (장면 캡션/자막 포함)"""
+        return [self._with_captions(record) for record in self.comments.active(t)]
+
+
+def iter_report_folders(data_dir=DATA_DIR):
+    if not Path(data_dir).exists():
+        return []
+    return sorted(
+        p for p in Path(data_dir).iterdir()
+        if p.is_dir() and not p.name.startswith('.') and find_report(p) is not None
+    )
+
+
+def build_report_indexes(folder_paths=None, force=False, jobs=None, log=print):
+    """여러 데이터 폴더의 report_index/를 병렬로 생성 (바뀐 리포트만)"""
+    folder_paths = list(folder_paths) if folder_paths is not None else iter_report_folders()
+
+    def process(folder_path):
+        try:
+            return folder_path, build_report_index(folder_path, force), None
+        except (OSError, ValueError) as e:
+            return folder_path, None, e
+
+    built = 0
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for folder_path, manifest, error in executor.map(process, folder_paths):
+            if error is not None:
+                log(f"   ⚠️  {folder_path.name}: 리포트 인덱스 생성 실패: {error}")
+            elif manifest is not None:
+                built += 1
+                scenes = manifest['tables']['scenes']
+                log(
+                    f"   📑 {folder_path.name}: 댓글 {manifest['comments']}개, "
+                    f"장면 캡션 {scenes['references']}회 → {scenes['count']}개"
+                )
+    log(f"📑 리포트 인덱스 완료: 대상 {len(folder_paths)}개, 새로 생성 {built}개")
+    return built
+
+
+def search_reports(folder_paths, query):
+    """모든 폴더에서 장면 캡션/자막/댓글에 query가 들어 있는 댓글 행을 (폴더, 행) 으로 yield"""
+    needle = query.casefold()
+    for folder_path in folder_paths:
+        if read_index_manifest(folder_path) is None:
+            continue
+        with ReportIndex.open(folder_path) as report:
+            matched = {
+                table: {i for i, text in enumerate(store.column('text')) if needle in text.casefold()}
+                for table, store in (('scene_id', report.scenes), ('audio_id', report.audio))
+            }
+            texts = report.comments.column('text')
+            scene_ids = report.comments.column('scene_id')
+            audio_ids = report.comments.column('audio_id')
+            for i in range(len(report)):
+                if needle in texts[i].casefold() or scene_ids[i] in matched['scene_id'] or audio_ids[i] in matched['audio_id']:
+                    yield folder_path, report.row(i)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="<VIDEO_ID>.txt 최적화 리포트를 시간 인덱스 열 저장소로 변환")
+    parser.add_argument('folders', nargs='*', type=Path, help="데이터 폴더 (기본: data/ 아래 전체)")
+    parser.add_argument('--force', action='store_true', help="리포트가 바뀌지 않았어도 다시 생성")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 처리할 폴더 수")
+    parser.add_argument('--search', default=None, help="생성 후 캡션/자막/댓글에서 검색할 문자열")
+    args = parser.parse_args()
+
+    folders = args.folders or iter_report_folders()
+    build_report_indexes(folders, args.force, args.jobs)
+    if args.search:
+        found = 0
+        for folder_path, record in search_reports(folders, args.search):
+            found += 1
+            print(
+                f"[INFO] {folder_path.name} {record['start']:g}~{record['end']:g}s "
+                f"reward {record['reward']:.2f}: {record['text'][:80]}"
+            )
+        print(f"[DONE] '{args.search}' 검색 결과 {found}건")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,263 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+danmaku.json의 후보 댓글로 optimal.json(ComVi 댓글 일정)을 CPU에서 다시 만듭니다.
+
+업스트림 파이프라인(logs/process_*.log)의 optimization 단계는 pipeline_log_stats.py 기준으로
+실행 29건에서 p50 18.2초, p95 398초(전체 시간의 94%)가 걸리지만, 일정 선택 자체는 가중 구간 스케줄링 문제입니다. 기존 optimal.json에서 확인한 규칙을 그대로 씁니다.
+
+    reading time = clamp(floor(글자 수 / 14.75) + 1, 1, 6)   초
+    reward       = reading time * (2 * correlation + norm_likes)
+
+각 댓글은 [start, start + reading time) 구간을 차지하고, 슬롯마다 겹치지 않으면서 reward 합이
+최대인 댓글 집합을 고릅니다. 끝 시각으로 정렬한 뒤 이분 탐색으로 직전 호환 구간을 찾는
+O(n log n) 동적 계획법이며, 슬롯이 여러 개면 앞 슬롯에서 고른 댓글을 빼고 차례로 반복합니다.
+
+danmaku.json에는 좋아요 수가 없으므로 norm_likes는 --likes 파일(텍스트 → likes/norm_likes),
+같은 폴더의 기존 optimal.json 순으로 찾고, 없으면 알려진 값의 중앙값을 씁니다.
+작성자/프로필 사진/corr_A/corr_V도 기존 optimal.json에 같은 텍스트가 있으면 가져옵니다.
+
+사용 예시:
+    python3 schedule_optimal.py data/RQmqcaS5LIM_none_0.068 --compare
+    python3 schedule_optimal.py data/* --max-reading 8 --slots 2
+    python3 schedule_optimal.py data/RQmqcaS5LIM_none_0.068 --in-place   # optimal.json 교체
+"""
+
+import argparse
+import json
+import math
+import os
+import statistics
+import sys
+import time
+from bisect import bisect_right
+from pathlib import Path
+
+SOURCE_FILE_NAME = 'danmaku.json'
+OPTIMAL_FILE_NAME = 'optimal.json'
+DEFAULT_OUTPUT_NAME = 'optimal_local.json'
+
+DEFAULT_SETTINGS = {
+    'chars_per_second': 14.75,
+    'min_reading': 1,
+    'max_reading': 6,
+    'corr_weight': 2.0,
+    'likes_weight': 1.0,
+    'min_correlation': 0.0,
+    'slots': 1,
+}
+# optimal.json 항목의 키 순서
+OPTIMAL_KEYS = [
+    'start', 'end', 'reading time', 'text', 'reward', 'correlation', 'corr_A', 'corr_V',
+    'likes', 'norm_likes', 'norm_likes_real', 'photo', 'author', 'slot',
+]
+
+
+def reading_time(text, settings):
+    seconds = math.floor(len(text) / settings['chars_per_second']) + 1
+    return float(min(settings['max_reading'], max(settings['min_reading'], seconds)))
+
+
+def comment_reward(duration, correlation, norm_likes, settings):
+    return duration * (settings['corr_weight'] * correlation + settings['likes_weight'] * norm_likes)
+
+
+def weighted_interval_schedule(intervals):
+    """겹치지 않는 구간 중 weight 합이 최대인 집합을 선택
+
+    intervals: [(start, end, weight, key)], end는 포함하지 않음 (e_i <= s_j 이면 호환)
+    반환: (총 weight, 선택된 항목 목록, start 순)
+    """
+    items = sorted(intervals, key=lambda item: (item[1], item[0]))
+    ends = [item[1] for item in items]
+    # previous[j]: j와 겹치지 않는 마지막 구간 번호 + 1 (0이면 없음)
+    previous = [bisect_right(ends, item[0], 0, j) for j, item in enumerate(items)]
+
+    best = [0.0] * (len(items) + 1)
+    for j, item in enumerate(items):
+        take = item[2] + best[previous[j]]
+        best[j + 1] = take if take > best[j] else best[j]
+
+    chosen = []
+    j = len(items)
+    while j > 0:
+        item = items[j - 1]
+        if item[2] + best[previous[j - 1]] > best[j - 1]:
+            chosen.append(item)
+            j = previous[j - 1]
+        else:
+            j -= 1
+    chosen.reverse()
+    return best[-1], chosen
+
+
+def _norm_likes_lookup(records):
+    lookup = {}
+    for record in records:
+        text = record.get('text')
+        if text is None:
+            continue
+        # 이 스크립트가 중앙값으로 채운 항목은 norm_likes_real이 null이므로 다시 쓰지 않음
+        norm = record['norm_likes_real'] if 'norm_likes_real' in record else record.get('norm_likes')
+        if norm is not None:
+            lookup[text] = dict(record, norm_likes=float(norm))
+    return lookup
+
+
+def load_reward_inputs(folder_path, likes_path=None):
+    """텍스트 → 기존 메타데이터(norm_likes 포함) 사전"""
+    lookup = {}
+    optimal_path = Path(folder_path) / OPTIMAL_FILE_NAME
+    if optimal_path.exists():
+        with open(optimal_path, 'r', encoding='utf-8') as f:
+            lookup.update(_norm_likes_lookup(json.load(f)))
+    if likes_path:
+        with open(likes_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, dict):
+            data = [
+                dict(value, text=text) if isinstance(value, dict) else {'text': text, 'norm_likes': value}
+                for text, value in data.items()
+            ]
+        for text, record in _norm_likes_lookup(data).items():
+            lookup[text] = dict(lookup.get(text, {}), **record)
+    return lookup
+
+
+def schedule_comments(candidates, reward_inputs, settings, default_norm_likes=None):
+    """후보 댓글에서 슬롯별 일정을 만들어 optimal.json 형식 목록으로 반환"""
+    if default_norm_likes is None:
+        known = [record['norm_likes'] for record in reward_inputs.values()]
+        default_norm_likes = statistics.median(known) if known else 0.5
+
+    intervals = []
+    for index, comment in enumerate(candidates):
+        text = str(comment.get('text') or '')
+        correlation = float(comment.get('correlation') or 0)
+        if not text or correlation < settings['min_correlation']:
+            continue
+        start = float(comment.get('start') or 0)
+        duration = reading_time(text, settings)
+        norm_likes = reward_inputs.get(text, {}).get('norm_likes', default_norm_likes)
+        weight = comment_reward(duration, correlation, norm_likes, settings)
+        intervals.append((start, start + duration, weight, index))
+
+    entries = []
+    for slot in range(settings['slots']):
+        if not intervals:
+            break
+        _, chosen = weighted_interval_schedule(intervals)
+        taken = {item[3] for item in chosen}
+        intervals = [item for item in intervals if item[3] not in taken]
+        for start, end, weight, index in chosen:
+            comment = candidates[index]
+            text = str(comment['text'])
+            known = reward_inputs.get(text, {})
+            norm_likes = known.get('norm_likes', default_norm_likes)
+            entry = {
+                'start': _as_number(start),
+                'end': _as_number(end),
+                'reading time': end - start,
+                'text': text,
+                'reward': weight,
+                'correlation': str(comment.get('correlation')),
+                'corr_A': known.get('corr_A'),
+                'corr_V': known.get('corr_V'),
+                'likes': known.get('likes'),
+                'norm_likes': norm_likes,
+                'norm_likes_real': known.get('norm_likes_real', norm_likes if text in reward_inputs else None),
+                'photo': known.get('photo'),
+                'author': known.get('author'),
+                'slot': slot,
+            }
+            entries.append({key: entry[key] for key in OPTIMAL_KEYS})
+    entries.sort(key=lambda entry: (entry['start'], entry['slot']))
+    return entries
+
+
+def _as_number(value):
+    return int(value) if float(value).is_integer() else value
+
+
+def total_reward(entries):
+    return sum(float(entry.get('reward') or 0) for entry in entries)
+
+
+def write_json_atomic(path, data):
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def process_folder(folder_path, settings, likes_path=None, output_name=DEFAULT_OUTPUT_NAME, compare=False):
+    folder_path = Path(folder_path)
+    source_path = folder_path / SOURCE_FILE_NAME
+    if not source_path.exists():
+        print(f"[WARN] {folder_path.name}: {SOURCE_FILE_NAME}이 없어 건너뜁니다.")
+        return None
+
+    with open(source_path, 'r', encoding='utf-8') as f:
+        candidates = json.load(f)
+    reward_inputs = load_reward_inputs(folder_path, likes_path)
+
+    started = time.perf_counter()
+    entries = schedule_comments(candidates, reward_inputs, settings)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+
+    output_path = folder_path / output_name
+    write_json_atomic(output_path, entries)
+    print(
+        f"[INFO] {folder_path.name}: 후보 {len(candidates)}개 → {len(entries)}개 선택, "
+        f"reward {total_reward(entries):.2f}, {elapsed_ms:.1f} ms → {output_path.name}"
+    )
+
+    if compare and output_name != OPTIMAL_FILE_NAME and (folder_path / OPTIMAL_FILE_NAME).exists():
+        with open(folder_path / OPTIMAL_FILE_NAME, 'r', encoding='utf-8') as f:
+            upstream = json.load(f)
+        upstream_texts = {entry['text'] for entry in upstream}
+        shared = sum(entry['text'] in upstream_texts for entry in entries)
+        print(
+            f"       기존 {OPTIMAL_FILE_NAME}: {len(upstream)}개, reward {total_reward(upstream):.2f} "
+            f"(공통 댓글 {shared}개, 기존 후보 중 danmaku.json에 없는 댓글 "
+            f"{sum(entry['text'] not in {c.get('text') for c in candidates} for entry in upstream)}개)"
+        )
+    return entries
+
+
+def main():
+    parser = argparse.ArgumentParser(description="danmaku.json에서 가중 구간 스케줄링으로 optimal.json 재생성")
+    parser.add_argument('folders', nargs='+', type=Path, help="데이터 폴더")
+    parser.add_argument('--likes', type=Path, default=None, help="텍스트별 likes/norm_likes JSON (목록 또는 사전)")
+    parser.add_argument('--chars-per-second', type=float, default=DEFAULT_SETTINGS['chars_per_second'], help="읽기 속도 (기본: 14.75자/초)")
+    parser.add_argument('--min-reading', type=float, default=DEFAULT_SETTINGS['min_reading'], help="최소 표시 시간(초) (기본: 1)")
+    parser.add_argument('--max-reading', type=float, default=DEFAULT_SETTINGS['max_reading'], help="최대 표시 시간(초) (기본: 6)")
+    parser.add_argument('--corr-weight', type=float, default=DEFAULT_SETTINGS['corr_weight'], help="reward의 correlation 가중치 (기본: 2)")
+    parser.add_argument('--likes-weight', type=float, default=DEFAULT_SETTINGS['likes_weight'], help="reward의 norm_likes 가중치 (기본: 1)")
+    parser.add_argument('--min-correlation', type=float, default=DEFAULT_SETTINGS['min_correlation'], help="후보로 쓸 최소 correlation")
+    parser.add_argument('--slots', type=int, default=DEFAULT_SETTINGS['slots'], help="동시에 표시할 슬롯 수 (기본: 1)")
+    parser.add_argument('--output', default=DEFAULT_OUTPUT_NAME, help=f"폴더 안에 쓸 파일 이름 (기본: {DEFAULT_OUTPUT_NAME})")
+    parser.add_argument('--in-place', action='store_true', help=f"{OPTIMAL_FILE_NAME}을 직접 교체")
+    parser.add_argument('--compare', action='store_true', help=f"기존 {OPTIMAL_FILE_NAME}과 reward 비교")
+    args = parser.parse_args()
+
+    if args.slots < 1 or args.min_reading <= 0 or args.max_reading < args.min_reading:
+        parser.error("--slots는 1 이상, 표시 시간은 0 < min-reading <= max-reading 이어야 합니다.")
+
+    settings = {
+        'chars_per_second': args.chars_per_second,
+        'min_reading': args.min_reading,
+        'max_reading': args.max_reading,
+        'corr_weight': args.corr_weight,
+        'likes_weight': args.likes_weight,
+        'min_correlation': args.min_correlation,
+        'slots': args.slots,
+    }
+    output_name = OPTIMAL_FILE_NAME if args.in_place else args.output
+    processed = [process_folder(folder, settings, args.likes, output_name, args.compare) for folder in args.folders]
+    print(f"[DONE] {sum(entries is not None for entries in processed)}/{len(processed)}개 폴더 처리")
+    sys.exit(0 if all(entries is not None for entries in processed) else 1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,319 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+설문 페이지와 데이터 폴더를 서빙하는 정적 파일 서버입니다.
+
+python3 -m http.server 대신 사용하며 다음을 지원합니다.
+    - 멀티스레드 처리와 HTTP/1.1 keep-alive
+    - ETag / Last-Modified 기반 조건부 요청 (304)
+    - Range 요청 (206) - MP4 탐색과 첫 프레임 로딩용, sendfile로 전송
+    - setup_data.py --precompress-only 가 만든 .br / .gz 파일을 Accept-Encoding에 맞춰 전송
+    - retest 밖의 비디오 폴더를 /video/ 경로로 연결 (setup_data.py의 비디오 폴더 탐색 결과 사용)
+
+사용 예시:
+    python3 serve.py                      # http://localhost:8000
+    python3 serve.py --port 8080 --bind 0.0.0.0
+    python3 serve.py --video-dir /path/to/video --quiet
+"""
+
+import argparse
+import os
+import posixpath
+import urllib.parse
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+
+# (Accept-Encoding 토큰, 파일 접미사) - 앞에 있을수록 우선
+PRECOMPRESSED_ENCODINGS = [('br', '.br'), ('gzip', '.gz')]
+COMPRESSIBLE_TYPES = ('text/', 'application/json', 'application/javascript', 'image/svg+xml')
+# HTML은 매번 재검증하고, 나머지 정적 파일은 잠시 캐시
+HTML_CACHE_CONTROL = 'no-cache'
+ASSET_CACHE_CONTROL = 'public, max-age=3600'
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_byte_range(header, size):
+    """단일 'bytes=' Range 헤더를 (start, end)로 해석 (end 포함)
+
+    해석할 수 없거나 여러 구간이면 None을 반환해 전체 응답으로 처리합니다.
+    """
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if first == '':
+            suffix = int(last)
+            if suffix <= 0:
+                raise RangeNotSatisfiable()
+            return max(0, size - suffix), size - 1
+        start = int(first)
+        end = int(last) if last else size - 1
+    except ValueError:
+        return None
+    if start >= size or end < start:
+        raise RangeNotSatisfiable()
+    return start, min(end, size - 1)
+
+
+def make_etag(stat_result, encoding=None):
+    tag = f"{stat_result.st_size:x}-{stat_result.st_mtime_ns:x}"
+    if encoding:
+        tag += f"-{encoding}"
+    return f'"{tag}"'
+
+
+class StudyRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    # URL 접두사 -> 실제 디렉토리 (serve()에서 설정)
+    mounts = {}
+    quiet = False
+
+    def translate_path(self, path):
+        url_path = urllib.parse.unquote(urllib.parse.urlsplit(path).path)
+        for prefix, directory in self.mounts.items():
+            if url_path == prefix or url_path.startswith(prefix + '/'):
+                rest = url_path[len(prefix):] or '/'
+                original = self.directory
+                self.directory = str(directory)
+                try:
+                    return super().translate_path(posixpath.normpath(rest))
+                finally:
+                    self.directory = original
+        return super().translate_path(path)
+
+    def _choose_encoding(self, path, ctype):
+        """사전 압축 파일이 원본보다 최신이고 클라이언트가 받을 수 있으면 그 경로를 반환"""
+        if not ctype.startswith(COMPRESSIBLE_TYPES):
+            return None, path
+        accepted = {
+            token.split(';')[0].strip().lower()
+            for token in self.headers.get('Accept-Encoding', '').split(',')
+        }
+        try:
+            source_mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, path
+        for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if encoding not in accepted:
+                continue
+            candidate = path + suffix
+            try:
+                if os.stat(candidate).st_mtime_ns >= source_mtime:
+                    return encoding, candidate
+            except OSError:
+                continue
+        return None, path
+
+    def _not_modified(self, etag, stat_result):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match:
+            tags = [tag.strip().removeprefix('W/') for tag in if_none_match.split(',')]
+            return '*' in tags or etag in tags
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return int(stat_result.st_mtime) <= since
+        return False
+
+    def _range_applies(self, etag, stat_result):
+        if_range = self.headers.get('If-Range')
+        if not if_range:
+            return True
+        if if_range.startswith('"') or if_range.startswith('W/'):
+            return if_range == etag
+        try:
+            return int(stat_result.st_mtime) <= parsedate_to_datetime(if_range).timestamp()
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+    def send_head(self):
+        """파일이면 (파일 객체, 시작 위치, 길이)를, 디렉토리면 기본 동작 결과를 반환
+
+        슬래시로 끝나는 디렉토리 요청은 index.html을 파일과 같은 경로(ETag/304, .gz/.br,
+        Cache-Control)로 보내고, 슬래시 리다이렉트와 index가 없는 목록만 기본 동작에 맡깁니다.
+        """
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            if not urllib.parse.urlsplit(self.path).path.endswith('/'):
+                return super().send_head()
+            for index in ('index.html', 'index.htm'):
+                candidate = os.path.join(path, index)
+                if os.path.isfile(candidate):
+                    path = candidate
+                    break
+            else:
+                return super().send_head()
+        elif path.endswith('/'):
+            return super().send_head()
+
+        ctype = self.guess_type(path)
+        encoding, serve_path = self._choose_encoding(path, ctype)
+        try:
+            f = open(serve_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return None
+
+        try:
+            stat_result = os.fstat(f.fileno())
+            size = stat_result.st_size
+            etag = make_etag(stat_result, encoding)
+            headers = {
+                'ETag': etag,
+                'Last-Modified': formatdate(stat_result.st_mtime, usegmt=True),
+                'Cache-Control': HTML_CACHE_CONTROL if ctype.startswith('text/html') else ASSET_CACHE_CONTROL,
+            }
+            if ctype.startswith(COMPRESSIBLE_TYPES):
+                headers['Vary'] = 'Accept-Encoding'
+
+            if self._not_modified(etag, stat_result):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.end_headers()
+                f.close()
+                return None
+
+            start, length = 0, size
+            status = HTTPStatus.OK
+            range_header = self.headers.get('Range')
+            if range_header and encoding is None and self._range_applies(etag, stat_result):
+                try:
+                    byte_range = parse_byte_range(range_header, size)
+                except RangeNotSatisfiable:
+                    self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                    self.send_header('Content-Range', f'bytes */{size}')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    f.close()
+                    return None
+                if byte_range is not None:
+                    start, end = byte_range
+                    length = end - start + 1
+                    status = HTTPStatus.PARTIAL_CONTENT
+                    headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+
+            self.send_response(status)
+            self.send_header('Content-Type', ctype)
+            self.send_header('Content-Length', str(length))
+            if encoding is None:
+                self.send_header('Accept-Ranges', 'bytes')
+            else:
+                self.send_header('Content-Encoding', encoding)
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            return f, start, length
+        except Exception:
+            f.close()
+            raise
+
+    def _send_body(self, f, start, length):
+        try:
+            if hasattr(self.connection, 'sendfile'):
+                self.connection.sendfile(f, start, length)
+            else:
+                f.seek(start)
+                remaining = length
+                while remaining > 0:
+                    chunk = f.read(min(64 * 1024, remaining))
+                    if not chunk:
+                        break
+                    self.wfile.write(chunk)
+                    remaining -= len(chunk)
+        except (BrokenPipeError, ConnectionResetError):
+            # 비디오 탐색 중 브라우저가 요청을 끊는 것은 정상
+            self.close_connection = True
+
+    def do_GET(self):
+        result = self.send_head()
+        if result is None:
+            return
+        if isinstance(result, tuple):
+            f, start, length = result
+            try:
+                self._send_body(f, start, length)
+            finally:
+                f.close()
+        else:
+            try:
+                self.copyfile(result, self.wfile)
+            finally:
+                result.close()
+
+    def do_HEAD(self):
+        result = self.send_head()
+        if isinstance(result, tuple):
+            result[0].close()
+        elif result is not None:
+            result.close()
+
+    def log_message(self, format, *args):
+        if not self.quiet:
+            super().log_message(format, *args)
+
+
+class StudyHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+def default_video_dir():
+    """setup_data.py와 같은 규칙으로 비디오 폴더를 찾음"""
+    from setup_data import VIDEO_DIR
+    return VIDEO_DIR
+
+
+def serve(root, bind, port, video_dir=None, quiet=False):
+    mounts = {}
+    root = Path(root).resolve()
+    if video_dir is not None:
+        video_dir = Path(video_dir).resolve()
+        # retest 안에 있는 video/는 그대로 서빙되므로 밖에 있을 때만 연결
+        if video_dir.is_dir() and video_dir != root / 'video':
+            mounts['/video'] = video_dir
+
+    handler = type('Handler', (StudyRequestHandler,), {'mounts': mounts, 'quiet': quiet})
+
+    def handler_factory(*args, **kwargs):
+        return handler(*args, directory=str(root), **kwargs)
+
+    with StudyHTTPServer((bind, port), handler_factory) as httpd:
+        host, actual_port = httpd.server_address[:2]
+        print(f"[INFO] {root} 를 http://{host}:{actual_port}/ 에서 서빙합니다.")
+        for prefix, directory in mounts.items():
+            print(f"[INFO] {prefix}/ -> {directory}")
+        try:
+            httpd.serve_forever()
+        except KeyboardInterrupt:
+            print("\n[DONE] 서버를 종료합니다.")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="설문 페이지 정적 파일 서버")
+    parser.add_argument('--port', type=int, default=8000, help="포트 (기본: 8000)")
+    parser.add_argument('--bind', default='', help="바인드할 주소 (기본: 모든 인터페이스)")
+    parser.add_argument('--root', type=Path, default=SCRIPT_DIR, help="서빙할 디렉토리 (기본: retest 폴더)")
+    parser.add_argument('--video-dir', type=Path, default=None, help="/video/로 연결할 비디오 폴더 (기본: setup_data.py 탐색 결과)")
+    parser.add_argument('--quiet', action='store_true', help="요청 로그를 출력하지 않음")
+    args = parser.parse_args()
+
+    video_dir = args.video_dir or default_video_dir()
+    serve(args.root, args.bind, args.port, video_dir=video_dir, quiet=args.quiet)
+
+
+if __name__ == '__main__':
+    main()
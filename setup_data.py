@@ -3,16 +3,54 @@
 원본 데이터 폴더를 retest/data/ 아래로 그대로 복사하고
 각 인터페이스 HTML의 비디오 경로를 ../video/<VIDEO_ID>.mp4 로 갱신합니다.
 데이터 폴더 이름은 변경하지 않습니다.
+
+복사 후에는 youtube_ui.html, youtube_ui_one.html, danmaku_ui_default.html에 인라인으로
+들어 있는 댓글 JSON을 폴더별 공유 파일 comments.js로 옮겨, 브라우저가 한 번만 받아
+캐시하도록 합니다 (--keep-inline-comments로 끌 수 있음).
+
+마지막으로 HTML/JSON/JS/CSS 파일 옆에 .gz(및 brotli 모듈이 있으면 .br)를 미리 만들어
+serve.py가 압축 없이 바로 전송할 수 있게 합니다 (--no-precompress로 끌 수 있음).
+preview/ 와 비디오 폴더의 MP4는 moov 박스를 파일 앞으로 옮겨(faststart) 브라우저가
+파일 전체를 받기 전에 재생을 시작하도록 합니다 (--no-faststart로 끌 수 있음).
+danmaku.json / optimal.json은 comment_store.py로 시간 인덱스 열 저장소(comment_store/)로도
+변환합니다 (--no-comment-store로 끌 수 있음). 단무쿠 댓글의 레인/등장 시각은
+danmaku_layout.py로 미리 계산해 danmaku_layout.json에 저장합니다 (--no-danmaku-layout로 끌 수 있음).
+<VIDEO_ID>.txt 최적화 리포트는 report_index.py로 캡션 중복을 제거한 열 저장소(report_index/)로
+변환합니다 (--no-report-index로 끌 수 있음).
+
+기본 동작은 증분 동기화입니다. data/.sync_manifest.json에 원본 파일의 크기/mtime/해시와
+복사본 상태를 기록해 두고, 바뀐 파일만 reflink → hardlink → 복사 순으로 가져옵니다.
+폴더는 스레드 풀에서 병렬로 처리됩니다.
+
+사용 예시:
+    python3 setup_data.py                      # 증분 동기화
+    python3 setup_data.py --clean              # 기존 폴더를 지우고 전체 재복사
+    python3 setup_data.py --link copy --jobs 4 # 링크 없이 복사, 4개 폴더씩 처리
+    python3 setup_data.py --update-video-only  # 복사된 HTML의 비디오 경로만 갱신
+    python3 setup_data.py --precompress-only   # 사전 압축 파일만 다시 생성
+    python3 setup_data.py --faststart-only     # MP4 faststart 변환만 수행
 """
+import argparse
+import gzip
+import hashlib
 import os
+import re
 import shutil
 import json
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from fnmatch import fnmatch
 
+from comment_store import STORE_DIR_NAME, build_comment_stores
+from danmaku_layout import LAYOUT_FILE_NAME, build_danmaku_layouts
+from folder_names import video_id_from_folder
+from mp4_faststart import MP4Error, optimize_mp4
+from report_index import INDEX_DIR_NAME, build_report_indexes
+
 # 현재 스크립트의 디렉토리
 SCRIPT_DIR = Path(__file__).parent
 DATA_DIR = SCRIPT_DIR / 'data'  # 복사된 데이터가 저장될 위치 (retest/data/)
+PREVIEW_DIR = SCRIPT_DIR / 'preview'
 
 VIDEO_DIR_CANDIDATES = [
     SCRIPT_DIR / 'video',
@@ -22,6 +60,51 @@ VIDEO_DIR_CANDIDATES = [
 
 DEFAULT_DATASET_COUNT = 5
 SKIP_FILE_PATTERNS = ['comment_corr.json']
+SYNC_MANIFEST_NAME = '.sync_manifest.json'
+LINK_MODES = ['auto', 'reflink', 'hardlink', 'copy']
+# Linux FICLONE ioctl (btrfs/xfs/overlayfs 등에서 copy-on-write 복제)
+FICLONE = 0x40049409
+
+HTML_FILES = [
+    'comvi_ui_default.html',
+    'youtube_ui.html',
+    'youtube_ui_one.html',
+    'danmaku_ui_default.html',
+    'danmaku_ui_one_default.html'
+]
+
+# 인라인 댓글 JSON을 옮겨 담는 폴더별 공유 파일 (setup 단계에서 생성, 원본에는 없음)
+COMMENTS_BUNDLE_NAME = 'comments.js'
+COMMENTS_BUNDLE_PREFIX = b'window.datasetComments = '
+GENERATED_FILES = {COMMENTS_BUNDLE_NAME, LAYOUT_FILE_NAME}
+# setup 단계에서 만드는 하위 폴더 (동기화 시 삭제하지 않음)
+GENERATED_DIR_PREFIXES = (f"{STORE_DIR_NAME}/", f"{INDEX_DIR_NAME}/")
+# (HTML 파일, 형태, 변수명 또는 script id, 번들 키)
+#   var  - <script> 안의 `var NAME = [...];`
+#   node - <script id="NAME" type="application/json">[...]</script>
+COMMENT_PAYLOADS = [
+    ('youtube_ui.html', 'var', 'optimalComments', 'youtube'),
+    ('youtube_ui_one.html', 'node', 'optimal-comments-data', 'youtube'),
+    ('danmaku_ui_default.html', 'node', 'danmaku-comments-data', 'danmaku'),
+]
+COMMENTS_KEY_PATTERN = re.compile(rb'data-comments-key="([\w-]+)"')
+
+# serve.py가 Accept-Encoding에 맞춰 보내는 사전 압축 파일
+PRECOMPRESS_SUFFIXES = {'.html', '.json', '.js', '.css', '.svg', '.txt'}
+PRECOMPRESS_MIN_SIZE = 1024
+# 압축 결과가 원본의 이 비율보다 크면 만들지 않음
+PRECOMPRESS_MAX_RATIO = 0.9
+COMPRESSED_SUFFIXES = ('.gz', '.br')
+
+# 예전 비디오 경로 형태를 하나의 패턴으로 합친 것
+#   /source/.../videos/<id>.mp4, ./video/<id>.mp4, ../video/<id>.mp4,
+#   /video/<id>.mp4, video/<id>.mp4, ./A.mp4 (미리보기용 한 글자 이름)
+# <source src=...>도 src= 부분에서 함께 처리됩니다.
+VIDEO_SRC_PATTERN = re.compile(
+    rb'''(?P<prefix>src=["'])'''
+    rb'''(?P<path>(?:/source/[^"']+videos/[^"']+|(?:\.\.?/|/)?video/[^"']+|\./[A-Za-z])\.mp4)'''
+    rb'''(?P<quote>["'])'''
+)
 
 def resolve_video_directory():
     """비디오 파일이 위치한 디렉토리와 retest 기준 상대 경로를 반환"""
@@ -84,20 +167,49 @@ def get_source_path():
     
     return None
 
-def update_video_paths_in_html(folder_path, folder_name):
-    """HTML 파일들에서 비디오 경로를 데이터 폴더 기준 상대 경로로 변경"""
-    import re
+def rewrite_video_sources(content, video_path):
+    """content(bytes)의 비디오 src 값을 video_path로 바꾸고 (결과, 변경 수)를 반환
+    
+    VIDEO_SRC_PATTERN 한 번의 스캔으로 src 값 부분만 교체하며,
+    이미 video_path인 src는 변경 수에 포함하지 않습니다.
+    """
+    replacement = video_path.encode('utf-8')
+    rewrites = 0
+    
+    def replace(match):
+        nonlocal rewrites
+        if match.group('path') == replacement:
+            return match.group(0)
+        rewrites += 1
+        return match.group('prefix') + replacement + match.group('quote')
+    
+    return VIDEO_SRC_PATTERN.sub(replace, content), rewrites
+
+def write_file_atomic(path, data):
+    """같은 디렉토리의 임시 파일에 쓴 뒤 rename으로 교체 (중간에 실패해도 원본 유지)"""
+    tmp = path.with_name(f".{path.name}.tmp")
+    with open(tmp, 'wb') as f:
+        f.write(data)
+    if path.exists():
+        shutil.copymode(path, tmp)
+    os.replace(tmp, path)
+
+def update_video_paths_in_html(folder_path, folder_name, log=print):
+    """HTML 파일들에서 비디오 경로를 데이터 폴더 기준 상대 경로로 변경
     
-    video_id = folder_name.split('_')[0]
+    파일별 교체 수를 {파일명: 개수}로 반환합니다.
+    """
+    video_id = video_id_from_folder(folder_name)
+    rewrite_counts = {}
     
     if not VIDEO_DIR:
-        print("   ⚠️  비디오 디렉토리를 찾을 수 없습니다.")
-        return
+        log("   ⚠️  비디오 디렉토리를 찾을 수 없습니다.")
+        return rewrite_counts
     
     video_file = VIDEO_DIR / f"{video_id}.mp4"
     if not video_file.exists():
-        print(f"   ⚠️  비디오 파일이 존재하지 않습니다: {video_file}")
-        return
+        log(f"   ⚠️  비디오 파일이 존재하지 않습니다: {video_file}")
+        return rewrite_counts
     
     try:
         relative_video_path = os.path.relpath(video_file, folder_path)
@@ -106,53 +218,260 @@ def update_video_paths_in_html(folder_path, folder_name):
     
     video_path = relative_video_path.replace(os.sep, '/')
     
-    html_files = [
-        'comvi_ui_default.html',
-        'youtube_ui.html',
-        'youtube_ui_one.html',
-        'danmaku_ui_default.html',
-        'danmaku_ui_one_default.html'
-    ]
-    
-    updated_count = 0
-    
-    for html_file in html_files:
+    for html_file in HTML_FILES:
         html_path = folder_path / html_file
         if not html_path.exists():
             continue
         
         try:
-            with open(html_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            original_content = content
-            
-            patterns = [
-                (r'(<source\s+src=["\'])/source/minsunkim/comment/source/videos/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(src=["\'])/source/[^"\']+videos/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(<source\s+src=["\'])\./video/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(src=["\'])\./video/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(<source\s+src=["\'])\./[A-Za-z]\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(src=["\'])\./[A-Za-z]\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(src=["\'])/?video/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2'),
-                (r'(src=["\'])\.\./video/[^"\']+\.mp4(["\'])', rf'\1{video_path}\2')
-            ]
-            
-            for pattern, replacement in patterns:
-                content = re.sub(pattern, replacement, content)
-            
-            if content != original_content:
-                with open(html_path, 'w', encoding='utf-8') as f:
-                    f.write(content)
-                updated_count += 1
-                print(f"   📹 비디오 경로 업데이트: {html_file} -> {video_path}")
+            content, rewrites = rewrite_video_sources(html_path.read_bytes(), video_path)
+            if rewrites:
+                write_file_atomic(html_path, content)
+                rewrite_counts[html_file] = rewrites
+                log(f"   📹 비디오 경로 업데이트: {html_file} ({rewrites}곳) -> {video_path}")
         except Exception as e:
-            print(f"   ⚠️  {html_file} 업데이트 실패: {e}")
+            log(f"   ⚠️  {html_file} 업데이트 실패: {e}")
     
-    if updated_count > 0:
-        print(f"   ✅ {updated_count}개 HTML 파일의 비디오 경로 업데이트 완료")
+    if rewrite_counts:
+        log(f"   ✅ {len(rewrite_counts)}개 HTML 파일의 비디오 경로 업데이트 완료")
+    return rewrite_counts
+
+def _comment_payload_pattern(kind, name):
+    name = re.escape(name.encode('utf-8'))
+    if kind == 'var':
+        # JSON 문자열에는 줄바꿈이 들어갈 수 없으므로 `];\n`이 배열의 끝
+        return re.compile(rb'var ' + name + rb' = (?P<payload>\[.*?\]);\n')
+    return re.compile(
+        rb'<script id="' + name + rb'" type="application/json">\s*(?P<payload>\[.*?\])\s*</script>',
+        re.S
+    )
+
+def _read_comments_bundle(bundle_path):
+    if not bundle_path.exists():
+        return {}
+    raw = bundle_path.read_bytes().strip()
+    if not raw.startswith(COMMENTS_BUNDLE_PREFIX):
+        return {}
+    try:
+        data = json.loads(raw[len(COMMENTS_BUNDLE_PREFIX):].rstrip(b';'))
+    except json.JSONDecodeError:
+        return {}
+    return data if isinstance(data, dict) else {}
+
+def externalize_comment_payloads(folder_path, log=print):
+    """인라인 댓글 JSON을 폴더의 comments.js 하나로 모으고 HTML에는 참조만 남김
+    
+    comments.js는 `window.datasetComments = {키: [...]}` 형태의 압축 JSON이며,
+    페이지 스크립트보다 먼저 일반 <script src>로 읽히므로 기존 페이지 코드는 그대로
+    동작합니다. 번들은 매번 새로 만들며, 이전 comments.js에서는 이미 분리된 HTML이 참조하는
+    키만 이어받습니다. 같은 내용의 목록은 하나의 키를 공유합니다.
+    파일별로 줄어든 바이트 수를 {파일명: 바이트}로 반환합니다.
+    """
+    bundle_path = folder_path / COMMENTS_BUNDLE_NAME
+    previous = _read_comments_bundle(bundle_path)
+    bundle = {}
+    pages = {}
+    inline = []
+    saved = {}
+    
+    for html_file, kind, name, key in COMMENT_PAYLOADS:
+        html_path = folder_path / html_file
+        if not html_path.exists():
+            continue
+        content = html_path.read_bytes()
+        pages[html_file] = content
+        match = _comment_payload_pattern(kind, name).search(content)
+        if not match:
+            # 이미 분리된 페이지 (동기화에서 바뀌지 않음)는 이전 목록을 그대로 씀
+            for ref in COMMENTS_KEY_PATTERN.findall(content):
+                ref = ref.decode('utf-8')
+                if ref in previous:
+                    bundle[ref] = previous[ref]
+            continue
+        try:
+            comments = json.loads(match.group('payload'))
+        except json.JSONDecodeError as e:
+            log(f"   ⚠️  {html_file} 댓글 JSON 파싱 실패: {e}")
+            continue
+        inline.append((html_file, kind, name, key, match, comments))
+    
+    for html_file, kind, name, key, match, comments in inline:
+        content = pages[html_file]
+        shared = next((k for k, v in bundle.items() if v == comments), None)
+        if shared is not None:
+            key = shared
+        elif key in bundle:
+            key = f"{key}_{Path(html_file).stem}"
+        bundle[key] = comments
+        
+        loader = f'<script src="{COMMENTS_BUNDLE_NAME}" data-comments-key="{key}"></script>'.encode('utf-8')
+        if kind == 'var':
+            replacement = (
+                f'var {name} = (window.datasetComments || {{}})[\'{key}\'] || [];\n'
+            ).encode('utf-8')
+            # 페이지 스크립트가 시작되기 전에 번들을 읽도록 해당 <script> 앞에 삽입
+            script_start = content.rfind(b'<script', 0, match.start())
+            updated = (
+                content[:script_start] + loader + b'\n  ' + content[script_start:match.start()]
+                + replacement + content[match.end():]
+            )
+        else:
+            node_id = name
+            replacement = (
+                loader + b'\n  '
+                + f'<script id="{node_id}" type="application/json"></script>\n  '.encode('utf-8')
+                + f'<script>document.getElementById(\'{node_id}\').textContent = '
+                  f'JSON.stringify((window.datasetComments || {{}})[\'{key}\'] || []);</script>'.encode('utf-8')
+            )
+            updated = content[:match.start()] + replacement + content[match.end():]
+        
+        pages[html_file] = updated
+        saved[html_file] = len(content) - len(updated)
+    
+    if not saved:
+        return saved
+    
+    # 번들을 먼저 쓰고 HTML을 교체해야 중간에 실패해도 페이지가 깨지지 않음
+    payload = json.dumps(bundle, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    bundle_tmp = bundle_path.with_name(f".{bundle_path.name}.tmp")
+    bundle_tmp.write_bytes(COMMENTS_BUNDLE_PREFIX + payload + b';\n')
+    os.replace(bundle_tmp, bundle_path)
+    for html_file in saved:
+        write_file_atomic(folder_path / html_file, pages[html_file])
+    
+    if saved:
+        total = sum(saved.values())
+        log(
+            f"   📦 댓글 JSON 분리: {', '.join(saved)} -> {COMMENTS_BUNDLE_NAME} "
+            f"(HTML {total / 1024:.0f}KB 감소, 번들 {len(payload) / 1024:.0f}KB)"
+        )
+    return saved
 
-def remove_unwanted_files(folder_path):
+def postprocess_html(folder_path, folder_name, externalize_comments=True, log=print):
+    """복사된 폴더의 HTML 후처리 (비디오 경로 갱신 → 댓글 JSON 분리)"""
+    update_video_paths_in_html(folder_path, folder_name, log=log)
+    if externalize_comments:
+        externalize_comment_payloads(folder_path, log=log)
+
+def precompress_file(path, brotli=None):
+    """path 옆에 .gz/.br을 만들고 새로 만든 인코딩 목록을 반환 (이미 최신이면 건너뜀)"""
+    source_stat = path.stat()
+    if source_stat.st_size < PRECOMPRESS_MIN_SIZE:
+        return []
+    
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if brotli is not None:
+        encoders.append(('.br', lambda data: brotli.compress(data, quality=11)))
+    
+    data = None
+    created = []
+    for suffix, encode in encoders:
+        target = path.with_name(path.name + suffix)
+        if target.exists() and target.stat().st_mtime_ns >= source_stat.st_mtime_ns:
+            continue
+        if data is None:
+            data = path.read_bytes()
+        compressed = encode(data)
+        if len(compressed) > len(data) * PRECOMPRESS_MAX_RATIO:
+            target.unlink(missing_ok=True)
+            continue
+        write_file_atomic(target, compressed)
+        created.append(suffix)
+    return created
+
+def iter_precompress_targets(root, recursive=True):
+    walker = os.walk(root) if recursive else [(str(root), [], os.listdir(root))]
+    for dir_path, dir_names, file_names in walker:
+        dir_names[:] = [d for d in dir_names if not d.startswith('.') and d != '__pycache__']
+        for file_name in file_names:
+            if file_name.startswith('.'):
+                continue
+            path = Path(dir_path) / file_name
+            if path.suffix.lower() in PRECOMPRESS_SUFFIXES and path.is_file():
+                yield path
+
+def remove_stale_compressed(root):
+    """원본이 사라진 .gz/.br 파일을 삭제"""
+    removed = 0
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if file_name.endswith(COMPRESSED_SUFFIXES):
+                base = Path(dir_path) / file_name[:-3]
+                if base.suffix.lower() in PRECOMPRESS_SUFFIXES and not base.exists():
+                    (Path(dir_path) / file_name).unlink()
+                    removed += 1
+    return removed
+
+def precompress_assets(jobs=None, log=print):
+    """retest 최상위 페이지와 data/ 아래 파일을 사전 압축 (파일 단위 병렬 처리)"""
+    try:
+        import brotli
+    except ImportError:
+        brotli = None
+        log("   ℹ️  brotli 모듈이 없어 .gz만 생성합니다. (pip install brotli)")
+    
+    targets = list(iter_precompress_targets(SCRIPT_DIR, recursive=False))
+    if DATA_DIR.exists():
+        targets.extend(iter_precompress_targets(DATA_DIR))
+        removed = remove_stale_compressed(DATA_DIR)
+        if removed:
+            log(f"   🧹 원본이 없는 압축 파일 {removed}개 삭제")
+    
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    created = {'.gz': 0, '.br': 0}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for suffixes in executor.map(lambda path: precompress_file(path, brotli), targets):
+            for suffix in suffixes:
+                created[suffix] += 1
+    log(
+        f"🗜️  사전 압축 완료: 대상 {len(targets)}개, "
+        f".gz {created['.gz']}개, .br {created['.br']}개 새로 생성"
+    )
+    return created
+
+def iter_faststart_targets(folder_names=None):
+    """preview/의 MP4와, 데이터 폴더가 가리키는 비디오 폴더의 <VIDEO_ID>.mp4"""
+    if PREVIEW_DIR.exists():
+        for path in sorted(PREVIEW_DIR.iterdir()):
+            if path.suffix.lower() == '.mp4' and path.is_file():
+                yield path
+    if not VIDEO_DIR:
+        return
+    if folder_names is None:
+        folder_names = sorted(p.name for p in DATA_DIR.iterdir() if p.is_dir()) if DATA_DIR.exists() else []
+    seen = set()
+    for folder_name in folder_names:
+        video_file = VIDEO_DIR / f"{video_id_from_folder(folder_name)}.mp4"
+        if video_file not in seen and video_file.is_file():
+            seen.add(video_file)
+            yield video_file
+
+def faststart_videos(folder_names=None, jobs=None, log=print):
+    """MP4의 moov 박스를 앞으로 옮김 (이미 변환된 파일은 건너뜀, 파일 단위 병렬 처리)"""
+    targets = list(iter_faststart_targets(folder_names))
+    
+    def process(path):
+        try:
+            return path, *optimize_mp4(path)
+        except (OSError, MP4Error) as e:
+            return path, 'error', str(e)
+    
+    counts = {}
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for path, status, message in executor.map(process, targets):
+            counts[status] = counts.get(status, 0) + 1
+            if status == 'optimized':
+                log(f"   🎬 {path.name}: {message}")
+            elif status != 'faststart':
+                log(f"   ⚠️  {path.name}: {message}")
+    log(
+        f"🎬 faststart 완료: 대상 {len(targets)}개, 변환 {counts.get('optimized', 0)}개, "
+        f"이미 변환됨 {counts.get('faststart', 0)}개"
+    )
+    return counts
+
+def remove_unwanted_files(folder_path, log=print):
     """Remove files that should not be included in the dataset."""
     if not SKIP_FILE_PATTERNS:
         return
@@ -165,14 +484,223 @@ def remove_unwanted_files(folder_path):
                     file_path.unlink()
                     removed += 1
                     rel = file_path.relative_to(folder_path)
-                    print(f"   🧾 불필요 파일 제거: {rel}")
+                    log(f"   🧾 불필요 파일 제거: {rel}")
                 except FileNotFoundError:
                     continue
     if removed > 0:
-        print(f"   ✅ {removed}개 파일을 제외했습니다.")
+        log(f"   ✅ {removed}개 파일을 제외했습니다.")
+
+def file_sha256(path, chunk_size=1024 * 1024):
+    """파일의 sha256 해시를 반환"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _try_reflink(src, dst):
+    """FICLONE으로 copy-on-write 복제를 시도 (지원하지 않으면 False)"""
+    try:
+        import fcntl
+    except ImportError:
+        return False
+    try:
+        with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+            fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    except OSError:
+        try:
+            os.unlink(dst)
+        except FileNotFoundError:
+            pass
+        return False
+    shutil.copystat(src, dst)
+    return True
+
+def link_or_copy(src, dst, link_mode='auto', allow_hardlink=True):
+    """src를 dst로 가져오고 사용한 방식(reflink/hardlink/copy)을 반환
+    
+    임시 파일에 만든 뒤 os.replace로 교체하므로 중간에 실패해도 기존 파일이 남습니다.
+    내용이 수정되는 파일(HTML)은 원본이 함께 바뀌지 않도록 hardlink를 쓰지 않습니다.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.sync-tmp")
+    if tmp.exists():
+        tmp.unlink()
+    
+    method = None
+    if link_mode in ('auto', 'reflink') and _try_reflink(src, tmp):
+        method = 'reflink'
+    elif link_mode in ('auto', 'hardlink') and allow_hardlink:
+        try:
+            os.link(src, tmp)
+            method = 'hardlink'
+        except OSError:
+            pass
+    if method is None:
+        shutil.copy2(src, tmp)
+        method = 'copy'
+    
+    os.replace(tmp, dst)
+    # 같은 inode를 가리키는 두 이름 사이의 rename은 아무 일도 하지 않음
+    if tmp.exists():
+        tmp.unlink()
+    return method
+
+def load_sync_manifest(target_dir):
+    manifest_path = target_dir / SYNC_MANIFEST_NAME
+    if not manifest_path.exists():
+        return {}
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+def save_sync_manifest(target_dir, manifest):
+    manifest_path = target_dir / SYNC_MANIFEST_NAME
+    tmp = manifest_path.with_suffix('.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+
+def _is_skipped(file_name):
+    return any(fnmatch(file_name, pattern) for pattern in SKIP_FILE_PATTERNS)
+
+def _scan_files(root):
+    """root 아래 파일을 {상대경로: os.stat_result}로 반환 (제외 패턴 적용)"""
+    files = {}
+    for dir_path, _, file_names in os.walk(root):
+        for file_name in file_names:
+            if _is_skipped(file_name) or file_name.endswith('.sync-tmp'):
+                continue
+            full_path = Path(dir_path) / file_name
+            rel = full_path.relative_to(root).as_posix()
+            files[rel] = full_path.stat()
+    return files
+
+def _target_unchanged(entry, target_stat):
+    return (
+        target_stat is not None
+        and entry.get('target_size') == target_stat.st_size
+        and entry.get('target_mtime_ns') == target_stat.st_mtime_ns
+    )
 
-def copy_data_folders(source_path, target_dir, folder_names):
-    """소스 경로의 폴더들을 타겟 디렉토리로 복사 (폴더명을 유지)"""
+def sync_folder(source_folder, target_folder, folder_name, entries, link_mode='auto',
+                externalize_comments=True, log=print):
+    """원본 폴더와 타겟 폴더를 매니페스트 기준으로 증분 동기화
+    
+    크기와 mtime이 같고 복사본도 그대로면 건너뛰고, mtime만 바뀐 파일은 해시가 같으면
+    건너뜁니다. 원본에 없는 파일은 타겟에서 삭제합니다. 갱신된 매니페스트 항목과
+    처리 통계를 반환합니다.
+    """
+    source_files = _scan_files(source_folder)
+    target_files = _scan_files(target_folder) if target_folder.exists() else {}
+    stats = {'skipped': 0, 'reflink': 0, 'hardlink': 0, 'copy': 0, 'removed': 0}
+    new_entries = {}
+    changed_html = False
+    
+    if externalize_comments and not (target_folder / COMMENTS_BUNDLE_NAME).exists():
+        # 번들이 사라졌는데 HTML이 이미 분리된 상태면 원본 HTML부터 다시 가져옴
+        entries = {
+            rel: entry for rel, entry in entries.items()
+            if not (
+                rel in HTML_FILES
+                and rel in target_files
+                and COMMENTS_KEY_PATTERN.search((target_folder / rel).read_bytes())
+            )
+        }
+    
+    for rel, src_stat in source_files.items():
+        src = source_folder / rel
+        dst = target_folder / rel
+        entry = entries.get(rel, {})
+        target_stat = target_files.get(rel)
+        is_html = rel in HTML_FILES
+        
+        if (
+            target_stat is not None
+            and not is_html
+            and (target_stat.st_dev, target_stat.st_ino) == (src_stat.st_dev, src_stat.st_ino)
+        ):
+            # 원본과 hardlink로 연결된 파일은 항상 최신 상태
+            new_entries[rel] = dict(entry, size=src_stat.st_size, mtime_ns=src_stat.st_mtime_ns)
+            new_entries[rel].pop('target_size', None)
+            stats['skipped'] += 1
+            continue
+        
+        if entry.get('size') == src_stat.st_size and _target_unchanged(entry, target_stat):
+            if entry.get('mtime_ns') == src_stat.st_mtime_ns:
+                new_entries[rel] = entry
+                stats['skipped'] += 1
+                continue
+            # mtime만 바뀐 경우 내용이 같은지 해시로 확인
+            src_hash = file_sha256(src)
+            known_hash = entry.get('sha256') or (None if is_html else file_sha256(dst))
+            if src_hash == known_hash:
+                new_entries[rel] = dict(entry, mtime_ns=src_stat.st_mtime_ns, sha256=src_hash)
+                stats['skipped'] += 1
+                continue
+        
+        method = link_or_copy(src, dst, link_mode, allow_hardlink=not is_html)
+        stats[method] += 1
+        changed_html = changed_html or is_html
+        new_entries[rel] = {
+            'size': src_stat.st_size,
+            'mtime_ns': src_stat.st_mtime_ns,
+            # HTML은 복사 후 내용이 바뀌므로 원본 해시를 기록해 둠
+            'sha256': file_sha256(src) if is_html else None,
+        }
+    
+    for rel in set(target_files) - set(source_files) - GENERATED_FILES:
+        if rel.startswith(GENERATED_DIR_PREFIXES):
+            continue
+        if rel.endswith(COMPRESSED_SUFFIXES):
+            # 사전 압축 파일은 precompress 단계에서 관리
+            continue
+        (target_folder / rel).unlink()
+        stats['removed'] += 1
+    for dir_path, dir_names, file_names in os.walk(target_folder, topdown=False):
+        if dir_path != str(target_folder) and not dir_names and not file_names:
+            os.rmdir(dir_path)
+    
+    if changed_html:
+        postprocess_html(target_folder, folder_name, externalize_comments, log=log)
+    
+    # 후처리까지 끝난 복사본 상태를 기록
+    for rel, entry in new_entries.items():
+        if 'target_size' not in entry or rel in HTML_FILES:
+            target_stat = (target_folder / rel).stat()
+            entry['target_size'] = target_stat.st_size
+            entry['target_mtime_ns'] = target_stat.st_mtime_ns
+    
+    return new_entries, stats
+
+def _copy_folder_clean(source_folder, target_folder, folder_name, externalize_comments, log):
+    """기존 방식: 타겟 폴더를 지우고 전체를 다시 복사"""
+    if target_folder.exists():
+        log(f"🗑️  기존 폴더 삭제 중: {target_folder}")
+        shutil.rmtree(target_folder)
+    
+    log(f"📁 복사 중: {source_folder} -> {target_folder}")
+    if SKIP_FILE_PATTERNS:
+        shutil.copytree(
+            source_folder,
+            target_folder,
+            ignore=shutil.ignore_patterns(*SKIP_FILE_PATTERNS)
+        )
+    else:
+        shutil.copytree(source_folder, target_folder)
+    
+    postprocess_html(target_folder, folder_name, externalize_comments, log=log)
+    remove_unwanted_files(target_folder, log=log)
+
+def copy_data_folders(source_path, target_dir, folder_names, jobs=None, link_mode='auto', clean=False,
+                      externalize_comments=True):
+    """소스 경로의 폴더들을 타겟 디렉토리로 동기화 (폴더명을 유지)
+    
+    clean=True면 기존처럼 폴더를 지우고 전체를 다시 복사합니다.
+    """
     target_dir.mkdir(parents=True, exist_ok=True)
     
     # 기존에 남아있는 폴더 정리
@@ -182,41 +710,59 @@ def copy_data_folders(source_path, target_dir, folder_names):
         print(f"🧹 불필요한 폴더 삭제: {leftover_path}")
         shutil.rmtree(leftover_path, ignore_errors=True)
     
-    copied_folders = []
-    failed_folders = []
+    manifest = {} if clean else load_sync_manifest(target_dir)
     
-    for folder_name in folder_names:
+    def process(folder_name):
+        lines = []
+        log = lines.append
         source_folder = source_path / folder_name
         target_folder = target_dir / folder_name
         
         if not source_folder.exists():
-            print(f"⚠️  소스 폴더가 존재하지 않습니다: {source_folder}")
-            failed_folders.append(folder_name)
-            continue
+            log(f"⚠️  소스 폴더가 존재하지 않습니다: {source_folder}")
+            return folder_name, False, None, lines
         
         try:
-            if target_folder.exists():
-                print(f"🗑️  기존 폴더 삭제 중: {target_folder}")
-                shutil.rmtree(target_folder)
-            
-            print(f"📁 복사 중: {source_folder} -> {target_folder}")
-            if SKIP_FILE_PATTERNS:
-                shutil.copytree(
-                    source_folder,
-                    target_folder,
-                    ignore=shutil.ignore_patterns(*SKIP_FILE_PATTERNS)
-                )
+            if clean:
+                _copy_folder_clean(source_folder, target_folder, folder_name, externalize_comments, log)
+                entries = None
+                log(f"✅ 복사 완료: {folder_name}")
             else:
-                shutil.copytree(source_folder, target_folder)
-            
-            update_video_paths_in_html(target_folder, folder_name)
-            remove_unwanted_files(target_folder)
-            
-            copied_folders.append(folder_name)
-            print(f"✅ 복사 완료: {folder_name}")
+                entries, stats = sync_folder(
+                    source_folder, target_folder, folder_name,
+                    manifest.get(folder_name, {}), link_mode, externalize_comments, log
+                )
+                log(
+                    f"✅ 동기화 완료: {folder_name} "
+                    f"(유지 {stats['skipped']}, reflink {stats['reflink']}, "
+                    f"hardlink {stats['hardlink']}, 복사 {stats['copy']}, 삭제 {stats['removed']})"
+                )
+            return folder_name, True, entries, lines
         except Exception as e:
-            print(f"❌ 복사 실패 ({folder_name}): {e}")
-            failed_folders.append(folder_name)
+            log(f"❌ 복사 실패 ({folder_name}): {e}")
+            return folder_name, False, None, lines
+    
+    copied_folders = []
+    failed_folders = []
+    new_manifest = {}
+    
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        # 로그는 폴더 순서대로 출력
+        for folder_name, ok, entries, lines in executor.map(process, folder_names):
+            for line in lines:
+                print(line)
+            if ok:
+                copied_folders.append(folder_name)
+                if entries is not None:
+                    new_manifest[folder_name] = entries
+            else:
+                failed_folders.append(folder_name)
+    
+    if clean:
+        (target_dir / SYNC_MANIFEST_NAME).unlink(missing_ok=True)
+    else:
+        save_sync_manifest(target_dir, new_manifest)
     
     return copied_folders, failed_folders
 
@@ -257,7 +803,7 @@ def write_data_folders_json(folder_names):
     with open(json_file, 'w', encoding='utf-8') as f:
         json.dump(folder_names, f, ensure_ascii=False, indent=2)
 
-def main():
+def main(args):
     print("=" * 60)
     print("데이터 폴더 복사 스크립트")
     print("=" * 60)
@@ -312,7 +858,31 @@ def main():
     print()
     
     # 폴더 복사
-    copied, failed = copy_data_folders(source_path, DATA_DIR, folder_names)
+    copied, failed = copy_data_folders(
+        source_path, DATA_DIR, folder_names,
+        jobs=args.jobs, link_mode=args.link, clean=args.clean,
+        externalize_comments=not args.keep_inline_comments
+    )
+    
+    if not args.no_faststart:
+        print()
+        faststart_videos(folder_names, jobs=args.jobs)
+    
+    if not args.no_comment_store:
+        print()
+        build_comment_stores([DATA_DIR / name for name in folder_names if (DATA_DIR / name).is_dir()], jobs=args.jobs)
+    
+    if not args.no_danmaku_layout:
+        print()
+        build_danmaku_layouts([DATA_DIR / name for name in folder_names if (DATA_DIR / name).is_dir()], jobs=args.jobs)
+    
+    if not args.no_report_index:
+        print()
+        build_report_indexes([DATA_DIR / name for name in folder_names if (DATA_DIR / name).is_dir()], jobs=args.jobs)
+    
+    if not args.no_precompress:
+        print()
+        precompress_assets(jobs=args.jobs)
     
     print()
     print("=" * 60)
@@ -332,14 +902,14 @@ def main():
     print()
     print("✅ 완료! 다음 단계:")
     print("1. config.js의 dataBasePath가 'data'로 설정되어 있는지 확인하세요")
-    print("2. get_data_folders.py를 실행하여 data_folders.json을 업데이트하세요")
-    print("3. 웹 서버를 실행하세요: python3 -m http.server 8000")
+    print("2. get_data_folders.py를 실행하여 data_folders.json과 data_catalog.json을 업데이트하세요")
+    print("3. 웹 서버를 실행하세요: python3 serve.py --port 8000")
     print()
     print("💡 이미 복사된 파일의 비디오 경로만 업데이트하려면:")
-    print("   update_video_paths_only() 함수를 호출하세요")
+    print("   python3 setup_data.py --update-video-only")
 
-def update_video_paths_only():
-    """이미 복사된 HTML 파일들의 비디오 경로만 업데이트"""
+def update_video_paths_only(jobs=None):
+    """이미 복사된 HTML 파일들의 비디오 경로만 업데이트 (폴더별 병렬 처리)"""
     print("=" * 60)
     print("비디오 경로 업데이트만 수행")
     print("=" * 60)
@@ -351,28 +921,61 @@ def update_video_paths_only():
         print("먼저 setup_data.py를 실행하여 데이터를 복사하세요.")
         return
     
-    folder_paths = [p for p in data_dir.iterdir() if p.is_dir()]
+    folder_paths = sorted(p for p in data_dir.iterdir() if p.is_dir())
     
     if not folder_paths:
         print("⚠️  업데이트할 폴더가 없습니다.")
         return
     
-    updated_folders = []
-    for folder_path in folder_paths:
-        print(f"📁 {folder_path.name} 폴더 처리 중...")
-        update_video_paths_in_html(folder_path, folder_path.name)
-        remove_unwanted_files(folder_path)
-        updated_folders.append(folder_path.name)
+    def process(folder_path):
+        lines = [f"📁 {folder_path.name} 폴더 처리 중..."]
+        counts = update_video_paths_in_html(folder_path, folder_path.name, log=lines.append)
+        remove_unwanted_files(folder_path, log=lines.append)
+        return lines, counts
+    
+    total_rewrites = 0
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for lines, counts in executor.map(process, folder_paths):
+            for line in lines:
+                print(line)
+            total_rewrites += sum(counts.values())
     
     print()
     print("=" * 60)
-    print(f"✅ {len(updated_folders)}개 폴더의 비디오 경로 업데이트 완료")
+    print(f"✅ {len(folder_paths)}개 폴더의 비디오 경로 업데이트 완료 (교체 {total_rewrites}곳)")
     print("=" * 60)
 
+def parse_args():
+    parser = argparse.ArgumentParser(description="원본 데이터 폴더를 retest/data/로 동기화")
+    parser.add_argument('--update-video-only', action='store_true', help="복사된 HTML의 비디오 경로만 업데이트")
+    parser.add_argument('--clean', action='store_true', help="기존 폴더를 지우고 전체를 다시 복사 (증분 동기화 끔)")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 처리할 폴더 수 (기본: CPU 수 기반, 최대 8)")
+    parser.add_argument(
+        '--link', choices=LINK_MODES, default='auto',
+        help="파일 가져오는 방식 (auto: reflink → hardlink → 복사, 기본값: auto)"
+    )
+    parser.add_argument('--precompress-only', action='store_true', help="HTML/JSON/JS 사전 압축 파일만 생성")
+    parser.add_argument('--no-precompress', action='store_true', help="복사 후 사전 압축 단계를 건너뜀")
+    parser.add_argument('--faststart-only', action='store_true', help="preview/와 비디오 폴더의 MP4 faststart 변환만 수행")
+    parser.add_argument('--no-faststart', action='store_true', help="복사 후 MP4 faststart 단계를 건너뜀")
+    parser.add_argument('--no-comment-store', action='store_true', help="복사 후 댓글 열 저장소(comment_store/) 생성을 건너뜀")
+    parser.add_argument('--no-danmaku-layout', action='store_true', help="복사 후 단무쿠 레인 사전 계산(danmaku_layout.json)을 건너뜀")
+    parser.add_argument('--no-report-index', action='store_true', help="복사 후 최적화 리포트 인덱스(report_index/) 생성을 건너뜀")
+    parser.add_argument(
+        '--keep-inline-comments', action='store_true',
+        help="HTML에 인라인으로 들어 있는 댓글 JSON을 comments.js로 분리하지 않음"
+    )
+    return parser.parse_args()
+
 if __name__ == '__main__':
-    import sys
-    if len(sys.argv) > 1 and sys.argv[1] == '--update-video-only':
-        update_video_paths_only()
+    args = parse_args()
+    if args.update_video_only:
+        update_video_paths_only(jobs=args.jobs)
+    elif args.precompress_only:
+        precompress_assets(jobs=args.jobs)
+    elif args.faststart_only:
+        faststart_videos(jobs=args.jobs)
     else:
-        main()
+        main(args)
 
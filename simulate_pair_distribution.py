@@ -3,17 +3,34 @@
 Simulate how often each interface/data pairing is shown when the fair
 rotation schedule from config.js is repeated.
 
+The default mode walks participants one by one. ``--vectorized`` builds the
+whole assignment as integer arrays and counts pairs with ``np.bincount``, which
+makes millions of participants practical, and reports balance metrics
+(max/min pair count, chi-square against a uniform split, position x data
+balance under the per-participant shuffle done by config.js).
+
+Schedules are read from config.js (the active FAIR_DATA_PERMUTATIONS block and
+any commented-out ``// step = N`` blocks) or from a JSON file holding either a
+list of permutations, a ``{"name": [[...], ...]}`` mapping, or the schedule
+written by generate_balanced_design.py.
+
 Example:
     python simulate_pair_distribution.py --participants 30
+    python simulate_pair_distribution.py --vectorized --participants 1000000 \\
+        --schedule config.js --all-schedules
 """
 
 from __future__ import annotations
 
 import argparse
 import json
+import re
 from collections import defaultdict
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
 
 INTERFACE_ORDER = ['C', 'D', 'D1', 'Y', 'Y1']
 FAIR_DATA_PERMUTATIONS = [
@@ -23,6 +40,11 @@ FAIR_DATA_PERMUTATIONS = [
     [3, 4, 0, 1, 2],
     [4, 0, 1, 2, 3],
 ]
+CHUNK_PARTICIPANTS = 1_000_000
+
+_PERMUTATION_BLOCK = re.compile(r'FAIR_DATA_PERMUTATIONS\s*=\s*\[(.*?)\n\s*\];', re.S)
+_STEP_LABEL = re.compile(r'^//\s*(step\s*=\s*\d+)', re.I)
+_ROW = re.compile(r'^(//)?\s*\[([\d\s,]+)\]')
 
 
 def load_data_folders(path: Path, expected: int) -> List[str]:
@@ -39,13 +61,62 @@ def load_data_folders(path: Path, expected: int) -> List[str]:
     return fallback[:expected]
 
 
-def simulate(participants: int, data_folders: List[str]) -> Dict[Tuple[str, str], int]:
+def parse_config_schedules(text: str) -> Dict[str, List[List[int]]]:
+    """Extract FAIR_DATA_PERMUTATIONS from config.js source.
+
+    The uncommented rows form the ``active`` schedule. Commented rows are kept
+    under the preceding ``// step = N`` label so retired schedules can still be
+    compared.
+    """
+    match = _PERMUTATION_BLOCK.search(text)
+    if not match:
+        raise ValueError('FAIR_DATA_PERMUTATIONS not found in config.js')
+
+    schedules: Dict[str, List[List[int]]] = {}
+    label = 'unlabeled'
+    for raw in match.group(1).splitlines():
+        line = raw.strip()
+        label_match = _STEP_LABEL.match(line)
+        if label_match:
+            label = re.sub(r'\s+', '', label_match.group(1)).lower()
+            continue
+        row_match = _ROW.match(line)
+        if not row_match:
+            continue
+        row = [int(v) for v in row_match.group(2).split(',') if v.strip()]
+        name = label if row_match.group(1) else 'active'
+        schedules.setdefault(name, []).append(row)
+    return schedules
+
+
+def load_schedules(path: Path) -> Dict[str, List[List[int]]]:
+    """Load named schedules from config.js or a JSON file."""
+    text = path.read_text(encoding='utf-8')
+    if path.suffix == '.js':
+        return parse_config_schedules(text)
+    data = json.loads(text)
+    if isinstance(data, list):
+        return {path.stem: data}
+    if isinstance(data, dict) and 'permutations' in data:
+        # Output of generate_balanced_design.py
+        return {path.stem: data['permutations']}
+    if isinstance(data, dict):
+        return {str(name): rows for name, rows in data.items()}
+    raise ValueError(f'Unsupported schedule format in {path}')
+
+
+def simulate(
+    participants: int,
+    data_folders: List[str],
+    schedule: Optional[List[List[int]]] = None,
+) -> Dict[Tuple[str, str], int]:
     """Return how many times each (interface, data) pair occurs."""
+    schedule = schedule or FAIR_DATA_PERMUTATIONS
     counts: Dict[Tuple[str, str], int] = defaultdict(int)
-    schedule_len = len(FAIR_DATA_PERMUTATIONS)
+    schedule_len = len(schedule)
 
     for person in range(participants):
-        permutation = FAIR_DATA_PERMUTATIONS[person % schedule_len]
+        permutation = schedule[person % schedule_len]
         for iface_idx, data_idx in enumerate(permutation):
             interface = INTERFACE_ORDER[iface_idx]
             data = data_folders[data_idx]
@@ -54,6 +125,87 @@ def simulate(participants: int, data_folders: List[str]) -> Dict[Tuple[str, str]
     return counts
 
 
+def simulate_vectorized(
+    participants: int,
+    n_data: int,
+    schedule: List[List[int]],
+    seed: int = 0,
+) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Count pairs for all participants at once.
+
+    Returns ``(pair_counts, position_counts)``: an interfaces x data matrix and
+    a position x data matrix. Presentation order is shuffled per participant
+    like ``shuffleArray`` in config.js. Work is chunked so memory stays flat.
+    """
+    import numpy as np
+
+    perms = np.asarray(schedule, dtype=np.int64) % n_data
+    n_perm, n_iface = perms.shape
+    iface_offsets = np.arange(n_iface, dtype=np.int64) * n_data
+    pair_counts = np.zeros(n_iface * n_data, dtype=np.int64)
+    position_counts = np.zeros(n_iface * n_data, dtype=np.int64)
+    rng = np.random.default_rng(seed)
+
+    for start in range(0, participants, CHUNK_PARTICIPANTS):
+        stop = min(start + CHUNK_PARTICIPANTS, participants)
+        data = perms[np.arange(start, stop) % n_perm]
+        pair_counts += np.bincount((data + iface_offsets).ravel(), minlength=pair_counts.size)
+        order = np.argsort(rng.random(data.shape), axis=1)
+        shown = np.take_along_axis(data, order, axis=1)
+        position_counts += np.bincount((shown + iface_offsets).ravel(), minlength=position_counts.size)
+
+    return pair_counts.reshape(n_iface, n_data), position_counts.reshape(n_iface, n_data)
+
+
+def balance_metrics(counts: 'np.ndarray') -> Dict[str, float]:
+    """Summarize how far a count matrix is from a perfectly uniform split."""
+    import numpy as np
+    from scipy.stats import chi2
+
+    observed = counts.ravel().astype(float)
+    expected = observed.sum() / observed.size
+    chi_square = float(((observed - expected) ** 2).sum() / expected) if expected else 0.0
+    dof = observed.size - 1
+    low, high = int(observed.min()), int(observed.max())
+    return {
+        'min': low,
+        'max': high,
+        'max_min_ratio': float(high / low) if low else float('inf'),
+        'cv': float(observed.std() / expected) if expected else 0.0,
+        'chi_square': chi_square,
+        'dof': dof,
+        'p_value': float(chi2.sf(chi_square, dof)),
+        'zero_cells': int(np.count_nonzero(observed == 0)),
+    }
+
+
+def _print_metrics(title: str, metrics: Dict[str, float]) -> None:
+    print(
+        f'{title:<16} min={metrics["min"]:<10d} max={metrics["max"]:<10d} '
+        f'max/min={metrics["max_min_ratio"]:.4f}  cv={metrics["cv"]:.5f}  '
+        f'chi2={metrics["chi_square"]:.2f} (dof={metrics["dof"]}, p={metrics["p_value"]:.4g})  '
+        f'zero={metrics["zero_cells"]}'
+    )
+
+
+def report_vectorized(
+    name: str,
+    schedule: List[List[int]],
+    participants: int,
+    data_folders: List[str],
+    seed: int,
+) -> None:
+    pair_counts, position_counts = simulate_vectorized(participants, len(data_folders), schedule, seed)
+    print(f'Schedule: {name} ({len(schedule)} permutations)')
+    _print_metrics('interface x data', balance_metrics(pair_counts))
+    _print_metrics('position x data', balance_metrics(position_counts))
+    header = ' ' * 6 + ''.join(f'{data[:12]:>14}' for data in data_folders)
+    print(header)
+    for interface, row in zip(INTERFACE_ORDER, pair_counts):
+        print(f'{interface:<6}' + ''.join(f'{value:>14d}' for value in row))
+    print('-' * 60)
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description='Count interface/data pair usage over multiple participants.'
@@ -70,10 +222,49 @@ def main() -> None:
         default=Path('data_folders.json'),
         help='Path to data_folders.json (default: ./data_folders.json)',
     )
+    parser.add_argument(
+        '--schedule',
+        type=Path,
+        action='append',
+        default=None,
+        help='config.js or JSON schedule file; repeat to compare (default: ./config.js)',
+    )
+    parser.add_argument(
+        '--all-schedules',
+        action='store_true',
+        help='Also include commented-out schedules found in config.js',
+    )
+    parser.add_argument(
+        '--vectorized',
+        action='store_true',
+        help='Count with NumPy arrays and print balance metrics',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Seed for the order shuffle (default: 0)')
     args = parser.parse_args()
 
     data_folders = load_data_folders(args.data_folders, len(INTERFACE_ORDER))
-    counts = simulate(args.participants, data_folders)
+    schedules: Dict[str, List[List[int]]] = {}
+    for path in args.schedule or [Path('config.js')]:
+        if not path.exists():
+            if args.schedule:
+                parser.error(f'schedule file not found: {path}')
+            continue
+        for name, rows in load_schedules(path).items():
+            if path.suffix == '.js' and name != 'active' and not args.all_schedules:
+                continue
+            schedules[f'{path.name}:{name}'] = rows
+    if not schedules:
+        schedules['builtin'] = FAIR_DATA_PERMUTATIONS
+
+    if args.vectorized:
+        print(f'Participants: {args.participants}')
+        print(f'Data folders: {data_folders}')
+        print('-' * 60)
+        for name, rows in schedules.items():
+            report_vectorized(name, rows, args.participants, data_folders, args.seed)
+        return
+
+    counts = simulate(args.participants, data_folders, next(iter(schedules.values())))
 
     print(f'Participants: {args.participants}')
     print(f'Data folders: {data_folders}')
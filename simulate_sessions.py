@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+Discrete-event simulation of real study sessions and the pairing counter.
+
+simulate_pair_distribution.py assumes participants arrive one at a time and
+all finish. Here sessions arrive as a Poisson process, take a log-normal time
+to finish, may drop out, and obtain their permutation index the way config.js
+does: ``fetchGlobalPermutationIndex()`` via the Supabase RPC, falling back to
+``getNextFairPermutationIndex()`` (a fresh browser's localStorage, i.e. index
+0) when the RPC fails.
+
+Counter strategies:
+    atomic       - the RPC increments and returns the counter in one step
+    read-write   - the client reads the counter and writes +1 after a round
+                   trip; concurrent starts read the same value (lost updates)
+    on-complete  - the counter is the number of submitted responses, so it
+                   only advances when a session finishes
+
+Events (arrivals, counter writes, completions) are processed in time order
+with a heap; exposure counts for completed sessions are then tallied with
+NumPy.
+
+Example:
+    python simulate_sessions.py --sessions 200000 --arrival-rate 60
+    python simulate_sessions.py --strategy read-write --rpc-failure 0.05 \\
+        --checkpoints 50 100 200 500
+"""
+
+from __future__ import annotations
+
+import argparse
+import heapq
+import math
+from pathlib import Path
+from typing import Dict, List
+
+import numpy as np
+
+from simulate_pair_distribution import (
+    FAIR_DATA_PERMUTATIONS,
+    INTERFACE_ORDER,
+    balance_metrics,
+    load_data_folders,
+    load_schedules,
+)
+
+STRATEGIES = ('atomic', 'read-write', 'on-complete')
+DEFAULT_CHECKPOINTS = [30, 60, 120, 300, 1000]
+
+
+def draw_sessions(
+    sessions: int,
+    arrival_rate: float,
+    duration_median: float,
+    duration_sigma: float,
+    dropout: float,
+    rpc_failure: float,
+    rpc_latency: float,
+    rng: np.random.Generator,
+) -> Dict[str, np.ndarray]:
+    """Draw arrival times, durations and per-session outcomes (times in minutes)."""
+    arrivals = np.cumsum(rng.exponential(60.0 / arrival_rate, sessions))
+    durations = rng.lognormal(math.log(duration_median), duration_sigma, sessions)
+    dropped = rng.random(sessions) < dropout
+    # Dropouts leave somewhere in the middle of the study
+    durations = np.where(dropped, durations * rng.random(sessions), durations)
+    return {
+        'arrival': arrivals,
+        'duration': durations,
+        'dropped': dropped,
+        'failed': rng.random(sessions) < rpc_failure,
+        'latency': rng.lognormal(math.log(rpc_latency), 0.5, sessions) / 60.0,
+    }
+
+
+def assign_indices(draws: Dict[str, np.ndarray], strategy: str) -> np.ndarray:
+    """Replay the sessions in time order and return each permutation index."""
+    arrival = draws['arrival'].tolist()
+    finish = (draws['arrival'] + draws['duration']).tolist()
+    latency = draws['latency'].tolist()
+    dropped = draws['dropped'].tolist()
+    failed = draws['failed'].tolist()
+
+    indices = np.zeros(len(arrival), dtype=np.int64)
+    counter = 0
+    # (time, value): read-write stores the value to write, the others an increment
+    pending: List[tuple] = []
+
+    for i, now in enumerate(arrival):
+        while pending and pending[0][0] <= now:
+            _, value = heapq.heappop(pending)
+            counter = value if strategy == 'read-write' else counter + 1
+
+        if strategy == 'on-complete' and not dropped[i]:
+            heapq.heappush(pending, (finish[i], 1))
+        if failed[i]:
+            # localStorage fallback on a fresh browser starts at 0
+            indices[i] = 0
+            continue
+        indices[i] = counter
+        if strategy == 'atomic':
+            counter += 1
+        elif strategy == 'read-write':
+            heapq.heappush(pending, (now + latency[i], counter + 1))
+
+    return indices
+
+
+def exposure_counts(indices: np.ndarray, schedule: List[List[int]], n_data: int) -> np.ndarray:
+    """Count interface x data exposures for the given permutation indices."""
+    perms = np.asarray(schedule, dtype=np.int64) % n_data
+    n_iface = perms.shape[1]
+    data = perms[indices % len(perms)]
+    codes = data + np.arange(n_iface, dtype=np.int64) * n_data
+    return np.bincount(codes.ravel(), minlength=n_iface * n_data).reshape(n_iface, n_data)
+
+
+def run_strategy(
+    strategy: str,
+    draws: Dict[str, np.ndarray],
+    schedule: List[List[int]],
+    n_data: int,
+    checkpoints: List[int],
+) -> Dict[str, object]:
+    indices = assign_indices(draws, strategy)
+    completed = ~draws['dropped']
+    # Responses land in the table in the order sessions finish
+    order = np.argsort((draws['arrival'] + draws['duration'])[completed], kind='stable')
+    done = indices[completed][order]
+
+    _, repeats = np.unique(done, return_counts=True)
+    spread = {}
+    for n in checkpoints:
+        if n <= len(done):
+            counts = exposure_counts(done[:n], schedule, n_data)
+            spread[n] = int(counts.max() - counts.min())
+
+    return {
+        'completed': int(len(done)),
+        'fallback': int(draws['failed'].sum()),
+        'shared_index': int(repeats[repeats > 1].sum()),
+        'counts': exposure_counts(done, schedule, n_data),
+        'spread': spread,
+    }
+
+
+def print_result(strategy: str, result: Dict[str, object], data_folders: List[str]) -> None:
+    counts = result['counts']
+    metrics = balance_metrics(counts)
+    print(f'Strategy: {strategy}')
+    print(
+        f'  completed={result["completed"]}  fallback={result["fallback"]}  '
+        f'sessions sharing an index={result["shared_index"]}'
+    )
+    print(
+        f'  min={metrics["min"]}  max={metrics["max"]}  max/min={metrics["max_min_ratio"]:.4f}  '
+        f'cv={metrics["cv"]:.5f}  chi2={metrics["chi_square"]:.2f} (p={metrics["p_value"]:.4g})'
+    )
+    if result['spread']:
+        spread = '  '.join(f'n={n}: {value}' for n, value in result['spread'].items())
+        print(f'  max-min pair count after n completions: {spread}')
+    print(' ' * 6 + ''.join(f'{data[:12]:>14}' for data in data_folders))
+    for interface, row in zip(INTERFACE_ORDER, counts):
+        print(f'{interface:<6}' + ''.join(f'{value:>14d}' for value in row))
+    print('-' * 60)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description='Simulate concurrent sessions, dropouts and pairing-counter races.'
+    )
+    parser.add_argument('--sessions', type=int, default=100_000, help='Number of started sessions (default: 100000)')
+    parser.add_argument('--arrival-rate', type=float, default=30.0, help='Session starts per hour (default: 30)')
+    parser.add_argument('--duration-median', type=float, default=25.0, help='Median session length in minutes (default: 25)')
+    parser.add_argument('--duration-sigma', type=float, default=0.35, help='Log-normal sigma of session length (default: 0.35)')
+    parser.add_argument('--dropout', type=float, default=0.15, help='Probability a session never submits (default: 0.15)')
+    parser.add_argument('--rpc-failure', type=float, default=0.02, help='Probability next_pair_index fails (default: 0.02)')
+    parser.add_argument('--rpc-latency', type=float, default=0.3, help='Median RPC round trip in seconds (default: 0.3)')
+    parser.add_argument(
+        '--strategy',
+        choices=STRATEGIES,
+        action='append',
+        default=None,
+        help='Counter strategy to simulate; repeat to compare (default: all)',
+    )
+    parser.add_argument(
+        '--checkpoints',
+        type=int,
+        nargs='+',
+        default=DEFAULT_CHECKPOINTS,
+        help='Completed-response counts at which to report the pair count spread',
+    )
+    parser.add_argument(
+        '--schedule',
+        type=Path,
+        default=Path('config.js'),
+        help='config.js or JSON schedule file (default: ./config.js)',
+    )
+    parser.add_argument(
+        '--schedule-name',
+        default=None,
+        help='Schedule to use when the file holds several (default: active/first)',
+    )
+    parser.add_argument(
+        '--data-folders',
+        type=Path,
+        default=Path('data_folders.json'),
+        help='Path to data_folders.json (default: ./data_folders.json)',
+    )
+    parser.add_argument('--seed', type=int, default=0, help='Random seed (default: 0)')
+    args = parser.parse_args()
+
+    schedule = FAIR_DATA_PERMUTATIONS
+    if args.schedule.exists():
+        schedules = load_schedules(args.schedule)
+        name = args.schedule_name or ('active' if 'active' in schedules else next(iter(schedules)))
+        if name not in schedules:
+            parser.error(f'schedule {name!r} not in {args.schedule} ({", ".join(schedules)})')
+        schedule = schedules[name]
+    data_folders = load_data_folders(args.data_folders, len(INTERFACE_ORDER))
+
+    rng = np.random.default_rng(args.seed)
+    draws = draw_sessions(
+        args.sessions,
+        args.arrival_rate,
+        args.duration_median,
+        args.duration_sigma,
+        args.dropout,
+        args.rpc_failure,
+        args.rpc_latency,
+        rng,
+    )
+
+    print(f'Sessions: {args.sessions}  arrival rate: {args.arrival_rate}/h  dropout: {args.dropout}')
+    print(f'Schedule: {len(schedule)} permutations from {args.schedule}')
+    print('-' * 60)
+    for strategy in args.strategy or STRATEGIES:
+        result = run_strategy(strategy, draws, schedule, len(data_folders), args.checkpoints)
+        print_result(strategy, result, data_folders)
+
+
+if __name__ == '__main__':
+    main()
@@ -5,6 +5,7 @@ Supabase에 저장된 설문 응답을 불러와서
 - 인터페이스별/질문별 요약 통계
 - 데이터 폴더(영상)별 요약 통계
 - Friedman test 및 Holm-Bonferroni 보정이 적용된 Wilcoxon pairwise 비교
+- Kendall's W / rank-biserial 효과 크기와 bootstrap 신뢰구간
 를 수행하고 결과를 CSV/JSON/그래프 형태로 저장합니다.
 
 환경 변수:
@@ -13,22 +14,39 @@ Supabase에 저장된 설문 응답을 불러와서
 
 사용 예시:
     python supabase_analysis.py --output-dir analysis_results
+    python supabase_analysis.py fetch          # 스냅샷만 갱신 (pandas 미사용)
+    python supabase_analysis.py stats          # 스냅샷으로 통계 CSV/JSON만 생성
+    python supabase_analysis.py plot           # 스냅샷으로 막대 그래프만 생성
+    python supabase_analysis.py report         # 스냅샷으로 report.txt만 생성
+    python supabase_analysis.py --source dumps/responses.jsonl   # 네트워크 없이 내보낸 파일로 분석
+
+pandas/scipy/statsmodels/matplotlib은 필요한 단계에서만 import 하므로
+report/fetch처럼 가벼운 명령은 빠르게 시작합니다.
 """
 
+from __future__ import annotations
+
 import argparse
+import hashlib
+import io
 import json
 import os
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import redirect_stdout
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
+from typing import TYPE_CHECKING, NamedTuple
 
-import numpy as np
-import pandas as pd
-import requests
-import seaborn as sns
-from matplotlib import pyplot as plt
-from scipy.stats import friedmanchisquare, wilcoxon
-from statsmodels.stats.multitest import multipletests
+import survey_snapshot
+import survey_sources
 
-plt.rcParams["font.family"] = "DejaVu Sans"
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    import requests
 
 QUESTION_ORDER = ["Q1", "Q2", "Q3", "Q4"]
 INTERFACE_ORDER = ["C", "D", "D1", "Y", "Y1"]
@@ -49,68 +67,261 @@ def normalize_gender(value: str | None) -> str:
     return "other"
 
 
-def fetch_supabase_rows(url: str, service_key: str, table: str = "survey_responses", limit: int | None = None):
+def create_supabase_session(service_key: str, max_retries: int = 3, pool_size: int = 8) -> requests.Session:
+    """keep-alive 커넥션 풀과 재시도(backoff)가 설정된 requests.Session을 생성합니다."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    session.headers.update(
+        {
+            "apikey": service_key,
+            "Authorization": f"Bearer {service_key}",
+            "Accept": "application/json",
+        }
+    )
+    retry = Retry(
+        total=max_retries,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def parse_content_range_total(header: str | None) -> int | None:
+    """PostgREST Content-Range 헤더(예: 0-999/12345)에서 전체 행 수를 읽습니다."""
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
+
+
+def fetch_supabase_page(
+    session: requests.Session,
+    endpoint: str,
+    params: dict,
+    offset: int,
+    page_size: int,
+    count_total: bool = False,
+) -> tuple[list[dict], int | None]:
+    """Range 헤더로 [offset, offset + page_size) 구간의 행을 가져옵니다."""
     headers = {
-        "apikey": service_key,
-        "Authorization": f"Bearer {service_key}",
-        "Accept": "application/json",
+        "Range-Unit": "items",
+        "Range": f"{offset}-{offset + page_size - 1}",
     }
-    params = {"select": "*"}
-    if limit:
-        params["limit"] = limit
-    resp = requests.get(f"{url}/rest/v1/{table}", headers=headers, params=params, timeout=30)
+    if count_total:
+        headers["Prefer"] = "count=exact"
+    resp = session.get(endpoint, headers=headers, params=params, timeout=30)
     resp.raise_for_status()
-    return resp.json()
-
+    total = parse_content_range_total(resp.headers.get("Content-Range")) if count_total else None
+    return resp.json(), total
+
+
+def fetch_supabase_rows(
+    url: str,
+    service_key: str,
+    table: str = "survey_responses",
+    limit: int | None = None,
+    page_size: int = 1000,
+    workers: int = 4,
+    session: requests.Session | None = None,
+    since: str | None = None,
+) -> Iterator[dict]:
+    """survey_responses 행을 페이지 단위로 동시에 가져와 순서대로 하나씩 내보냅니다.
+
+    첫 페이지에서 전체 행 수(count=exact)를 확인한 뒤 나머지 페이지를
+    스레드 풀로 병렬 요청합니다. 동시에 보관하는 페이지는 workers * 2개로
+    제한하므로 테이블이 커져도 최대 메모리 사용량은 일정하게 유지됩니다.
+    since가 주어지면 created_at이 그 이후(같은 시각 포함)인 행만 요청합니다.
+    """
+    endpoint = f"{url}/rest/v1/{table}"
+    # 페이지 경계가 흔들리지 않도록 안정적인 정렬 순서를 지정
+    params = {"select": "*", "order": "created_at.asc,id.asc"}
+    if since:
+        params["created_at"] = f"gte.{since}"
+    page_size = max(1, min(page_size, limit) if limit else page_size)
+    own_session = session is None
+    if own_session:
+        session = create_supabase_session(service_key, pool_size=max(workers, 1))
+
+    try:
+        first, total = fetch_supabase_page(session, endpoint, params, 0, page_size, count_total=True)
+        if limit:
+            first = first[:limit]
+            total = min(total, limit) if total is not None else limit
+        yield from first
+        fetched = len(first)
+
+        if total is None:
+            # 전체 행 수를 알 수 없으면 짧은 페이지가 나올 때까지 순차적으로 요청
+            page = first
+            while len(page) == page_size:
+                page, _ = fetch_supabase_page(session, endpoint, params, fetched, page_size)
+                yield from page
+                fetched += len(page)
+            return
+
+        if fetched >= total or not first:
+            return
+        if fetched < page_size:
+            # 서버의 max-rows 제한이 page_size보다 작으면 실제 페이지 크기에 맞춘다
+            page_size = fetched
+        offsets = range(fetched, total, page_size)
+
+        with ThreadPoolExecutor(max_workers=max(workers, 1)) as executor:
+            pending: deque = deque()
+            offset_iter = iter(offsets)
+            for offset in islice(offset_iter, max(workers, 1) * 2):
+                pending.append(
+                    executor.submit(fetch_supabase_page, session, endpoint, params, offset, page_size)
+                )
+            while pending:
+                page, _ = pending.popleft().result()
+                next_offset = next(offset_iter, None)
+                if next_offset is not None:
+                    pending.append(
+                        executor.submit(fetch_supabase_page, session, endpoint, params, next_offset, page_size)
+                    )
+                remaining = total - fetched
+                yield from page[:remaining]
+                fetched += min(len(page), remaining)
+    finally:
+        if own_session:
+            session.close()
+
+
+_question_getter = itemgetter(*QUESTION_ORDER)
+# flatten_question_scores가 레코드 단위로 모으는 열 (앞 4개는 interface 앞, 나머지는 점수 뒤에 놓임)
+RECORD_COLUMNS = (
+    "participant_id", "name", "age", "gender",
+    "preferred_interface", "preferred_reason", "created_at", "pairing_index", "pairing_number",
+)
+
+
+def _question_values(score_dict: dict) -> tuple:
+    try:
+        return _question_getter(score_dict)
+    except KeyError:
+        return tuple(map(score_dict.get, QUESTION_ORDER))
+
+
+def _score_columns(flat: list) -> list:
+    """행마다 QUESTION_ORDER 순서로 이어 붙인 점수 목록을 질문별 열 목록으로 나눕니다.
+
+    질문마다 값 목록을 np.array로 한 번에 변환해 infer_objects와 같은 dtype을 얻습니다
+    (모두 정수면 int64, 실수가 섞이면 float64, 결측(None)이 섞이면 NaN이 든 float64).
+    그 밖의 타입이 섞인 질문만 object 배열의 infer_objects로 처리합니다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    n_questions = len(QUESTION_ORDER)
+    columns = []
+    for idx in range(n_questions):
+        values = flat[idx::n_questions]
+        types = set(map(type, values))
+        column = None
+        if types <= {int, float}:
+            column = np.array(values)
+        elif types <= {int, float, type(None)} and len(types) > 1:
+            column = np.array(values, dtype=float)
+        if column is None or column.dtype.kind not in "if":
+            column = np.empty(len(values), dtype=object)
+            column[:] = values
+            column = pd.Series(column).infer_objects()
+        columns.append(column)
+    return columns
+
+
+def _as_categorical(values: list) -> pd.Categorical:
+    """문자열 목록을 object 배열 factorize로 빠르게 categorical로 변환합니다."""
+    import numpy as np
+    import pandas as pd
+
+    array = np.empty(len(values), dtype=object)
+    array[:] = values
+    codes, uniques = pd.factorize(array, sort=True)
+    return pd.Categorical.from_codes(codes, categories=pd.Index(uniques))
+
+
+def flatten_question_scores(records: Iterable[dict]) -> pd.DataFrame:
+    """응답 레코드를 (참가자, 인터페이스) 단위의 long DataFrame으로 펼칩니다.
+
+    records(리스트 또는 fetch_supabase_rows 같은 generator)를 한 번만 순회하며
+    레코드 dict는 보관하지 않고, 레코드 단위 값과 payload 단위 값만 열 목록에 모읍니다.
+    레코드 단위 열은 (레코드 index) 배열로 한꺼번에 take 하고,
+    interface/data_folder/html_file은 categorical dtype으로 반환합니다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    get_code = {code: idx for idx, code in enumerate(INTERFACE_ORDER)}.get
+
+    # 레코드 단위 값 (레코드 수만큼)
+    record_columns = {name: [] for name in RECORD_COLUMNS}
+    participant_ids = record_columns["participant_id"]
+    names = record_columns["name"]
+    ages = record_columns["age"]
+    genders = record_columns["gender"]
+    preferred = record_columns["preferred_interface"]
+    reasons = record_columns["preferred_reason"]
+    created = record_columns["created_at"]
+    pairing_index = record_columns["pairing_index"]
+    pairing_number = record_columns["pairing_number"]
+
+    # payload 단위 값 — question_scores의 키 순서를 유지
+    rec_index = []
+    codes = []
+    data_folders = []
+    html_files = []
+    flat_scores = []
+
+    for i, rec in enumerate(records):
+        sc = rec.get("question_scores") or {}
+        for interface_code, payload in sc.items():
+            code = get_code(interface_code)
+            if code is not None and payload:
+                rec_index.append(i)
+                codes.append(code)
+                data_folders.append(payload.get("dataFolder") or payload.get("data_folder"))
+                html_files.append(payload.get("htmlFile"))
+                flat_scores.extend(_question_values(payload.get("scores") or {}))
 
-def flatten_question_scores(records: list[dict]) -> pd.DataFrame:
-    rows = []
-    for rec in records:
         participant = rec.get("participant") or {}
-        participant_key = rec.get("id") or f"{participant.get('name','unknown')}_{rec.get('created_at','')}"
-        name = participant.get("name") or rec.get("name")
-        age = participant.get("age") or rec.get("age")
-        gender = participant.get("gender") or rec.get("gender")
-        scores = rec.get("question_scores") or {}
-        pairing_meta = scores.get("_pairing_info") or {}
-        pairing_index = pairing_meta.get("permutation_index")
-        pairing_number = pairing_meta.get("permutation_number")
-
-        for interface_code, payload in scores.items():
-            if interface_code.startswith("_"):
-                continue
-            if interface_code not in INTERFACE_ORDER:
-                continue
-            if not payload:
-                continue
-            score_dict = payload.get("scores") or {}
-            rows.append(
-                {
-                    "participant_id": participant_key,
-                    "name": name,
-                    "age": age,
-                    "gender": gender,
-                    "interface": interface_code,
-                    "data_folder": payload.get("dataFolder") or payload.get("data_folder"),
-                    "html_file": payload.get("htmlFile"),
-                    "Q1": score_dict.get("Q1"),
-                    "Q2": score_dict.get("Q2"),
-                    "Q3": score_dict.get("Q3"),
-                    "Q4": score_dict.get("Q4"),
-                    "preferred_interface": rec.get("preferred_interface"),
-                    "preferred_reason": rec.get("preferred_reason"),
-                    "created_at": rec.get("created_at"),
-                    "pairing_index": pairing_index,
-                    "pairing_number": pairing_number,
-                }
-            )
-
-    df = pd.DataFrame(rows)
-    if df.empty:
+        pairing_meta = sc.get("_pairing_info") or {}
+        participant_ids.append(rec.get("id") or f"{participant.get('name','unknown')}_{rec.get('created_at','')}")
+        names.append(participant.get("name") or rec.get("name"))
+        ages.append(participant.get("age") or rec.get("age"))
+        genders.append(participant.get("gender") or rec.get("gender"))
+        preferred.append(rec.get("preferred_interface"))
+        reasons.append(rec.get("preferred_reason"))
+        created.append(rec.get("created_at"))
+        pairing_index.append(pairing_meta.get("permutation_index"))
+        pairing_number.append(pairing_meta.get("permutation_number"))
+
+    if not codes:
         raise RuntimeError("Supabase에서 가져온 question_scores 데이터가 없습니다.")
-    # 정렬 기준을 명시적으로 설정
-    df["interface"] = pd.Categorical(df["interface"], categories=INTERFACE_ORDER, ordered=True)
-    return df
+
+    take = np.asarray(rec_index, dtype=np.intp)
+
+    def expand(values: list) -> pd.Series:
+        return pd.Series(values).take(take).reset_index(drop=True)
+
+    columns = {name: expand(record_columns[name]) for name in ("participant_id", "name", "age", "gender")}
+    columns["interface"] = pd.Categorical.from_codes(codes, categories=INTERFACE_ORDER, ordered=True)
+    columns["data_folder"] = _as_categorical(data_folders)
+    columns["html_file"] = _as_categorical(html_files)
+    for question, values in zip(QUESTION_ORDER, _score_columns(flat_scores)):
+        columns[question] = pd.Series(values)
+    for name in RECORD_COLUMNS[4:]:
+        columns[name] = expand(record_columns[name])
+    return pd.DataFrame(columns)
 
 
 def compute_descriptive_stats(df: pd.DataFrame) -> pd.DataFrame:
@@ -122,30 +333,82 @@ def compute_descriptive_stats(df: pd.DataFrame) -> pd.DataFrame:
     return stats
 
 
-def run_friedman_tests(df: pd.DataFrame) -> dict:
+class ScoreCube(NamedTuple):
+    """참가자 × 인터페이스 × 질문 점수 배열 (응답이 없으면 NaN)."""
+
+    participants: np.ndarray
+    values: np.ndarray
+    present: np.ndarray  # 참가자 × 인터페이스, 해당 인터페이스 응답 행이 존재하는지
+
+
+def build_score_cube(df: pd.DataFrame) -> ScoreCube:
+    """long DataFrame을 한 번만 펼쳐 Friedman/Wilcoxon 단계가 공유할 cube를 만듭니다.
+
+    pivot_table과 같이 participant_id 순으로 정렬하고, 같은 (참가자, 인터페이스)
+    행이 여러 개면 질문별로 NaN을 제외한 평균을 사용합니다.
+    """
+    import numpy as np
+    import pandas as pd
+
+    participant_codes, participants = pd.factorize(df["participant_id"], sort=True)
+    interface_codes = np.asarray(
+        pd.Categorical(df["interface"], categories=INTERFACE_ORDER).codes, dtype=np.intp
+    )
+    keep = (participant_codes >= 0) & (interface_codes >= 0)
+    rows = participant_codes[keep]
+    cols = interface_codes[keep]
+    scores = df[QUESTION_ORDER].to_numpy(dtype=float)[keep]
+
+    shape = (len(participants), len(INTERFACE_ORDER), len(QUESTION_ORDER))
+    sums = np.zeros(shape)
+    counts = np.zeros(shape)
+    observed = ~np.isnan(scores)
+    np.add.at(sums, (rows, cols), np.where(observed, scores, 0.0))
+    np.add.at(counts, (rows, cols), observed)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        values = np.where(counts > 0, sums / counts, np.nan)
+
+    present = np.zeros(shape[:2], dtype=bool)
+    present[rows, cols] = True
+    return ScoreCube(np.asarray(participants), values, present)
+
+
+def run_friedman_tests(df: pd.DataFrame, cube: ScoreCube | None = None) -> dict:
+    import numpy as np
+    from scipy.stats import friedmanchisquare
+
+    cube = build_score_cube(df) if cube is None else cube
     results = {}
-    for question in QUESTION_ORDER:
-        pivot = df.pivot_table(index="participant_id", columns="interface", values=question)
-        pivot = pivot.dropna(axis=0, how="any")
-        available_interfaces = [col for col in INTERFACE_ORDER if col in pivot.columns]
-        if len(available_interfaces) < 3 or pivot.empty:
+    for q_idx, question in enumerate(QUESTION_ORDER):
+        scores = cube.values[:, :, q_idx]
+        observed = ~np.isnan(scores)
+        available = [idx for idx in range(len(INTERFACE_ORDER)) if observed[:, idx].any()]
+        if len(available) < 3:
             continue
-        args = [pivot[col] for col in available_interfaces]
-        stat, p = friedmanchisquare(*args)
+        complete = observed[:, available].all(axis=1)
+        if not complete.any():
+            continue
+        stat, p = friedmanchisquare(*(scores[complete, idx] for idx in available))
         results[question] = {
-            "interfaces": available_interfaces,
+            "interfaces": [INTERFACE_ORDER[idx] for idx in available],
             "statistic": stat,
             "p_value": p,
-            "n": len(pivot),
+            "n": int(complete.sum()),
         }
     return results
 
 
-def run_pairwise_wilcoxon(df: pd.DataFrame) -> dict:
+def run_pairwise_wilcoxon(df: pd.DataFrame, cube: ScoreCube | None = None) -> dict:
+    import numpy as np
+    from scipy.stats import wilcoxon
+    from statsmodels.stats.multitest import multipletests
+
+    cube = build_score_cube(df) if cube is None else cube
     results = {}
-    for question in QUESTION_ORDER:
-        pivot = df.pivot_table(index="participant_id", columns="interface", values=question)
-        available = [col for col in INTERFACE_ORDER if col in pivot.columns]
+    for q_idx, question in enumerate(QUESTION_ORDER):
+        scores = cube.values[:, :, q_idx]
+        observed = ~np.isnan(scores)
+        available = [idx for idx in range(len(INTERFACE_ORDER)) if observed[:, idx].any()]
         pairs = []
         pvals = []
         stats = []
@@ -153,10 +416,10 @@ def run_pairwise_wilcoxon(df: pd.DataFrame) -> dict:
         for i in range(len(available)):
             for j in range(i + 1, len(available)):
                 a, b = available[i], available[j]
-                paired = pivot[[a, b]].dropna()
-                if len(paired) < 5:
+                paired = observed[:, a] & observed[:, b]
+                if paired.sum() < 5:
                     continue
-                stat, p = wilcoxon(paired[a], paired[b])
+                stat, p = wilcoxon(scores[paired, a], scores[paired, b])
                 pairs.append((a, b))
                 stats.append(stat)
                 pvals.append(p)
@@ -169,24 +432,178 @@ def run_pairwise_wilcoxon(df: pd.DataFrame) -> dict:
         for (a, b), stat, raw_p, corr_p, reject in zip(pairs, stats, pvals, corrected[1], corrected[0]):
             entries.append(
                 {
-                    "interface_a": a,
-                    "interface_b": b,
+                    "interface_a": INTERFACE_ORDER[a],
+                    "interface_b": INTERFACE_ORDER[b],
                     "statistic": stat,
                     "p_value": raw_p,
                     "p_value_holm": corr_p,
                     "reject_null": bool(reject),
-                    "n": int(
-                        df[(df["interface"] == a) | (df["interface"] == b)]
-                        .groupby("participant_id")
-                        .filter(lambda x: x["interface"].nunique() == 2)["participant_id"]
-                        .nunique()
-                    ),
+                    # 질문 응답 여부와 관계없이 두 인터페이스를 모두 경험한 참가자 수
+                    "n": int((cube.present[:, a] & cube.present[:, b]).sum()),
                 }
             )
         results[question] = entries
     return results
 
 
+def _bootstrap_weights(
+    n: int,
+    n_resamples: int,
+    rng: np.random.Generator,
+    max_elements: int = 2_000_000,
+) -> Iterator[np.ndarray]:
+    """참가자 재표집을 (재표집 수 × 참가자 수) 선택 횟수 행렬 단위로 묶어 내보냅니다.
+
+    재표집 index 행렬에 행별 offset을 더해 한 번의 bincount로 변환하므로
+    Python 반복은 청크 수만큼만 일어납니다.
+    """
+    import numpy as np
+
+    chunk = max(1, max_elements // max(n, 1))
+    for start in range(0, n_resamples, chunk):
+        size = min(chunk, n_resamples - start)
+        index = rng.integers(0, n, size=(size, n)) + np.arange(size)[:, None] * n
+        yield np.bincount(index.ravel(), minlength=size * n).reshape(size, n).astype(float)
+
+
+def _percentile_ci(samples: np.ndarray, confidence: float) -> tuple[float, float]:
+    import numpy as np
+
+    finite = samples[np.isfinite(samples)]
+    if finite.size == 0:
+        return float("nan"), float("nan")
+    alpha = (1 - confidence) / 2 * 100
+    low, high = np.percentile(finite, [alpha, 100 - alpha])
+    return float(low), float(high)
+
+
+def _rank_biserial_statistic(diffs: np.ndarray):
+    """대응 표본 차이로부터 matched-pairs rank-biserial 상관계수 계산 함수를 만듭니다.
+
+    |차이|의 고유값별로 양/음 부호 개수를 세어 두면, 재표집의 평균 순위(동점 처리)와
+    순위합 R+/R-를 가중치 행렬 곱만으로 구할 수 있습니다. 차이가 0인 쌍은
+    Wilcoxon 기본 설정(zero_method="wilcox")과 같이 제외합니다.
+    """
+    import numpy as np
+
+    nonzero = np.flatnonzero(diffs != 0)
+    uniques, codes = np.unique(np.abs(diffs[nonzero]), return_inverse=True)
+    positive = diffs[nonzero] > 0
+    pos_table = np.zeros((len(diffs), len(uniques)))
+    neg_table = np.zeros((len(diffs), len(uniques)))
+    pos_table[nonzero[positive], codes[positive]] = 1.0
+    neg_table[nonzero[~positive], codes[~positive]] = 1.0
+
+    def statistic(weights: np.ndarray) -> np.ndarray:
+        pos_counts = weights @ pos_table
+        neg_counts = weights @ neg_table
+        counts = pos_counts + neg_counts
+        mean_ranks = np.cumsum(counts, axis=1) - counts + (counts + 1) / 2
+        rank_pos = (mean_ranks * pos_counts).sum(axis=1)
+        rank_neg = (mean_ranks * neg_counts).sum(axis=1)
+        total = rank_pos + rank_neg
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(total > 0, (rank_pos - rank_neg) / total, np.nan)
+
+    return statistic
+
+
+def _kendalls_w_statistic(scores: np.ndarray):
+    """참가자 × 인터페이스 점수로부터 (동점 보정) Kendall's W 계산 함수를 만듭니다."""
+    import numpy as np
+    from scipy.stats import rankdata
+
+    k = scores.shape[1]
+    ranks = rankdata(scores, axis=1)
+    # 참가자별 동점 보정항 sum(t^3 - t) = 각 원소가 속한 동점 그룹 크기 t에 대해 sum(t^2 - 1)
+    group_sizes = (scores[:, :, None] == scores[:, None, :]).sum(axis=2)
+    ties = (group_sizes ** 2 - 1).sum(axis=1).astype(float)
+
+    def statistic(weights: np.ndarray) -> np.ndarray:
+        # 재표집 단위가 그룹 전체 참가자이므로 재표집마다 n이 달라질 수 있음
+        n = weights.sum(axis=1)
+        rank_sums = weights @ ranks
+        tie_sums = weights @ ties
+        numerator = 12 * (rank_sums ** 2).sum(axis=1) - 3 * n ** 2 * k * (k + 1) ** 2
+        denominator = n ** 2 * k * (k ** 2 - 1) - n * tie_sums
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(denominator > 0, numerator / denominator, np.nan)
+
+    return statistic
+
+
+def compute_effect_sizes(
+    df: pd.DataFrame,
+    cube: ScoreCube | None = None,
+    n_resamples: int = 10000,
+    confidence: float = 0.95,
+    seed: int = 0,
+) -> dict:
+    """질문별 Kendall's W와 인터페이스 쌍별 rank-biserial 상관계수, bootstrap CI를 계산합니다.
+
+    포함 기준은 run_friedman_tests(모든 인터페이스에 응답한 참가자)와
+    run_pairwise_wilcoxon(두 인터페이스에 모두 응답한 참가자 5명 이상)을 따릅니다.
+    재표집 단위는 그룹의 참가자이며, 같은 선택 횟수 행렬을 모든 질문과 쌍이
+    공유하므로 난수 생성은 그룹당 한 번만 일어납니다.
+    rank_biserial이 양수이면 interface_a의 점수가 더 높다는 뜻입니다.
+    """
+    import numpy as np
+
+    cube = build_score_cube(df) if cube is None else cube
+    results = {}
+    # (결과 dict, 포함된 참가자 index, 벡터화된 통계량 함수)
+    targets = []
+
+    for q_idx, question in enumerate(QUESTION_ORDER):
+        scores = cube.values[:, :, q_idx]
+        observed = ~np.isnan(scores)
+        available = [idx for idx in range(len(INTERFACE_ORDER)) if observed[:, idx].any()]
+        entry = {}
+
+        if len(available) >= 3:
+            complete = observed[:, available].all(axis=1)
+            if complete.any():
+                rows = np.flatnonzero(complete)
+                entry["kendalls_w"] = {"interfaces": [INTERFACE_ORDER[idx] for idx in available]}
+                targets.append(
+                    (entry["kendalls_w"], rows, _kendalls_w_statistic(scores[rows][:, available]))
+                )
+
+        pairwise = []
+        for i in range(len(available)):
+            for j in range(i + 1, len(available)):
+                a, b = available[i], available[j]
+                paired = observed[:, a] & observed[:, b]
+                if paired.sum() < 5:
+                    continue
+                rows = np.flatnonzero(paired)
+                pair_entry = {"interface_a": INTERFACE_ORDER[a], "interface_b": INTERFACE_ORDER[b]}
+                pairwise.append(pair_entry)
+                targets.append(
+                    (pair_entry, rows, _rank_biserial_statistic(scores[rows, a] - scores[rows, b]))
+                )
+        if pairwise:
+            entry["pairwise"] = pairwise
+        if entry:
+            results[question] = entry
+
+    samples = [np.empty(0) for _ in targets]
+    if n_resamples > 0 and targets:
+        rng = np.random.default_rng(seed)
+        chunks = [[] for _ in targets]
+        for weights in _bootstrap_weights(len(cube.participants), n_resamples, rng):
+            for chunk, (_, rows, statistic) in zip(chunks, targets):
+                chunk.append(statistic(weights[:, rows]))
+        samples = [np.concatenate(chunk) for chunk in chunks]
+
+    for (entry, rows, statistic), boot in zip(targets, samples):
+        estimate = float(statistic(np.ones((1, len(rows))))[0])
+        ci_low, ci_high = _percentile_ci(boot, confidence)
+        key = "rank_biserial" if "interface_a" in entry else "estimate"
+        entry.update({key: estimate, "ci_low": ci_low, "ci_high": ci_high, "n": int(len(rows))})
+    return results
+
+
 def p_value_to_stars(p: float) -> str:
     if p < 0.001:
         return '***'
@@ -204,6 +621,11 @@ def plot_interface_scores(
     output_dir: Path,
     label: str
 ) -> None:
+    import numpy as np
+    import pandas as pd
+    from matplotlib import pyplot as plt
+
+    plt.rcParams["font.family"] = "DejaVu Sans"
     output_dir.mkdir(parents=True, exist_ok=True)
     question_labels = {
         "Q1": "Q1. Mental Demand",
@@ -316,7 +738,15 @@ def plot_interface_scores(
     plt.close()
 
 
-def analyze_group(df: pd.DataFrame, label: str, output_dir: Path) -> None:
+def analyze_group(
+    df: pd.DataFrame,
+    label: str,
+    output_dir: Path,
+    write_stats: bool = True,
+    plot: bool = True,
+    n_resamples: int = 10000,
+    seed: int = 0,
+) -> None:
     if df.empty:
         print(f"[WARN] {label} 데이터가 없어 분석을 건너뜁니다.")
         return
@@ -324,29 +754,55 @@ def analyze_group(df: pd.DataFrame, label: str, output_dir: Path) -> None:
     dest = output_dir / label
     dest.mkdir(parents=True, exist_ok=True)
 
-    descriptive = compute_descriptive_stats(df)
-    descriptive.to_csv(dest / f"{label}_descriptive.csv")
-
-    friedman_results = run_friedman_tests(df)
-    pairwise_results = run_pairwise_wilcoxon(df)
-
-    with open(dest / f"{label}_stats.json", "w", encoding="utf-8") as f:
-        json.dump(
-            {
-                "friedman": friedman_results,
-                "pairwise_wilcoxon": pairwise_results,
-            },
-            f,
-            ensure_ascii=False,
-            indent=2,
-        )
+    if write_stats:
+        descriptive = compute_descriptive_stats(df)
+        descriptive.to_csv(dest / f"{label}_descriptive.csv")
 
-    plot_interface_scores(df, friedman_results, pairwise_results, dest, label)
-    df.to_csv(dest / f"{label}_raw_long.csv", index=False)
+    cube = build_score_cube(df)
+    friedman_results = run_friedman_tests(df, cube)
+    pairwise_results = run_pairwise_wilcoxon(df, cube)
+
+    if write_stats:
+        effect_sizes = compute_effect_sizes(df, cube, n_resamples=n_resamples, seed=seed)
+        with open(dest / f"{label}_stats.json", "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "friedman": friedman_results,
+                    "pairwise_wilcoxon": pairwise_results,
+                    "effect_sizes": effect_sizes,
+                    "bootstrap": {"n_resamples": n_resamples, "confidence": 0.95, "seed": seed},
+                },
+                f,
+                ensure_ascii=False,
+                indent=2,
+            )
+
+    if plot:
+        plot_interface_scores(df, friedman_results, pairwise_results, dest, label)
+    if write_stats:
+        df.to_csv(dest / f"{label}_raw_long.csv", index=False)
     print(f"[INFO] {label} 분석 결과를 {dest}에 저장했습니다.")
 
 
+def _init_analysis_worker(plot: bool) -> None:
+    if plot:
+        # 워커 프로세스에서는 화면 출력 없이 파일로만 그림을 저장
+        import matplotlib
+
+        matplotlib.use("Agg")
+
+
+def _analyze_group_captured(df: pd.DataFrame, label: str, output_dir: Path, **options) -> str:
+    """워커에서 analyze_group을 실행하고 출력 로그를 문자열로 돌려줍니다."""
+    buffer = io.StringIO()
+    with redirect_stdout(buffer):
+        analyze_group(df, label, output_dir, **options)
+    return buffer.getvalue()
+
+
 def summarize_demographics(df: pd.DataFrame) -> dict:
+    import pandas as pd
+
     if df.empty:
         return {
             "total": 0,
@@ -378,10 +834,12 @@ def summarize_demographics(df: pd.DataFrame) -> dict:
 
 
 def compute_interface_usage(df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
     if df.empty:
         return pd.DataFrame(columns=INTERFACE_ORDER)
     working = df.copy()
-    working["data_folder"] = working["data_folder"].fillna("unknown")
+    working["data_folder"] = working["data_folder"].astype(object).fillna("unknown")
     table = (
         working.groupby(["data_folder", "interface"])
         .size()
@@ -393,6 +851,8 @@ def compute_interface_usage(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def summarize_preference(df: pd.DataFrame) -> tuple[pd.Series, int, int]:
+    import pandas as pd
+
     if df.empty:
         empty = pd.Series(dtype=int)
         return empty, 0, 0
@@ -447,6 +907,8 @@ def format_preference_lines(counts: pd.Series, total: int, recorded: int) -> lis
 
 
 def generate_overall_report(df: pd.DataFrame, dest: Path) -> None:
+    import pandas as pd
+
     dest.mkdir(parents=True, exist_ok=True)
     report_path = dest / "report.txt"
     demographics = summarize_demographics(df)
@@ -480,42 +942,291 @@ def generate_overall_report(df: pd.DataFrame, dest: Path) -> None:
     print(f"[INFO] overall report를 {report_path}에 저장했습니다.")
 
 
+COMMANDS = ("all", "fetch", "stats", "plot", "report")
+
+
+def snapshot_identity(args: argparse.Namespace) -> str:
+    """스냅샷 meta에 기록할 출처. 로컬 파일 병합은 모두 'file'로 묶습니다."""
+    if args.source != "supabase":
+        return "file"
+    return f"{args.supabase_url.rstrip('/')}#{args.table}"
+
+
+def default_snapshot_path(args: argparse.Namespace) -> Path:
+    """출처별 기본 스냅샷 경로 (Supabase는 URL·테이블, 파일 소스는 파일 경로의 해시)"""
+    if args.source == "supabase":
+        key = snapshot_identity(args)
+    elif args.source == "-":
+        key = "file:-"
+    else:
+        key = f"file:{Path(args.source).resolve()}"
+    digest = hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+    return SNAPSHOT_DIR / f"{digest}.sqlite"
+
+
+def update_snapshot(args: argparse.Namespace, conn, snapshot_path: Path, fetch_kwargs: dict) -> None:
+    since = None if args.full_refresh else survey_snapshot.high_water_mark(conn)
+    print(f"[INFO] Supabase에서 새 데이터를 가져오는 중... (since: {since or '처음부터'})")
+    rows = fetch_supabase_rows(args.supabase_url, args.service_key, since=since, **fetch_kwargs)
+    merged = survey_snapshot.merge_rows(conn, rows)
+    print(f"[INFO] 스냅샷에 {merged}개 행을 병합했습니다. (총 {survey_snapshot.count_rows(conn)}개, {snapshot_path})")
+
+
+def filter_by_cutoff(df: pd.DataFrame) -> pd.DataFrame:
+    import pandas as pd
+
+    # 2025-11-27 14:31:54.837+00 이후로 수집된 데이터만 필터링
+    cutoff_time = pd.to_datetime("2025-11-20 14:31:54.837+00")
+    # cutoff_time = pd.to_datetime("2025-11-27 14:31:54.837+00")
+    df["created_at"] = pd.to_datetime(df["created_at"])
+    df = df[df["created_at"] > cutoff_time]
+    print(f"[INFO] 필터링 후 데이터 수: {len(df)} rows (cutoff: {cutoff_time})")
+    return df
+
+
+# 원본 응답(참가자 이름/나이/성별 포함) 스냅샷과 분석 manifest를 두는 로컬 캐시.
+# 저장소와 serve.py가 서빙하는 폴더 밖에 두어 커밋되거나 HTTP로 노출되지 않게 합니다.
+CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "retest"
+SNAPSHOT_DIR = CACHE_DIR / "snapshots"
+STAGE_OUTPUTS = {
+    "stats": ("_descriptive.csv", "_stats.json", "_raw_long.csv"),
+    "plot": ("_barplot.jpg",),
+}
+
+
+def analysis_code_version() -> str:
+    """분석 코드가 바뀌면 캐시가 무효화되도록 이 파일의 내용 해시를 사용합니다."""
+    return hashlib.sha256(Path(__file__).read_bytes()).hexdigest()[:16]
+
+
+def frame_hash(df: pd.DataFrame) -> str:
+    import pandas as pd
+
+    digest = hashlib.sha256()
+    digest.update("\x1f".join(map(str, df.columns)).encode("utf-8"))
+    digest.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def manifest_path_for(output_dir: Path) -> Path:
+    """결과 폴더별 manifest 경로 (CACHE_DIR/manifests/<결과 폴더 절대 경로 해시>.json)"""
+    key = hashlib.sha256(str(output_dir.resolve()).encode("utf-8")).hexdigest()[:16]
+    return CACHE_DIR / "manifests" / f"{key}.json"
+
+
+def load_manifest(path: Path) -> dict:
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError) as e:
+        print(f"[WARN] {path}를 읽을 수 없어 모든 그룹을 다시 분석합니다: {e}")
+        return {}
+
+
+def save_manifest(path: Path, manifest: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    tmp_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp_path, path)
+
+
+def stage_outputs_exist(output_dir: Path, label: str, stage: str) -> bool:
+    return all((output_dir / label / f"{label}{suffix}").exists() for suffix in STAGE_OUTPUTS[stage])
+
+
+def run_group_analyses(
+    df: pd.DataFrame,
+    output_dir: Path,
+    jobs: int = 1,
+    write_stats: bool = True,
+    plot: bool = True,
+    report: bool = True,
+    n_resamples: int = 10000,
+    seed: int = 0,
+    force: bool = False,
+    manifest_path: Path | None = None,
+) -> None:
+    """overall과 data_folder별 그룹을 분석합니다.
+
+    manifest(기본: manifest_path_for(output_dir))에 그룹별 입력 해시, 코드 버전, 옵션을 단계(stats/plot)별로
+    기록해 두고, 셋이 모두 같고 결과 파일이 남아 있는 단계는 다시 계산하지 않습니다.
+    """
+    groups = [("overall", df)]
+    for folder, sub_df in df.groupby("data_folder", observed=True):
+        groups.append((f"data_{folder or 'unknown'}", sub_df))
+
+    manifest_path = manifest_path or manifest_path_for(output_dir)
+    manifest = load_manifest(manifest_path)
+    code_version = analysis_code_version()
+    stage_options = {"stats": {"n_resamples": n_resamples, "seed": seed}, "plot": {}}
+    requested = [stage for stage, enabled in (("stats", write_stats), ("plot", plot)) if enabled]
+
+    # (label, 그룹 DataFrame, 다시 계산할 단계, 단계별 fingerprint)
+    tasks = []
+    for label, group_df in groups:
+        input_hash = frame_hash(group_df)
+        fingerprints = {
+            stage: {"input": input_hash, "code": code_version, "options": stage_options[stage]}
+            for stage in requested
+        }
+        recorded = manifest.get(label, {})
+        stale = [
+            stage
+            for stage in requested
+            if force
+            or recorded.get(stage) != fingerprints[stage]
+            or not stage_outputs_exist(output_dir, label, stage)
+        ]
+        tasks.append((label, group_df, stale, fingerprints))
+
+    def group_options(stale: list[str]) -> dict:
+        return dict(
+            write_stats="stats" in stale,
+            plot="plot" in stale,
+            n_resamples=n_resamples,
+            seed=seed,
+        )
+
+    def finish(label: str, stale: list[str], fingerprints: dict) -> None:
+        if not stale:
+            print(f"[INFO] {label} 입력과 분석 코드가 바뀌지 않아 건너뜁니다.")
+        else:
+            manifest.setdefault(label, {}).update({stage: fingerprints[stage] for stage in stale})
+        if label == "overall" and report:
+            generate_overall_report(df, output_dir / "overall")
+
+    try:
+        if jobs > 1:
+            # 그룹별 분석은 병렬로 실행하되, 로그는 원래 순서대로 출력
+            with ProcessPoolExecutor(
+                max_workers=jobs, initializer=_init_analysis_worker, initargs=(plot,)
+            ) as executor:
+                futures = [
+                    executor.submit(_analyze_group_captured, group_df, label, output_dir, **group_options(stale))
+                    if stale
+                    else None
+                    for label, group_df, stale, _ in tasks
+                ]
+                for (label, _, stale, fingerprints), future in zip(tasks, futures):
+                    if future is not None:
+                        print(future.result(), end="")
+                    finish(label, stale, fingerprints)
+        else:
+            for label, group_df, stale, fingerprints in tasks:
+                if stale:
+                    analyze_group(group_df, label, output_dir, **group_options(stale))
+                finish(label, stale, fingerprints)
+    finally:
+        save_manifest(manifest_path, manifest)
+
+
 def main():
     parser = argparse.ArgumentParser(description="Supabase 설문 응답 분석")
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=COMMANDS,
+        default="all",
+        help="all: 가져오기+전체 분석(기본), fetch: 스냅샷 갱신만, stats/plot/report: 스냅샷으로 해당 결과만 생성",
+    )
     parser.add_argument("--supabase-url", default="https://qrochowykynmdhyikcjd.supabase.co", help="Supabase 프로젝트 URL")
     parser.add_argument("--service-key", default="sb_secret_b5KsbgIGaADZhXwwvL6tcQ_ASY9NrQZ", help="Supabase service key")
     parser.add_argument("--table", default="survey_responses", help="조회할 테이블 이름")
     parser.add_argument("--limit", type=int, default=None, help="조회할 레코드 수 제한")
+    parser.add_argument("--page-size", type=int, default=1000, help="한 번에 가져올 페이지 크기 (PostgREST max-rows 이하)")
+    parser.add_argument("--fetch-workers", type=int, default=4, help="동시에 요청할 페이지 수")
     parser.add_argument("--output-dir", default="supabase_analysis", help="결과 저장 폴더")
+    parser.add_argument("--jobs", type=int, default=1, help="데이터 폴더별 분석을 병렬로 실행할 프로세스 수")
+    parser.add_argument("--bootstrap", type=int, default=10000, help="효과 크기 CI 계산용 bootstrap 재표집 수 (0이면 CI 생략)")
+    parser.add_argument("--seed", type=int, default=0, help="bootstrap 난수 시드")
+    parser.add_argument("--force", action="store_true", help="manifest를 무시하고 모든 그룹을 다시 분석합니다")
+    parser.add_argument(
+        "--snapshot",
+        default=None,
+        help=f"로컬 스냅샷 SQLite 경로 (기본: {SNAPSHOT_DIR}/<Supabase URL·테이블 또는 파일별 해시>.sqlite)",
+    )
+    parser.add_argument("--no-snapshot", action="store_true", help="스냅샷 없이 전체 행을 매번 가져옵니다 (all 전용)")
+    parser.add_argument("--full-refresh", action="store_true", help="스냅샷을 무시하고 전체 행을 다시 가져와 병합합니다")
+    parser.add_argument("--offline", action="store_true", help="네트워크 요청 없이 스냅샷만으로 분석합니다")
+    parser.add_argument(
+        "--source",
+        default="supabase",
+        help="레코드 소스: supabase(기본), JSONL/NDJSON/JSON 파일, SQLite 파일, 내보내기 디렉토리, '-'(표준 입력 NDJSON). "
+        "fetch와 함께 쓰면 해당 소스를 스냅샷에 병합합니다",
+    )
     args = parser.parse_args()
 
-    if not args.supabase_url or not args.service_key:
+    # stats/plot/report와 파일 소스는 네트워크를 사용하지 않음
+    file_source = args.source != "supabase"
+    offline = args.offline or file_source or args.command in ("stats", "plot", "report")
+    if args.command == "fetch" and (args.offline or args.no_snapshot):
+        raise SystemExit("fetch 명령은 --offline 또는 --no-snapshot과 함께 사용할 수 없습니다.")
+    if not offline and (not args.supabase_url or not args.service_key):
         raise SystemExit("SUPABASE_URL 또는 SUPABASE_SERVICE_KEY 환경 변수가 설정되어 있지 않습니다.")
 
-    print("[INFO] Supabase에서 데이터를 가져오는 중...")
-    rows = fetch_supabase_rows(args.supabase_url, args.service_key, table=args.table, limit=args.limit)
-    df = flatten_question_scores(rows)
-
-    # 2025-11-27 14:31:54.837+00 이후로 수집된 데이터만 필터링
-    cutoff_time = pd.to_datetime("2025-11-20 14:31:54.837+00")
-    # cutoff_time = pd.to_datetime("2025-11-27 14:31:54.837+00")
-    df["created_at"] = pd.to_datetime(df["created_at"])
-    df = df[df["created_at"] > cutoff_time]
-    print(f"[INFO] 필터링 후 데이터 수: {len(df)} rows (cutoff: {cutoff_time})")
-
     output_dir = Path(args.output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    analyze_group(df, "overall", output_dir)
-    generate_overall_report(df, output_dir / "overall")
-
-    for folder, sub_df in df.groupby("data_folder"):
-        label = f"data_{folder or 'unknown'}"
-        analyze_group(sub_df, label, output_dir)
+    fetch_kwargs = dict(
+        table=args.table,
+        limit=args.limit,
+        page_size=args.page_size,
+        workers=args.fetch_workers,
+    )
+    if file_source and args.command != "fetch":
+        print(f"[INFO] {args.source}에서 데이터를 읽는 중...")
+        df = flatten_question_scores(survey_sources.iter_records(args.source, table=args.table))
+    elif args.no_snapshot and not offline:
+        print("[INFO] Supabase에서 데이터를 가져오는 중...")
+        rows = fetch_supabase_rows(args.supabase_url, args.service_key, **fetch_kwargs)
+        df = flatten_question_scores(rows)
+    else:
+        snapshot_path = Path(args.snapshot) if args.snapshot else default_snapshot_path(args)
+        identity = snapshot_identity(args)
+        conn = survey_snapshot.open_snapshot(snapshot_path)
+        try:
+            if file_source or not offline:
+                # high-water mark가 다른 출처의 created_at으로 오염되지 않도록 병합 전에 확인
+                try:
+                    survey_snapshot.claim_source(conn, identity)
+                except ValueError as e:
+                    raise SystemExit(f"{e}: {snapshot_path} (--snapshot으로 다른 경로를 지정하세요)")
+            else:
+                stored = survey_snapshot.snapshot_source(conn)
+                if stored is not None and stored != identity:
+                    print(f"[WARN] 스냅샷 출처({stored})가 현재 설정({identity})과 다릅니다: {snapshot_path}")
+            if file_source:
+                merged = survey_snapshot.merge_rows(conn, survey_sources.iter_records(args.source, table=args.table))
+                print(f"[INFO] {args.source}의 {merged}개 행을 스냅샷에 병합했습니다. ({snapshot_path})")
+            elif not offline:
+                update_snapshot(args, conn, snapshot_path, fetch_kwargs)
+            if args.command == "fetch":
+                print("[DONE] 스냅샷 갱신을 완료했습니다.")
+                return
+            df = flatten_question_scores(survey_snapshot.iter_snapshot_rows(conn))
+        finally:
+            conn.close()
+
+    df = filter_by_cutoff(df)
+
+    if args.command == "report":
+        generate_overall_report(df, output_dir / "overall")
+    else:
+        run_group_analyses(
+            df,
+            output_dir,
+            jobs=args.jobs,
+            write_stats=args.command in ("all", "stats"),
+            plot=args.command in ("all", "plot"),
+            report=args.command == "all",
+            n_resamples=args.bootstrap,
+            seed=args.seed,
+            force=args.force,
+        )
 
     print("[DONE] 모든 분석을 완료했습니다.")
 
 
 if __name__ == "__main__":
     main()
-
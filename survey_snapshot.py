@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Supabase survey_responses 행을 로컬 SQLite 스냅샷으로 보관합니다.
+
+행은 id를 기본 키로 저장하고 created_at에 인덱스를 둡니다.
+매 실행마다 스냅샷의 created_at 최댓값(high-water mark) 이후의 행만
+받아와 병합하므로, 반복 분석은 네트워크 없이도 몇 초 안에 끝납니다.
+
+high-water mark는 스냅샷 전체의 최댓값이므로 한 스냅샷에는 한 출처(Supabase URL과
+테이블, 또는 로컬 파일)의 행만 담아야 합니다. 출처는 meta 테이블에 기록하고,
+다른 출처의 행을 병합하려 하면 claim_source()가 거부합니다.
+"""
+
+import json
+import sqlite3
+from collections.abc import Iterable, Iterator
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    id TEXT PRIMARY KEY,
+    created_at TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_created_at ON responses (created_at);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def open_snapshot(path: Path) -> sqlite3.Connection:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def row_key(rec: dict) -> str:
+    """id가 없는 행은 참가자 이름과 created_at으로 키를 만듭니다."""
+    if rec.get("id") is not None:
+        return str(rec["id"])
+    participant = rec.get("participant") or {}
+    return f"{participant.get('name', 'unknown')}_{rec.get('created_at', '')}"
+
+
+def snapshot_source(conn: sqlite3.Connection) -> str | None:
+    row = conn.execute("SELECT value FROM meta WHERE key = 'source'").fetchone()
+    return row[0] if row else None
+
+
+def claim_source(conn: sqlite3.Connection, source: str) -> None:
+    """스냅샷의 출처를 source로 기록합니다.
+
+    다른 출처로 기록된 스냅샷이거나, 출처 기록 없이 이미 행이 있는 스냅샷이면 ValueError.
+    """
+    stored = snapshot_source(conn)
+    if stored == source:
+        return
+    if stored is not None:
+        raise ValueError(f"스냅샷 출처가 다릅니다: {stored} (요청: {source})")
+    if count_rows(conn):
+        raise ValueError(f"출처가 기록되지 않은 기존 스냅샷입니다 (요청: {source})")
+    with conn:
+        conn.execute("INSERT INTO meta (key, value) VALUES ('source', ?)", (source,))
+
+
+def high_water_mark(conn: sqlite3.Connection) -> str | None:
+    (value,) = conn.execute("SELECT MAX(created_at) FROM responses").fetchone()
+    return value
+
+
+def merge_rows(conn: sqlite3.Connection, rows: Iterable[dict], batch_size: int = 1000) -> int:
+    """행을 id 기준으로 upsert하고 병합한 행 수를 반환합니다."""
+    merged = 0
+    batch = []
+    sql = (
+        "INSERT INTO responses (id, created_at, payload) VALUES (?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET created_at = excluded.created_at, payload = excluded.payload"
+    )
+    with conn:
+        for rec in rows:
+            batch.append((row_key(rec), rec.get("created_at"), json.dumps(rec, ensure_ascii=False)))
+            if len(batch) >= batch_size:
+                conn.executemany(sql, batch)
+                merged += len(batch)
+                batch.clear()
+        if batch:
+            conn.executemany(sql, batch)
+            merged += len(batch)
+    return merged
+
+
+def iter_snapshot_rows(conn: sqlite3.Connection, since: str | None = None) -> Iterator[dict]:
+    """스냅샷의 행을 created_at 순서로 하나씩 내보냅니다."""
+    if since is None:
+        cursor = conn.execute("SELECT payload FROM responses ORDER BY created_at, id")
+    else:
+        cursor = conn.execute(
+            "SELECT payload FROM responses WHERE created_at > ? ORDER BY created_at, id", (since,)
+        )
+    for (payload,) in cursor:
+        yield json.loads(payload)
+
+
+def count_rows(conn: sqlite3.Connection) -> int:
+    (value,) = conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+    return value
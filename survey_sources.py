@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+네트워크 없이 survey_responses 레코드를 읽어오는 오프라인 소스 모음입니다.
+
+지원 형식 (supabase_analysis.py --source 로 선택):
+    responses.jsonl / .ndjson   - 한 줄에 레코드 하나, 파일 전체를 메모리에 올리지 않고 스트리밍
+    -                           - 표준 입력으로 들어오는 NDJSON 스트림
+    responses.json              - Supabase/PostgREST에서 내보낸 JSON 배열
+    snapshot.sqlite / .db       - survey_snapshot 스냅샷 또는 survey_responses 테이블을 가진 SQLite
+    dumps/                      - 위 파일들이 들어 있는 디렉토리 (파일 이름 순서로 읽음)
+.gz로 압축된 JSON/JSONL 파일도 그대로 읽을 수 있습니다.
+"""
+
+import gzip
+import json
+import sqlite3
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+JSONL_SUFFIXES = {".jsonl", ".ndjson"}
+JSON_SUFFIXES = {".json"}
+SQLITE_SUFFIXES = {".sqlite", ".sqlite3", ".db"}
+# SQLite에 텍스트로 저장되는 JSON 컬럼
+JSON_COLUMNS = {"participant", "question_scores"}
+
+
+def _open_text(path: Path):
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    return open(path, "r", encoding="utf-8")
+
+
+def _base_suffix(path: Path) -> str:
+    """압축 확장자(.gz)를 제외한 실제 형식 확장자를 반환합니다."""
+    suffixes = [s.lower() for s in path.suffixes]
+    if suffixes and suffixes[-1] == ".gz":
+        suffixes = suffixes[:-1]
+    return suffixes[-1] if suffixes else ""
+
+
+def iter_jsonl(path: Path | str) -> Iterator[dict]:
+    """JSONL/NDJSON 파일(또는 '-'이면 표준 입력)을 한 줄씩 읽어 레코드를 내보냅니다."""
+    if str(path) == "-":
+        handle = sys.stdin
+        close = False
+    else:
+        handle = _open_text(Path(path))
+        close = True
+    try:
+        for line_no, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ValueError(f"{path}:{line_no} JSON 파싱 실패: {e}") from e
+    finally:
+        if close:
+            handle.close()
+
+
+def iter_json_array(path: Path) -> Iterator[dict]:
+    """JSON 배열 또는 단일 객체로 내보낸 파일을 읽습니다."""
+    with _open_text(path) as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        yield data
+    else:
+        yield from data
+
+
+def _decode_row(row: sqlite3.Row) -> dict:
+    record = dict(row)
+    for key in JSON_COLUMNS:
+        value = record.get(key)
+        if isinstance(value, str):
+            try:
+                record[key] = json.loads(value)
+            except json.JSONDecodeError:
+                pass
+    return record
+
+
+def iter_sqlite(path: Path, table: str = "survey_responses") -> Iterator[dict]:
+    """SQLite 파일에서 레코드를 읽습니다.
+
+    survey_snapshot 스냅샷(responses 테이블의 payload 컬럼)이면 원본 레코드를,
+    그 밖에는 table의 각 행을 participant/question_scores JSON을 풀어서 내보냅니다.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        if "responses" in tables and table not in tables:
+            for row in conn.execute("SELECT payload FROM responses ORDER BY created_at, id"):
+                yield json.loads(row["payload"])
+            return
+        if table not in tables:
+            raise ValueError(f"{path}에 {table} 테이블이 없습니다.")
+        columns = {row["name"] for row in conn.execute(f'PRAGMA table_info("{table}")')}
+        order = " ORDER BY created_at" if "created_at" in columns else ""
+        for row in conn.execute(f'SELECT * FROM "{table}"{order}'):
+            yield _decode_row(row)
+    finally:
+        conn.close()
+
+
+def iter_dump_directory(path: Path, table: str = "survey_responses") -> Iterator[dict]:
+    """디렉토리 안의 내보내기 파일들을 파일 이름 순서로 이어서 읽습니다."""
+    for child in sorted(path.iterdir()):
+        if child.is_file() and not child.name.startswith(".") and _base_suffix(child) in (
+            JSONL_SUFFIXES | JSON_SUFFIXES | SQLITE_SUFFIXES
+        ):
+            yield from iter_records(child, table=table)
+
+
+def iter_records(source: Path | str, table: str = "survey_responses") -> Iterator[dict]:
+    """경로 형식을 보고 알맞은 reader를 골라 레코드를 스트리밍합니다."""
+    if str(source) == "-":
+        yield from iter_jsonl("-")
+        return
+    path = Path(source)
+    if not path.exists():
+        raise FileNotFoundError(f"소스 경로가 존재하지 않습니다: {path}")
+    if path.is_dir():
+        yield from iter_dump_directory(path, table=table)
+        return
+    suffix = _base_suffix(path)
+    if suffix in JSONL_SUFFIXES:
+        yield from iter_jsonl(path)
+    elif suffix in JSON_SUFFIXES:
+        yield from iter_json_array(path)
+    elif suffix in SQLITE_SUFFIXES:
+        yield from iter_sqlite(path, table=table)
+    else:
+        raise ValueError(f"지원하지 않는 소스 형식입니다: {path}")
@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 저장소 루트의 스크립트(setup_data.py 등)를 테스트에서 바로 import
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,61 @@
+import math
+
+import numpy as np
+import pytest
+
+from generate_balanced_design import (
+    build_schedule,
+    default_step,
+    latin_rows,
+    verify_design,
+    williams_orders,
+)
+
+
+@pytest.mark.parametrize('n_datasets', range(1, 13))
+def test_default_step_is_coprime(n_datasets):
+    step = default_step(n_datasets)
+    assert math.gcd(step, n_datasets) == 1
+    assert default_step(5) == 2
+
+
+@pytest.mark.parametrize('n_interfaces', range(1, 13))
+def test_every_size_up_to_12_passes_with_default_step(n_interfaces):
+    interfaces = [f'I{i}' for i in range(n_interfaces)]
+    for n_datasets in range(n_interfaces, 13):
+        schedule = build_schedule(interfaces, n_datasets, default_step(n_datasets), 'williams')
+        assert all(schedule['checks'].values()), (n_interfaces, n_datasets, schedule['checks'])
+
+
+def test_step_1_and_2_match_config_js_blocks():
+    assert latin_rows(5, 5, 1).tolist()[1] == [1, 2, 3, 4, 0]
+    assert latin_rows(5, 5, 2).tolist() == [
+        [0, 2, 4, 1, 3],
+        [1, 3, 0, 2, 4],
+        [2, 4, 1, 3, 0],
+        [3, 0, 2, 4, 1],
+        [4, 1, 3, 0, 2],
+    ]
+
+
+def test_step_not_coprime_is_rejected():
+    with pytest.raises(ValueError):
+        latin_rows(5, 12, 2)
+
+
+def test_verify_design_flags_unbalanced_schedules():
+    rows = latin_rows(5, 5, 2)
+    assert all(verify_design(rows, 5).values())
+
+    repeated = rows.copy()
+    repeated[0, 1] = repeated[0, 0]
+    assert not verify_design(repeated, 5)['distinct_datasets']
+
+    assert not verify_design(rows[:4], 5)['pair_balanced']
+
+    orders = williams_orders(5)
+    assert all(verify_design(rows, 5, orders).values())
+    shuffled = np.array([np.arange(5)] * len(orders))
+    checks = verify_design(rows, 5, shuffled)
+    assert not checks['position_balanced']
+    assert not checks['carryover_balanced']
@@ -0,0 +1,124 @@
+import struct
+
+from mp4_faststart import UINT32_MAX, Box, inspect_layout, optimize_mp4, read_top_level_boxes, relocate_moov
+
+
+def box(box_type, payload):
+    return struct.pack('>I4s', 8 + len(payload), box_type) + payload
+
+
+def chunk_table(box_type, offsets):
+    fmt = 'I' if box_type == b'stco' else 'Q'
+    return box(box_type, struct.pack(f'>II{len(offsets)}{fmt}', 0, len(offsets), *offsets))
+
+
+def moov_box(tables):
+    traks = b''.join(box(b'trak', box(b'mdia', box(b'minf', box(b'stbl', table)))) for table in tables)
+    return box(b'moov', box(b'mvhd', bytes(100)) + traks)
+
+
+def chunk(index):
+    return bytes([index + 1]) * (16 + index)
+
+
+def build_mp4(path, table_types, after_moov=0):
+    """ftyp / mdat / moov [/ mdat] 파일을 만들고 트랙별 청크 내용 목록을 반환"""
+    n_tracks = len(table_types)
+    ftyp = box(b'ftyp', b'isom' + bytes(4) + b'isommp41')
+    # 트랙 t의 청크는 chunk(t * 10 + i); 앞 mdat에 3개씩, 뒤 mdat에 after_moov개씩
+    front = [[chunk(t * 10 + i) for i in range(3)] for t in range(n_tracks)]
+    back = [[chunk(t * 10 + 5 + i) for i in range(after_moov)] for t in range(n_tracks)]
+    moov_size = len(moov_box([chunk_table(kind, [0] * (3 + after_moov)) for kind in table_types]))
+
+    offsets = [[] for _ in range(n_tracks)]
+    data = bytearray()
+    base = len(ftyp) + 8
+    for t in range(n_tracks):
+        for payload in front[t]:
+            offsets[t].append(base + len(data))
+            data += payload
+    mdat = box(b'mdat', bytes(data))
+
+    data = bytearray()
+    back_base = len(ftyp) + len(mdat) + moov_size + 8
+    for t in range(n_tracks):
+        for payload in back[t]:
+            offsets[t].append(back_base + len(data))
+            data += payload
+    tail = box(b'mdat', bytes(data)) if after_moov else b''
+
+    moov = moov_box([chunk_table(kind, offsets[t]) for t, kind in enumerate(table_types)])
+    assert len(moov) == moov_size
+    path.write_bytes(ftyp + mdat + moov + tail)
+    return [front[t] + back[t] for t in range(n_tracks)]
+
+
+def read_chunks(path, expected):
+    """결과 파일의 stco/co64 오프셋이 가리키는 바이트를 트랙별로 읽음"""
+    with open(path, 'rb') as f:
+        boxes, _ = read_top_level_boxes(f)
+        _, moov_offset, moov_size, moov_header = next(b for b in boxes if b[0] == b'moov')
+        f.seek(moov_offset)
+        moov = Box.parse(f.read(moov_size), b'moov', moov_header)
+        result = []
+        tables = [b for b in moov.walk() if b.type in (b'stco', b'co64')]
+        for table, payloads in zip(tables, expected):
+            count = struct.unpack('>I', table.payload[4:8])[0]
+            fmt = 'I' if table.type == b'stco' else 'Q'
+            offsets = struct.unpack(f'>{count}{fmt}', table.payload[8:])
+            track = []
+            for offset, payload in zip(offsets, payloads):
+                f.seek(offset)
+                track.append(f.read(len(payload)))
+            result.append(track)
+    return [b[0] for b in boxes], result
+
+
+def test_stco_offsets_follow_moved_chunks(tmp_path):
+    path = tmp_path / 'a.mp4'
+    expected = build_mp4(path, [b'stco', b'stco'])
+
+    assert optimize_mp4(path)[0] == 'optimized'
+    order, chunks = read_chunks(path, expected)
+    assert order == [b'ftyp', b'moov', b'mdat']
+    assert chunks == expected
+    assert inspect_layout(path)[0] == 'faststart'
+    assert optimize_mp4(path)[0] == 'faststart'
+
+
+def test_co64_and_chunks_after_moov(tmp_path):
+    path = tmp_path / 'b.mp4'
+    expected = build_mp4(path, [b'co64', b'stco'], after_moov=2)
+
+    assert optimize_mp4(path)[0] == 'optimized'
+    order, chunks = read_chunks(path, expected)
+    assert order == [b'ftyp', b'moov', b'mdat', b'mdat']
+    assert chunks == expected
+
+
+def test_stco_upgrade_shifts_chunks_before_and_after_moov():
+    # 4GB를 넘는 파일을 오프셋만으로 재현: mdat(100~) / moov(UINT32_MAX - 10) / mdat
+    # 앞 트랙(stco)은 이동 후 32비트를 넘어 co64로 바뀌고, 뒤 트랙(co64)은 옛 moov 뒤 청크를 가짐
+    insert_at = 100
+    moov_offset = UINT32_MAX - 10
+    front = [insert_at + 8, UINT32_MAX - 100, UINT32_MAX - 20]
+
+    def build(back):
+        return moov_box([chunk_table(b'stco', front), chunk_table(b'co64', [200] + back)])
+
+    moov_size = len(build([0, 0]))
+    back = [moov_offset + moov_size + 8, moov_offset + moov_size + 40]
+    moov = Box.parse(build(back), b'moov', 8)
+
+    new_size = relocate_moov(moov, insert_at, moov_offset, moov_size)
+
+    parts = []
+    moov.serialize(parts)
+    assert new_size == moov.size() == len(b''.join(parts))
+    assert new_size > moov_size
+    tables = [b for b in moov.walk() if b.type in (b'stco', b'co64')]
+    assert [b.type for b in tables] == [b'co64', b'co64']
+    offsets = [list(struct.unpack(f'>{len(b.payload[8:]) // 8}Q', b.payload[8:])) for b in tables]
+    # moov 앞으로 옮겨진 구간은 새 moov 크기만큼, 옛 moov 뒤 구간은 크기 차이만큼 이동
+    assert offsets[0] == [o + new_size for o in front]
+    assert offsets[1] == [200 + new_size] + [o + new_size - moov_size for o in back]
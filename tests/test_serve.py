@@ -0,0 +1,68 @@
+import gzip
+import http.client
+import os
+import threading
+
+import pytest
+
+from serve import StudyHTTPServer, StudyRequestHandler
+
+
+@pytest.fixture
+def server(tmp_path):
+    (tmp_path / 'index.html').write_bytes(b'<html>' + b'study ' * 400 + b'</html>')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'index.html').write_bytes(b'<html>sub</html>')
+    handler = type('Handler', (StudyRequestHandler,), {'mounts': {}, 'quiet': True})
+    httpd = StudyHTTPServer(('127.0.0.1', 0), lambda *a, **kw: handler(*a, directory=str(tmp_path), **kw))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield tmp_path, httpd.server_address[1]
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def request(port, path, headers=None):
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    try:
+        conn.request('GET', path, headers=headers or {})
+        response = conn.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        conn.close()
+
+
+def test_root_index_gets_etag_and_304(server):
+    root, port = server
+    status, headers, body = request(port, '/')
+    assert status == 200
+    assert body == (root / 'index.html').read_bytes()
+    assert headers['Cache-Control'] == 'no-cache'
+    assert 'ETag' in headers
+
+    status, headers_304, body = request(port, '/', {'If-None-Match': headers['ETag']})
+    assert status == 304
+    assert body == b''
+    assert headers_304['ETag'] == headers['ETag']
+
+
+def test_root_index_uses_precompressed_variant(server):
+    root, port = server
+    source = root / 'index.html'
+    (root / 'index.html.gz').write_bytes(gzip.compress(source.read_bytes()))
+    os.utime(root / 'index.html.gz', ns=(source.stat().st_mtime_ns + 1,) * 2)
+
+    status, headers, body = request(port, '/', {'Accept-Encoding': 'gzip'})
+    assert status == 200
+    assert headers['Content-Encoding'] == 'gzip'
+    assert gzip.decompress(body) == source.read_bytes()
+
+
+def test_directory_without_slash_redirects(server):
+    _, port = server
+    status, headers, _ = request(port, '/sub')
+    assert status == 301
+    assert headers['Location'] == '/sub/'
+    status, headers, body = request(port, '/sub/')
+    assert (status, body) == (200, b'<html>sub</html>')
+    assert 'ETag' in headers
@@ -0,0 +1,172 @@
+import json
+import random
+import re
+
+import setup_data
+from setup_data import (
+    COMMENTS_BUNDLE_NAME,
+    COMMENTS_BUNDLE_PREFIX,
+    COMMENTS_KEY_PATTERN,
+    externalize_comment_payloads,
+    rewrite_video_sources,
+    update_video_paths_in_html,
+)
+
+
+def _var_page(comments):
+    return (
+        '<html><body>\n  <script>\n  var optimalComments = '
+        + json.dumps(comments)
+        + ';\n  console.log(optimalComments.length);\n  </script>\n</body></html>\n'
+    ).encode('utf-8')
+
+
+def _node_page(node_id, comments):
+    return (
+        f'<html><body>\n  <script id="{node_id}" type="application/json">\n'
+        + json.dumps(comments)
+        + '\n  </script>\n</body></html>\n'
+    ).encode('utf-8')
+
+
+def _write_sources(folder, youtube, danmaku=None):
+    (folder / 'youtube_ui.html').write_bytes(_var_page(youtube))
+    (folder / 'youtube_ui_one.html').write_bytes(_node_page('optimal-comments-data', youtube))
+    if danmaku is not None:
+        (folder / 'danmaku_ui_default.html').write_bytes(_node_page('danmaku-comments-data', danmaku))
+
+
+def _bundle(folder):
+    raw = (folder / COMMENTS_BUNDLE_NAME).read_bytes().strip()
+    assert raw.startswith(COMMENTS_BUNDLE_PREFIX)
+    return json.loads(raw[len(COMMENTS_BUNDLE_PREFIX):].rstrip(b';'))
+
+
+def _page_comments(folder, html_file):
+    keys = COMMENTS_KEY_PATTERN.findall((folder / html_file).read_bytes())
+    assert len(keys) == 1
+    return _bundle(folder)[keys[0].decode('utf-8')]
+
+
+def test_identical_lists_share_one_key(tmp_path):
+    youtube = [{'start': 1, 'text': 'a'}]
+    danmaku = [{'start': 2, 'text': 'b'}]
+    _write_sources(tmp_path, youtube, danmaku)
+
+    saved = externalize_comment_payloads(tmp_path, log=lambda *_: None)
+
+    assert set(saved) == {'youtube_ui.html', 'youtube_ui_one.html', 'danmaku_ui_default.html'}
+    assert _bundle(tmp_path) == {'youtube': youtube, 'danmaku': danmaku}
+    assert b'optimalComments' in (tmp_path / 'youtube_ui.html').read_bytes()
+
+
+def test_resync_with_changed_comments_does_not_duplicate(tmp_path):
+    old = [{'start': 1, 'text': 'old'}]
+    danmaku = [{'start': 2, 'text': 'b'}]
+    _write_sources(tmp_path, old, danmaku)
+    externalize_comment_payloads(tmp_path, log=lambda *_: None)
+
+    # 원본 댓글이 바뀌어 youtube 페이지만 다시 복사됨 (danmaku 페이지는 이미 분리된 상태)
+    new = [{'start': 1, 'text': 'new'}, {'start': 3, 'text': 'c'}]
+    _write_sources(tmp_path, new)
+    externalize_comment_payloads(tmp_path, log=lambda *_: None)
+
+    assert _bundle(tmp_path) == {'youtube': new, 'danmaku': danmaku}
+    assert _page_comments(tmp_path, 'youtube_ui.html') == new
+    assert _page_comments(tmp_path, 'youtube_ui_one.html') == new
+    assert _page_comments(tmp_path, 'danmaku_ui_default.html') == danmaku
+
+
+def test_pages_with_different_lists_get_separate_keys(tmp_path):
+    (tmp_path / 'youtube_ui.html').write_bytes(_var_page([{'start': 1}]))
+    (tmp_path / 'youtube_ui_one.html').write_bytes(_node_page('optimal-comments-data', [{'start': 2}]))
+
+    externalize_comment_payloads(tmp_path, log=lambda *_: None)
+
+    assert _page_comments(tmp_path, 'youtube_ui.html') == [{'start': 1}]
+    assert _page_comments(tmp_path, 'youtube_ui_one.html') == [{'start': 2}]
+    assert len(_bundle(tmp_path)) == 2
+
+
+def test_second_run_without_changes_is_a_no_op(tmp_path):
+    _write_sources(tmp_path, [{'start': 1}], [{'start': 2}])
+    externalize_comment_payloads(tmp_path, log=lambda *_: None)
+    before = {p.name: p.read_bytes() for p in tmp_path.iterdir()}
+
+    assert externalize_comment_payloads(tmp_path, log=lambda *_: None) == {}
+    assert {p.name: p.read_bytes() for p in tmp_path.iterdir()} == before
+    assert COMMENTS_BUNDLE_NAME in before
+
+
+# setup_data.py가 한 번의 스캔으로 합치기 전의 순차 치환 (비교 기준)
+LEGACY_VIDEO_PATTERNS = [
+    r'(<source\s+src=["\'])/source/minsunkim/comment/source/videos/[^"\']+\.mp4(["\'])',
+    r'(src=["\'])/source/[^"\']+videos/[^"\']+\.mp4(["\'])',
+    r'(<source\s+src=["\'])\./video/[^"\']+\.mp4(["\'])',
+    r'(src=["\'])\./video/[^"\']+\.mp4(["\'])',
+    r'(<source\s+src=["\'])\./[A-Za-z]\.mp4(["\'])',
+    r'(src=["\'])\./[A-Za-z]\.mp4(["\'])',
+    r'(src=["\'])/?video/[^"\']+\.mp4(["\'])',
+    r'(src=["\'])\.\./video/[^"\']+\.mp4(["\'])',
+]
+VIDEO_SRC_FORMS = [
+    '/source/minsunkim/comment/source/videos/abc.mp4',
+    '/source/other/videos/x_y.mp4',
+    './video/abc.mp4',
+    '../video/abc.mp4',
+    '/video/abc.mp4',
+    'video/abc.mp4',
+    './C.mp4',
+    '../../video/abc.mp4',
+    'https://example.com/video/abc.mp4',
+    './video/abc.webm',
+]
+
+
+def _legacy_rewrite(text, video_path):
+    for pattern in LEGACY_VIDEO_PATTERNS:
+        text = re.sub(pattern, rf'\g<1>{video_path}\g<2>', text)
+    return text
+
+
+def test_rewrite_video_sources_matches_legacy_passes():
+    video_path = '../../video/abc.mp4'
+    rng = random.Random(0)
+    for _ in range(2000):
+        parts = []
+        for _ in range(rng.randint(1, 4)):
+            quote = rng.choice('"\'')
+            tag = rng.choice(['<source src=', '<video src=', '<img data-src=', 'src='])
+            parts.append(f'{tag}{quote}{rng.choice(VIDEO_SRC_FORMS)}{quote} type="video/mp4">')
+        text = '\n'.join(parts)
+        expected = _legacy_rewrite(text, video_path)
+
+        content, rewrites = rewrite_video_sources(text.encode('utf-8'), video_path)
+
+        assert content.decode('utf-8') == expected
+        changed = sum(a != b for a, b in zip(text.splitlines(), expected.splitlines()))
+        assert (rewrites > 0) == (changed > 0)
+        assert rewrite_video_sources(content, video_path) == (content, 0)
+
+
+def test_update_video_paths_rewrites_atomically(tmp_path, monkeypatch):
+    video_dir = tmp_path / 'video'
+    video_dir.mkdir()
+    (video_dir / 'ab_c.mp4').write_bytes(b'')
+    folder = tmp_path / 'data' / 'ab_c_none_0.068'
+    folder.mkdir(parents=True)
+    html = folder / 'youtube_ui.html'
+    html.write_bytes(b'<video><source src="./video/ab_c.mp4" type="video/mp4"></video>\n'
+                     b'<video src="/source/x/videos/ab_c.mp4"></video>\n')
+    html.chmod(0o640)
+    untouched = folder / 'comvi_ui_default.html'
+    untouched.write_bytes(b'<source src="../../video/ab_c.mp4">')
+    monkeypatch.setattr(setup_data, 'VIDEO_DIR', video_dir)
+
+    counts = update_video_paths_in_html(folder, folder.name, log=lambda *_: None)
+
+    assert counts == {'youtube_ui.html': 2}
+    assert html.read_bytes().count(b'src="../../video/ab_c.mp4"') == 2
+    assert html.stat().st_mode & 0o777 == 0o640
+    assert not list(folder.glob('.*.tmp'))
+    assert update_video_paths_in_html(folder, folder.name, log=lambda *_: None) == {}
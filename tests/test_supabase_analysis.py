@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+from supabase_analysis import QUESTION_ORDER, _question_values, _score_columns, flatten_question_scores
+
+
+def test_score_columns_match_infer_objects():
+    rows = [
+        _question_values(scores)
+        for scores in (
+            {'Q1': 1, 'Q2': 2.5, 'Q3': None, 'Q4': 'x'},
+            {'Q1': 3, 'Q2': 4, 'Q3': 5, 'Q4': 6},
+            {'Q1': 7, 'Q2': 1, 'Q4': True},
+            {},
+        )
+    ]
+    columns = _score_columns([value for row in rows for value in row])
+
+    matrix = np.empty((len(rows), len(QUESTION_ORDER)), dtype=object)
+    matrix[:] = rows
+    for idx, column in enumerate(columns):
+        expected = pd.Series(matrix[:, idx]).infer_objects()
+        pd.testing.assert_series_equal(pd.Series(column), expected, check_names=False)
+
+
+def test_flatten_keeps_interface_order_and_int_scores():
+    records = [
+        {
+            'id': 'r1',
+            'participant': {'name': 'a', 'age': 20, 'gender': 'f'},
+            'question_scores': {
+                'Y': {'dataFolder': 'f1', 'htmlFile': 'youtube_ui.html', 'scores': {'Q1': 1, 'Q2': 2, 'Q3': 3, 'Q4': 4}},
+                '_pairing_info': {'permutation_index': 3, 'permutation_number': 4},
+                'C': {'dataFolder': 'f2', 'htmlFile': 'comvi_ui_default.html', 'scores': {'Q1': 5, 'Q2': 6, 'Q3': 7, 'Q4': 1}},
+            },
+        }
+    ]
+    df = flatten_question_scores(records)
+
+    assert df['interface'].astype(str).tolist() == ['Y', 'C']
+    assert df['Q1'].dtype == np.int64
+    assert df['Q1'].tolist() == [1, 5]
+    assert df['pairing_index'].tolist() == [3, 3]
+
+
+def test_flatten_consumes_generator_once_like_list():
+    from generate_synthetic_responses import generate_records
+
+    records = list(generate_records(50, ['f0', 'f1', 'f2', 'f3', 'f4'], seed=1))
+    records[3]['participant'] = None
+    records[4]['id'] = None
+    records[5]['question_scores']['C'] = None
+    records[6]['question_scores']['_pairing_info'] = None
+    records[7]['question_scores']['D'] = {'data_folder': 'x', 'scores': None}
+    consumed = []
+
+    def stream():
+        for record in records:
+            consumed.append(record['created_at'])
+            yield record
+
+    from_list = flatten_question_scores(records)
+    from_generator = flatten_question_scores(stream())
+
+    assert len(consumed) == len(records)
+    pd.testing.assert_frame_equal(from_generator, from_list)
+    assert from_list['participant_id'].iloc[0] == records[0]['id']
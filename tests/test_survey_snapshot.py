@@ -0,0 +1,45 @@
+import argparse
+
+import pytest
+
+import survey_snapshot
+from supabase_analysis import default_snapshot_path, snapshot_identity
+
+
+def _args(**overrides):
+    values = {'source': 'supabase', 'supabase_url': 'https://a.supabase.co', 'table': 'survey_responses'}
+    values.update(overrides)
+    return argparse.Namespace(**values)
+
+
+def test_default_path_is_keyed_by_source():
+    base = default_snapshot_path(_args())
+    assert default_snapshot_path(_args(supabase_url='https://a.supabase.co/')) == base
+    assert default_snapshot_path(_args(table='other')) != base
+    assert default_snapshot_path(_args(supabase_url='https://b.supabase.co')) != base
+    assert default_snapshot_path(_args(source='synthetic.jsonl')) != base
+    assert snapshot_identity(_args(source='synthetic.jsonl')) == 'file'
+
+
+def test_claim_source_refuses_foreign_rows(tmp_path):
+    conn = survey_snapshot.open_snapshot(tmp_path / 'snap.sqlite')
+    try:
+        survey_snapshot.claim_source(conn, 'https://a.supabase.co#survey_responses')
+        survey_snapshot.merge_rows(conn, [{'id': 1, 'created_at': '2025-11-27T00:00:00'}])
+        survey_snapshot.claim_source(conn, 'https://a.supabase.co#survey_responses')
+
+        with pytest.raises(ValueError):
+            survey_snapshot.claim_source(conn, 'file')
+        assert survey_snapshot.snapshot_source(conn) == 'https://a.supabase.co#survey_responses'
+    finally:
+        conn.close()
+
+
+def test_claim_source_refuses_unlabelled_snapshot_with_rows(tmp_path):
+    conn = survey_snapshot.open_snapshot(tmp_path / 'legacy.sqlite')
+    try:
+        survey_snapshot.merge_rows(conn, [{'id': 1, 'created_at': '2030-01-01T00:00:00'}])
+        with pytest.raises(ValueError):
+            survey_snapshot.claim_source(conn, 'https://a.supabase.co#survey_responses')
+    finally:
+        conn.close()
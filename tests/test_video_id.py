@@ -0,0 +1,7 @@
+from folder_names import video_id_from_folder
+
+
+def test_video_id_keeps_underscores_in_id():
+    assert video_id_from_folder('RQmqcaS5LIM_none_0.068') == 'RQmqcaS5LIM'
+    assert video_id_from_folder('ab_c-d_EFG_none_0.068') == 'ab_c-d_EFG'
+    assert video_id_from_folder('A') == 'A'
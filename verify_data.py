@@ -0,0 +1,320 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+data_folders.json에 있는 데이터 폴더가 실험에 바로 쓸 수 있는 상태인지 미리 검사합니다.
+
+test.html은 인터페이스 HTML이 없으면 참가자가 그 단계에 도달했을 때 HEAD 요청으로야 알게 됩니다.
+이 스크립트는 폴더마다 다음을 확인합니다.
+    - config.js의 CONFIG.interfaces에 있는 HTML 5개가 모두 있는지
+    - 각 HTML의 <source src>/<video src>가 실제 비디오 파일로 이어지는지
+      (브라우저처럼 /data/<폴더>/ 기준으로 URL을 풀고, /video/는 serve.py처럼 비디오 폴더로 연결)
+    - HTML 안의 인라인 JSON(<script type="application/json">, var NAME = [...];)과
+      comments.js의 참조 키, danmaku.json / optimal.json이 파싱되는지
+
+폴더는 스레드 풀에서 병렬로 검사합니다. data/.verify_manifest.json에 파일별 크기/mtime/sha256을
+기록해 두고, 내용 해시가 지난번 통과했을 때와 같은 폴더는 다시 검사하지 않습니다
+(mtime만 바뀐 파일은 해시를 다시 계산해 비교합니다).
+
+사용 예시:
+    python3 verify_data.py
+    python3 verify_data.py --force --jobs 8
+    python3 verify_data.py --video-dir /path/to/video RQmqcaS5LIM_none_0.068
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import posixpath
+import re
+import sys
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+from setup_data import COMMENTS_BUNDLE_NAME, COMMENTS_BUNDLE_PREFIX, VIDEO_DIR, file_sha256
+
+SCRIPT_DIR = Path(__file__).parent
+CONFIG_PATH = SCRIPT_DIR / 'config.js'
+DATA_FOLDERS_PATH = SCRIPT_DIR / 'data_folders.json'
+MANIFEST_NAME = '.verify_manifest.json'
+MANIFEST_VERSION = 1
+
+# 폴더마다 파싱을 확인하는 JSON 파일 (없으면 오류)
+JSON_FILES = ['danmaku.json', 'optimal.json']
+
+CONFIG_INTERFACES_PATTERN = re.compile(r'interfaces\s*:\s*\{(?P<body>.*?)\}', re.S)
+CONFIG_ENTRY_PATTERN = re.compile(r'''['"]?(\w+)['"]?\s*:\s*['"]([^'"]+)['"]''')
+CONFIG_BASE_PATH_PATTERN = re.compile(r'''dataBasePath\s*:\s*['"]([^'"]*)['"]''')
+MEDIA_SRC_PATTERN = re.compile(r'''<(?:source|video)\b[^>]*?\bsrc=["']([^"']+)["']''', re.I)
+JSON_SCRIPT_PATTERN = re.compile(
+    r'''<script\b[^>]*\btype=["']application/json["'][^>]*>(?P<payload>.*?)</script>''', re.S | re.I
+)
+# JSON 문자열에는 줄바꿈이 들어갈 수 없으므로 `];\n`이 배열의 끝 (setup_data.py와 같은 규칙)
+VAR_PAYLOAD_PATTERN = re.compile(r'var (?P<name>\w+) = (?P<payload>\[.*?\]);\n')
+COMMENTS_KEY_PATTERN = re.compile(r'data-comments-key="([\w-]+)"')
+
+
+def load_config(config_path=CONFIG_PATH):
+    """config.js에서 (인터페이스 → HTML 파일, dataBasePath)를 읽음"""
+    text = Path(config_path).read_text(encoding='utf-8')
+    match = CONFIG_INTERFACES_PATTERN.search(text)
+    if not match:
+        raise ValueError(f"{config_path}에서 CONFIG.interfaces를 찾지 못했습니다")
+    interfaces = dict(CONFIG_ENTRY_PATTERN.findall(match.group('body')))
+    base = CONFIG_BASE_PATH_PATTERN.search(text)
+    return interfaces, (base.group(1) if base else 'data')
+
+
+def load_folder_names(path=DATA_FOLDERS_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if not isinstance(data, list):
+        raise ValueError(f"{path}의 형식을 알 수 없습니다")
+    return [str(name) for name in data]
+
+
+def resolve_media_path(src, page_url, root, video_dir=None):
+    """HTML(page_url)에 적힌 src를 서버가 실제로 읽을 파일 경로로 변환 (http(s) 주소는 None)"""
+    parsed = urllib.parse.urlsplit(src)
+    if parsed.scheme or parsed.netloc:
+        return None
+    url_path = posixpath.normpath(posixpath.join(posixpath.dirname(page_url), urllib.parse.unquote(parsed.path)))
+    if video_dir is not None and url_path.startswith('/video/'):
+        return Path(video_dir) / url_path[len('/video/'):]
+    return Path(root) / url_path.lstrip('/')
+
+
+def check_html(html_path, page_url, root, video_dir, bundle_keys):
+    """HTML 하나를 검사해 (문제 목록, 참조한 비디오 경로 목록)을 반환"""
+    problems = []
+    videos = []
+    text = html_path.read_text(encoding='utf-8', errors='replace')
+
+    sources = MEDIA_SRC_PATTERN.findall(text)
+    if not sources:
+        problems.append(f"{html_path.name}: <source src>가 없습니다")
+    for src in sources:
+        path = resolve_media_path(src, page_url, root, video_dir)
+        if path is None:
+            continue
+        videos.append(path)
+        if not path.is_file():
+            problems.append(f"{html_path.name}: 비디오를 찾을 수 없습니다: {src} -> {path}")
+
+    for match in JSON_SCRIPT_PATTERN.finditer(text):
+        payload = match.group('payload').strip()
+        if not payload:
+            # comments.js에서 채우는 빈 노드
+            continue
+        try:
+            json.loads(payload)
+        except json.JSONDecodeError as e:
+            problems.append(f"{html_path.name}: 인라인 JSON 파싱 실패: {e}")
+    for match in VAR_PAYLOAD_PATTERN.finditer(text):
+        try:
+            json.loads(match.group('payload'))
+        except json.JSONDecodeError as e:
+            problems.append(f"{html_path.name}: var {match.group('name')} 파싱 실패: {e}")
+
+    for key in COMMENTS_KEY_PATTERN.findall(text):
+        if bundle_keys is None:
+            problems.append(f"{html_path.name}: {COMMENTS_BUNDLE_NAME}가 없거나 읽을 수 없습니다")
+        elif key not in bundle_keys:
+            problems.append(f"{html_path.name}: {COMMENTS_BUNDLE_NAME}에 '{key}' 키가 없습니다")
+    return problems, videos
+
+
+def read_bundle_keys(bundle_path):
+    """comments.js의 키 집합 (없거나 깨졌으면 None)"""
+    try:
+        raw = bundle_path.read_bytes().strip()
+    except OSError:
+        return None
+    if not raw.startswith(COMMENTS_BUNDLE_PREFIX):
+        return None
+    try:
+        data = json.loads(raw[len(COMMENTS_BUNDLE_PREFIX):].rstrip(b';'))
+    except json.JSONDecodeError:
+        return None
+    return {key for key, value in data.items() if isinstance(value, list)} if isinstance(data, dict) else None
+
+
+def check_folder(folder_path, interfaces, root, base_url, video_dir):
+    """폴더 하나를 검사해 (문제 목록, 참조한 비디오 경로 목록)을 반환"""
+    folder_path = Path(folder_path)
+    if not folder_path.is_dir():
+        return [f"폴더가 없습니다: {folder_path}"], []
+
+    problems = []
+    videos = []
+    bundle_keys = read_bundle_keys(folder_path / COMMENTS_BUNDLE_NAME)
+    for interface, html_file in interfaces.items():
+        html_path = folder_path / html_file
+        if not html_path.is_file():
+            problems.append(f"{html_file}: 인터페이스 {interface}의 HTML이 없습니다")
+            continue
+        page_url = f"/{base_url}/{folder_path.name}/{html_file}"
+        html_problems, html_videos = check_html(html_path, page_url, root, video_dir, bundle_keys)
+        problems.extend(html_problems)
+        videos.extend(v for v in html_videos if v not in videos)
+
+    for json_file in JSON_FILES:
+        json_path = folder_path / json_file
+        if not json_path.is_file():
+            problems.append(f"{json_file}이 없습니다")
+            continue
+        try:
+            with open(json_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            problems.append(f"{json_file} 파싱 실패: {e}")
+            continue
+        if not isinstance(data, list):
+            problems.append(f"{json_file}이 배열이 아닙니다")
+    return problems, videos
+
+
+def folder_files(folder_path, interfaces):
+    names = list(interfaces.values()) + JSON_FILES + [COMMENTS_BUNDLE_NAME]
+    return [name for name in dict.fromkeys(names) if (Path(folder_path) / name).is_file()]
+
+
+def hash_files(folder_path, names, cached):
+    """{파일: {size, mtime_ns, sha256}} - 크기/mtime이 같으면 기록된 해시를 재사용"""
+    entries = {}
+    for name in names:
+        st = (Path(folder_path) / name).stat()
+        entry = cached.get(name) or {}
+        if entry.get('size') != st.st_size or entry.get('mtime_ns') != st.st_mtime_ns or not entry.get('sha256'):
+            entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_sha256(Path(folder_path) / name)}
+        entries[name] = entry
+    return entries
+
+
+def video_state(paths):
+    """비디오는 크기만 비교 (내용 해시는 setup_data.py 동기화가 담당)"""
+    state = {}
+    for path in paths:
+        try:
+            state[str(path)] = os.stat(path).st_size
+        except OSError:
+            state[str(path)] = None
+    return state
+
+
+def folder_digest(files, videos, context):
+    digest = hashlib.sha256(json.dumps(context, sort_keys=True).encode('utf-8'))
+    for name in sorted(files):
+        digest.update(f"{name}\0{files[name]['sha256']}\n".encode('utf-8'))
+    digest.update(json.dumps(videos, sort_keys=True).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def load_manifest(data_dir):
+    try:
+        with open(Path(data_dir) / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if not isinstance(manifest, dict) or manifest.get('version') != MANIFEST_VERSION:
+        return {}
+    return manifest.get('folders', {})
+
+
+def save_manifest(data_dir, folders):
+    manifest_path = Path(data_dir) / MANIFEST_NAME
+    tmp = manifest_path.with_name(f"{manifest_path.name}.tmp")
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({'version': MANIFEST_VERSION, 'folders': folders}, f, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(tmp, manifest_path)
+
+
+def verify_folders(folder_names, data_dir, interfaces, root=SCRIPT_DIR, video_dir=VIDEO_DIR, force=False, jobs=None, log=print):
+    """폴더들을 병렬로 검사해 {폴더: 문제 목록}을 반환 (건너뛴 폴더는 빈 목록)"""
+    data_dir = Path(data_dir)
+    root = Path(root).resolve()
+    base_url = os.path.relpath(data_dir.resolve(), root).replace(os.sep, '/')
+    if video_dir is not None:
+        video_dir = Path(video_dir).resolve()
+        # retest 안의 video/는 serve.py가 그대로 서빙함
+        if video_dir == root / 'video':
+            video_dir = None
+    context = {'interfaces': interfaces, 'video_dir': str(video_dir)}
+    manifest = load_manifest(data_dir)
+
+    def process(folder_name):
+        folder_path = data_dir / folder_name
+        previous = manifest.get(folder_name, {})
+        try:
+            files = hash_files(folder_path, folder_files(folder_path, interfaces), previous.get('files', {}))
+            if not force and previous.get('ok') and files:
+                digest = folder_digest(files, video_state(previous.get('videos', {})), context)
+                if digest == previous.get('digest'):
+                    return folder_name, None, dict(previous, files=files)
+
+            problems, videos = check_folder(folder_path, interfaces, root, base_url, video_dir)
+            videos = video_state(videos)
+            files = hash_files(folder_path, folder_files(folder_path, interfaces), files)
+        except OSError as e:
+            return folder_name, [f"읽기 실패: {e}"], None
+        entry = {
+            'ok': not problems,
+            'problems': problems,
+            'files': files,
+            'videos': videos,
+            'digest': folder_digest(files, videos, context),
+            'checked_at': datetime.now().isoformat(timespec='seconds'),
+        }
+        return folder_name, problems, entry
+
+    results = {}
+    skipped = 0
+    workers = jobs or min(8, (os.cpu_count() or 1) * 2)
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        for folder_name, problems, entry in executor.map(process, folder_names):
+            if entry is not None:
+                manifest[folder_name] = entry
+            else:
+                manifest.pop(folder_name, None)
+            if problems is None:
+                skipped += 1
+                results[folder_name] = []
+                continue
+            results[folder_name] = problems
+            if problems:
+                log(f"[WARN] {folder_name}: 문제 {len(problems)}개")
+                for problem in problems:
+                    log(f"       - {problem}")
+            else:
+                log(f"[INFO] {folder_name}: 통과")
+
+    if data_dir.is_dir():
+        save_manifest(data_dir, manifest)
+    failed = sum(bool(problems) for problems in results.values())
+    log(f"[DONE] {len(results)}개 폴더 중 통과 {len(results) - failed}개, 실패 {failed}개 (변경 없어 건너뜀 {skipped}개)")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="data_folders.json의 데이터 폴더 무결성 검사")
+    parser.add_argument('folders', nargs='*', help="검사할 폴더 이름 (기본: data_folders.json 전체)")
+    parser.add_argument('--data-folders', type=Path, default=DATA_FOLDERS_PATH, help="폴더 목록 파일 (기본: data_folders.json)")
+    parser.add_argument('--config', type=Path, default=CONFIG_PATH, help="인터페이스 설정 파일 (기본: config.js)")
+    parser.add_argument('--video-dir', type=Path, default=None, help="/video/로 연결되는 비디오 폴더 (기본: setup_data.py 탐색 결과)")
+    parser.add_argument('--force', action='store_true', help="바뀌지 않은 폴더도 다시 검사")
+    parser.add_argument('--jobs', type=int, default=None, help="동시에 검사할 폴더 수")
+    args = parser.parse_args()
+
+    interfaces, base_path = load_config(args.config)
+    folder_names = args.folders or load_folder_names(args.data_folders)
+    results = verify_folders(
+        folder_names, SCRIPT_DIR / base_path, interfaces,
+        video_dir=args.video_dir or VIDEO_DIR, force=args.force, jobs=args.jobs,
+    )
+    sys.exit(1 if any(results.values()) else 0)
+
+
+if __name__ == '__main__':
+    main()